@@ -2,32 +2,81 @@
 
 import sys
 import threading
-import time
 from typing import Optional
 
-from .audio_recorder import AudioRecorder
+from .audio_recorder import create_recorder
+from .config import Config
 from .transcription_engine import TranscriptionEngine
 from .file_manager import FileManager
 from .session_manager import SessionManager
+from .pipeline import TranscriptionPipeline, TranscriptionJob
+from .renderer import TerminalRenderer
+from .live_transcription import LiveTranscriber
+from .output_sinks import OutputRouter, create_router
+from .diarization import format_labelled
+from .retention import RetentionEngine, RetentionPolicy
+from .metrics import MetricsExporter, start_exporter
 
 
 class WhisperTermApp:
     """Main application class for Whisper Term."""
     
-    def __init__(self, model_name: str = "base", language: str = "english"):
-        """Initialize the application."""
+    def __init__(self, config: Optional[Config] = None):
+        """
+        Initialize the application.
+        
+        Args:
+            config: Effective settings (defaults if None)
+        """
+        config = config or Config()
+        self.config = config
+        
         print("🎙️  Whisper Term - Speech-to-Text Terminal App")
         print("="*50)
         
         # Initialize components
-        self.audio_recorder = AudioRecorder(sample_rate=16000, channels=1)
-        self.transcription_engine = TranscriptionEngine(model_name=model_name, language=language)
-        self.file_manager = FileManager()
+        self.audio_recorder = create_recorder(config.device, config.second_device, sample_rate=16000)
+        self.transcription_engine = TranscriptionEngine.from_config(config)
+        self.file_manager = FileManager(config.data_dir)
         self.session_manager = SessionManager(self.file_manager)
+        self.pipeline = TranscriptionPipeline(
+            self.transcription_engine,
+            self.session_manager,
+            on_complete=self._on_transcription_complete,
+            diarize=config.diarize,
+            num_speakers=config.num_speakers,
+            on_part=self._on_part_complete
+        )
+        
+        # Output sinks (only those configured; the app does not copy by default)
+        self.outputs: Optional[OutputRouter] = create_router(config)
+        
+        # Live partial transcription display
+        self.renderer: Optional[TerminalRenderer] = None
+        self.live_transcriber: Optional[LiveTranscriber] = None
+        if config.live:
+            self.renderer = TerminalRenderer(level_source=self._current_input_level)
+            self.live_transcriber = LiveTranscriber(
+                self.audio_recorder, self.transcription_engine, self.renderer,
+                interval=config.live_interval,
+                commit_margin=config.live_commit_margin,
+                max_window=config.live_max_window,
+                on_commit=self.outputs.write_partial if self.outputs else None
+            )
+        
+        # Background retention, if any rule is configured
+        self.retention: Optional[RetentionEngine] = None
+        policy = RetentionPolicy.from_config(config)
+        if policy.enabled:
+            self.retention = RetentionEngine(self.session_manager, policy)
+        
+        # Metrics endpoint / file dump, if configured
+        self.metrics: Optional[MetricsExporter] = start_exporter(config)
         
         # Application state
         self.running = True
         self.recording = False
+        self._shutdown_event = threading.Event()
         
         print("✅ Application initialized successfully")
         print("💡 Press Ctrl+C to exit the application")
@@ -37,9 +86,10 @@ class WhisperTermApp:
         """Display usage instructions."""
         print("\n📋 INSTRUCTIONS:")
         print("• Press ENTER to start/stop recording")
+        print("• Type 'p' to pause/resume; parts are transcribed while paused")
         print("• Type 'q' or 'quit' to exit")
         print("• Speak clearly into your microphone")
-        print("• Wait for transcription to complete after stopping")
+        print("• You can start the next recording while earlier ones are transcribed")
         print()
     
     def start_recording(self) -> None:
@@ -50,15 +100,25 @@ class WhisperTermApp:
         
         self.recording = True
         self.audio_recorder.start_recording()
+        
+        if self.live_transcriber:
+            self.live_transcriber.start()
+    
+    def _current_input_level(self) -> Optional[float]:
+        """Input level for the live meter, or None when not recording."""
+        return self.audio_recorder.input_level if self.recording else None
     
     def stop_recording(self) -> None:
-        """Stop recording and process transcription."""
+        """Stop recording and queue the audio for transcription."""
         if not self.recording:
             print("⚠️  Not currently recording!")
             return
         
         self.recording = False
         
+        if self.live_transcriber:
+            self.live_transcriber.stop()
+        
         # Stop recording and get audio data
         audio_data = self.audio_recorder.stop_recording()
         
@@ -66,26 +126,66 @@ class WhisperTermApp:
             print("❌ No audio data recorded")
             return
         
-        # Process transcription
-        result = self.transcription_engine.transcribe(audio_data)
-        transcription = result.get("text", "")
+        # Hand off to the pipeline; the input thread is free for the next
+        # recording. Parts before the last pause were submitted already.
+        self.pipeline.submit(audio_data[self.audio_recorder.segment_start:],
+                             self.audio_recorder.sample_rate)
+        print(self.pipeline.status_line())
+    
+    def toggle_pause(self) -> None:
+        """Pause or resume the recording; a pause queues the part that just ended."""
+        if not self.recording:
+            print("⚠️  Not currently recording!")
+            return
+        
+        if self.audio_recorder.paused:
+            self.audio_recorder.resume_recording()
+            print("🔴 Recording resumed... Press ENTER to stop, 'p' to pause")
+            return
+        
+        part = self.audio_recorder.pause_recording()
+        if part is not None:
+            self.pipeline.submit_part(part, self.audio_recorder.sample_rate)
+        print("⏸️  Paused - transcribing what was recorded so far. 'p' to resume, ENTER to finish")
+    
+    def _on_part_complete(self, job: TranscriptionJob) -> None:
+        """Print a transcribed part of a paused recording (called by the pipeline)."""
+        text = job.result.get("text", "")
+        if not text:
+            return
+        if self.renderer:
+            with self.renderer.suspended():
+                print(f"\n💬 Part {job.part + 1}: {text}")
+        else:
+            print(f"\n💬 Part {job.part + 1}: {text}")
+    
+    def _on_transcription_complete(self, job: TranscriptionJob) -> None:
+        """Print and output a finished transcription (called by the pipeline, in order)."""
+        if self.outputs:
+            self.outputs.write(job.result.get("text", ""))
+        if self.renderer:
+            with self.renderer.suspended():
+                self._print_transcription(job)
+        else:
+            self._print_transcription(job)
+    
+    def _print_transcription(self, job: TranscriptionJob) -> None:
+        """Print a finished transcription and its session summary."""
+        transcription = job.result.get("text", "")
         
-        if transcription:
+        if job.speaker_segments:
+            print(f"\n🗣️  Transcription by speaker:")
+            print(format_labelled(job.speaker_segments))
+        elif transcription:
             print(f"\n💬 Transcription:")
             print(f"   {transcription}")
         else:
             print("⚠️  No speech detected or transcription failed")
         
-        # Create session and save files
-        session = self.session_manager.create_session(
-            audio_data=audio_data,
-            transcription=transcription,
-            sample_rate=self.audio_recorder.sample_rate
-        )
-        
-        if session:
-            self.session_manager.print_session_summary(session)
+        if job.session:
+            self.session_manager.print_session_summary(job.session)
         
+        print(self.pipeline.status_line())
         print("\n" + "="*50)
     
     def handle_user_input(self) -> None:
@@ -102,10 +202,12 @@ class WhisperTermApp:
                         self.stop_recording()
                     else:
                         self.start_recording()
+                elif user_input == 'p' or user_input == 'pause':
+                    self.toggle_pause()
                 elif user_input == 'h' or user_input == 'help':
                     self.display_instructions()
                 else:
-                    print("💡 Press ENTER to start/stop recording, 'q' to quit, 'h' for help")
+                    print("💡 Press ENTER to start/stop recording, 'p' to pause, 'q' to quit, 'h' for help")
                     
             except EOFError:
                 # Handle Ctrl+D
@@ -127,9 +229,14 @@ class WhisperTermApp:
             input_thread = threading.Thread(target=self.handle_user_input, daemon=True)
             input_thread.start()
             
-            # Main loop
-            while self.running:
-                time.sleep(0.1)  # Small delay to prevent high CPU usage
+            if self.renderer:
+                self.renderer.start()
+            
+            if self.retention:
+                self.retention.start(self.config.retention_interval)
+            
+            # Block until shutdown is requested
+            self._shutdown_event.wait()
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Received interrupt signal...")
@@ -147,17 +254,35 @@ class WhisperTermApp:
             print("⏹️  Stopping active recording...")
             self.stop_recording()
         
-        # No cleanup needed for input() method
+        # Let queued recordings finish transcribing and saving
+        pending = self.pipeline.pending_count()
+        if pending:
+            print(f"⏳ Waiting for {pending} pending transcription(s)...")
+        self.pipeline.close(wait=True)
+        
+        if self.outputs:
+            self.outputs.close()
+        
+        if self.renderer:
+            self.renderer.stop()
+        
+        if self.retention:
+            self.retention.stop()
+        
+        if self.metrics:
+            self.metrics.stop()
         
         # Display final statistics
-        storage_info = self.file_manager.get_storage_info()
+        storage_info = self.session_manager.get_storage_info()
         print(f"\n📊 Session Statistics:")
-        print(f"   Total recordings: {storage_info['total_files']}")
+        print(f"   Total recordings: {storage_info['total_sessions']} ({storage_info['total_files']} files)")
+        print(f"   Audio stored: {storage_info['audio_seconds'] / 60:.1f} min")
         print(f"   Storage used: {storage_info['total_size_mb']:.1f} MB")
         print(f"   Data location: {storage_info['recordings_dir']}")
         
         print("\n👋 Thank you for using Whisper Term!")
         self.running = False
+        self._shutdown_event.set()
         sys.exit(0)
     
     def show_recent_sessions(self, limit: int = 5) -> None:
@@ -190,6 +315,8 @@ class WhisperTermApp:
         return {
             "running": self.running,
             "recording": self.recording,
+            "paused": self.recording and self.audio_recorder.paused,
+            "pending_transcriptions": self.pipeline.pending_count(),
             "model_info": self.get_model_info(),
-            "storage_info": self.file_manager.get_storage_info()
+            "storage_info": self.session_manager.get_storage_info()
         }
\ No newline at end of file
@@ -0,0 +1,369 @@
+"""Export and import of session bundles."""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import tarfile
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .file_manager import AUDIO_SUFFIXES
+from .locking import create_exclusive
+from .session_index import SESSION_SUFFIXES
+from .session_manager import SessionManager
+
+
+FORMATS = ["tar.zst", "jsonl", "parquet"]
+
+# Path of a session file inside a bundle: YYYY-MM/YYYY-MM-DD/YYYYMMDD_HHMMSS<suffix>
+_MEMBER_RE = re.compile(r"^(\d{4}-\d{2})/(\d{4}-\d{2}-\d{2})/(\d{8}_\d{6}(?:_\d+)?)(\..+)$")
+
+# Sessions read ahead of the import writers, bounding memory use
+_MAX_IN_FLIGHT = 32
+
+# Sessions per parquet row group
+_PARQUET_ROWS = 64
+
+# A session in transit: (canonical .wav path relative to the recordings dir, files by suffix)
+Session = Tuple[str, Dict[str, bytes]]
+
+
+def _import_optional(module: str, package: str, fmt: str):
+    """Import an optional dependency needed by a bundle format."""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"The {fmt} format requires the '{package}' package") from None
+
+
+def parse_range(spec: str) -> Tuple[str, str]:
+    """
+    Parse a date range into inclusive YYYYMMDD bounds.
+
+    Accepts a day (2025-07-08), a month (2025-07), "all", or two of those
+    joined by ".." with either side optional (2025-07-01..2025-07-15,
+    2025-06.., ..2025-07-08).
+
+    Args:
+        spec: Range specification
+
+    Returns:
+        Tuple of (first_date, last_date) as YYYYMMDD strings
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    if spec == "all":
+        return "00000000", "99999999"
+
+    def bound(part: str, upper: bool) -> str:
+        if not part:
+            return "99999999" if upper else "00000000"
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", part):
+            return part.replace("-", "")
+        if re.fullmatch(r"\d{4}-\d{2}", part):
+            return part.replace("-", "") + ("31" if upper else "01")
+        raise ValueError(f"Invalid date '{part}' (use YYYY-MM or YYYY-MM-DD)")
+
+    if ".." in spec:
+        first, last = spec.split("..", 1)
+    else:
+        first = last = spec
+    return bound(first, upper=False), bound(last, upper=True)
+
+
+def detect_format(path: Path) -> str:
+    """Bundle format from a file name."""
+    name = str(path)
+    for fmt in FORMATS:
+        if name.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Unknown bundle format: {path} (expected .{', .'.join(FORMATS)})")
+
+
+class SessionArchiver:
+    """
+    Streams sessions selected from the index into a bundle, and back.
+
+    Export makes one pass over the selected sessions and holds at most one
+    session's files (one row group for parquet) in memory. Import reads the
+    bundle sequentially and writes sessions with a pool of workers, each
+    session's files written atomically and then indexed.
+    """
+
+    def __init__(self, session_manager: SessionManager, workers: Optional[int] = None):
+        """
+        Initialize the archiver.
+
+        Args:
+            session_manager: Session manager owning the index
+            workers: Import writer threads (default: scales with CPU count)
+        """
+        self.session_manager = session_manager
+        self.index = session_manager.index
+        self.recordings_dir = session_manager.file_manager.recordings_dir
+        self.workers = workers or min(16, (os.cpu_count() or 1) * 2)
+
+    def select(self, spec: str) -> List[Dict[str, Any]]:
+        """Index records in a date range, oldest first."""
+        first, last = parse_range(spec)
+        return [r for r in self.index.records() if first <= r["id"][:8] <= last]
+
+    def _session_files(self, record: Dict[str, Any]) -> Iterator[Tuple[str, Path]]:
+        """Existing files of a session as (suffix, path)."""
+        audio_path = self.index.audio_path(record)
+        for suffix in SESSION_SUFFIXES:
+            path = audio_path.parent / (audio_path.stem + suffix)
+            if path.exists():
+                yield suffix, path
+
+    # Export
+
+    def export(self, spec: str, output: Path, fmt: Optional[str] = None) -> Dict[str, int]:
+        """
+        Write the sessions in a date range to a bundle.
+
+        Args:
+            spec: Date range (see parse_range)
+            output: Bundle path
+            fmt: Bundle format (default: from the output name)
+
+        Returns:
+            Counts of sessions, files and bytes exported
+        """
+        fmt = fmt or detect_format(output)
+        records = self.select(spec)
+        counts = {"sessions": 0, "files": 0, "bytes": 0}
+
+        tmp_path = Path(str(output) + ".tmp")
+        try:
+            writer = {"tar.zst": self._export_tar, "jsonl": self._export_jsonl,
+                      "parquet": self._export_parquet}[fmt]
+            writer(records, tmp_path, counts)
+            os.replace(tmp_path, output)
+        finally:
+            if tmp_path.exists():
+                os.remove(tmp_path)
+        return counts
+
+    def _export_tar(self, records, output: Path, counts: Dict[str, int]) -> None:
+        """Session files as a zstd-compressed tar stream."""
+        zstandard = _import_optional("zstandard", "zstandard", "tar.zst")
+        compressor = zstandard.ZstdCompressor(level=10, threads=-1)
+
+        with open(output, "wb") as f, compressor.stream_writer(f) as stream:
+            with tarfile.open(fileobj=stream, mode="w|") as tar:
+                for record in records:
+                    relative = Path(record["path"]).parent
+                    for suffix, path in self._session_files(record):
+                        # Always a regular member: tar.add would store audio
+                        # sharing a blob with an earlier session as a hard link
+                        with open(path, "rb") as member_file:
+                            stat = os.fstat(member_file.fileno())
+                            info = tarfile.TarInfo(f"{relative.as_posix()}/{record['id']}{suffix}")
+                            info.type = tarfile.REGTYPE
+                            info.size = stat.st_size
+                            info.mtime = int(stat.st_mtime)
+                            info.mode = 0o644
+                            tar.addfile(info, member_file)
+                        counts["files"] += 1
+                        counts["bytes"] += info.size
+                    counts["sessions"] += 1
+
+    def _read_session(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """One session as a row: transcript and metadata inline, other files as bytes."""
+        row: Dict[str, Any] = {"id": record["id"], "path": record["path"],
+                               "text": None, "metadata": None, "files": {}}
+        for suffix, path in self._session_files(record):
+            data = path.read_bytes()
+            if suffix == ".txt":
+                row["text"] = data.decode("utf-8")
+            elif suffix == ".json":
+                row["metadata"] = data.decode("utf-8")
+            else:
+                row["files"][suffix] = data
+        return row
+
+    def _count_row(self, row: Dict[str, Any], counts: Dict[str, int]) -> None:
+        counts["sessions"] += 1
+        for value in [row["text"], row["metadata"], *row["files"].values()]:
+            if value is not None:
+                counts["files"] += 1
+                counts["bytes"] += len(value)
+
+    def _export_jsonl(self, records, output: Path, counts: Dict[str, int]) -> None:
+        """One JSON object per session, binary files base64-encoded."""
+        with open(output, "w", encoding="utf-8") as f:
+            for record in records:
+                row = self._read_session(record)
+                self._count_row(row, counts)
+                row["metadata"] = json.loads(row["metadata"]) if row["metadata"] else None
+                row["files"] = {suffix: base64.b64encode(data).decode("ascii")
+                                for suffix, data in row["files"].items()}
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _export_parquet(self, records, output: Path, counts: Dict[str, int]) -> None:
+        """One row per session, written in row groups."""
+        pa = _import_optional("pyarrow", "pyarrow", "parquet")
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.string()), ("path", pa.string()),
+            ("text", pa.string()), ("metadata", pa.string()),
+            ("files", pa.map_(pa.string(), pa.binary())),
+        ])
+        with pq.ParquetWriter(str(output), schema, compression="zstd") as writer:
+            rows: List[Dict[str, Any]] = []
+            for record in records:
+                row = self._read_session(record)
+                self._count_row(row, counts)
+                row["files"] = list(row["files"].items())
+                rows.append(row)
+                if len(rows) >= _PARQUET_ROWS:
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    rows = []
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    # Import
+
+    def import_bundle(self, bundle: Path, overwrite: bool = False) -> Dict[str, int]:
+        """
+        Ingest a bundle into the recordings tree and index.
+
+        Args:
+            bundle: Bundle path
+            overwrite: Replace sessions that already exist (skipped otherwise)
+
+        Returns:
+            Counts of sessions imported, files written and sessions or
+            bundle entries skipped
+        """
+        reader = {"tar.zst": self._read_tar, "jsonl": self._read_jsonl,
+                  "parquet": self._read_parquet}[detect_format(bundle)]
+        counts = {"sessions": 0, "skipped": 0, "files": 0}
+
+        def finish(future: Future) -> None:
+            written = future.result()
+            if written is None:
+                counts["skipped"] += 1
+            else:
+                counts["files"] += written
+                counts["sessions"] += 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight: List[Future] = []
+            for relative, files in reader(bundle, counts):
+                if not overwrite and self.index.get(Path(relative).stem) is not None:
+                    counts["skipped"] += 1
+                    continue
+                in_flight.append(pool.submit(self._write_session, relative, files, overwrite))
+                if len(in_flight) >= _MAX_IN_FLIGHT:
+                    finish(in_flight.pop(0))
+            for future in in_flight:
+                finish(future)
+        return counts
+
+    def _write_session(self, relative: str, files: Dict[str, bytes],
+                       overwrite: bool = False) -> Optional[int]:
+        """
+        Write one session's files and index it.
+
+        The session id is claimed by creating its transcript with O_EXCL,
+        like FileManager.reserve_session_paths, so an import never writes
+        over a session that another process (or a recording) created after
+        the index was checked.
+
+        Returns:
+            Files written, or None if the id is taken and overwrite is off
+        """
+        audio_path = self.recordings_dir / relative
+        audio_path.parent.mkdir(parents=True, exist_ok=True)
+        if not create_exclusive(audio_path.with_suffix(".txt")) and not overwrite:
+            return None
+
+        # Metadata last, like SessionManager.create_session
+        for suffix in sorted(files, key=lambda s: s == ".json"):
+            path = audio_path.parent / (audio_path.stem + suffix)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(files[suffix])
+            if suffix in AUDIO_SUFFIXES.values():
+                # Re-imported audio links to the copy already stored
+                digest = hashlib.sha256(files[suffix]).hexdigest()
+                self.session_manager.file_manager.link_audio(tmp_path, digest, path)
+            else:
+                os.replace(tmp_path, path)
+
+        self.session_manager.reindex_session(audio_path)
+        return len(files)
+
+    def _read_tar(self, bundle: Path, counts: Dict[str, int]) -> Iterator[Session]:
+        """Sessions from a tar.zst stream (members of a session are consecutive)."""
+        zstandard = _import_optional("zstandard", "zstandard", "tar.zst")
+
+        current: Optional[str] = None
+        files: Dict[str, bytes] = {}
+        with open(bundle, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                for member in tar:
+                    match = _MEMBER_RE.match(member.name)
+                    if not member.isfile() or not match or match.group(4) not in SESSION_SUFFIXES:
+                        print(f"⚠️  Skipping unexpected bundle entry: {member.name}")
+                        counts["skipped"] += 1
+                        continue
+                    month, day, session_id, suffix = match.groups()
+                    relative = f"{month}/{day}/{session_id}.wav"
+                    if relative != current:
+                        if current is not None:
+                            yield current, files
+                        current, files = relative, {}
+                    files[suffix] = tar.extractfile(member).read()
+        if current is not None:
+            yield current, files
+
+    def _row_to_session(self, row: Dict[str, Any], files: Dict[str, bytes],
+                        counts: Dict[str, int]) -> Optional[Session]:
+        """Validate a jsonl/parquet row and assemble its files."""
+        match = _MEMBER_RE.match(row.get("path") or "")
+        if not match or match.group(4) != ".wav":
+            print(f"⚠️  Skipping session with unexpected path: {row.get('path')}")
+            counts["skipped"] += 1
+            return None
+        files = {suffix: data for suffix, data in files.items() if suffix in SESSION_SUFFIXES}
+        if row.get("text") is not None:
+            files[".txt"] = row["text"].encode("utf-8")
+        if row.get("metadata") is not None:
+            metadata = row["metadata"]
+            if not isinstance(metadata, str):
+                metadata = json.dumps(metadata, ensure_ascii=False)
+            files[".json"] = metadata.encode("utf-8")
+        return row["path"], files
+
+    def _read_jsonl(self, bundle: Path, counts: Dict[str, int]) -> Iterator[Session]:
+        """Sessions from a jsonl bundle."""
+        with open(bundle, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                files = {suffix: base64.b64decode(data)
+                         for suffix, data in (row.get("files") or {}).items()}
+                session = self._row_to_session(row, files, counts)
+                if session:
+                    yield session
+
+    def _read_parquet(self, bundle: Path, counts: Dict[str, int]) -> Iterator[Session]:
+        """Sessions from a parquet bundle, one row group at a time."""
+        _import_optional("pyarrow", "pyarrow", "parquet")
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(str(bundle))
+        for batch in parquet_file.iter_batches(batch_size=_PARQUET_ROWS):
+            for row in batch.to_pylist():
+                session = self._row_to_session(row, dict(row.get("files") or []), counts)
+                if session:
+                    yield session
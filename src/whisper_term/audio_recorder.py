@@ -1,36 +1,120 @@
-"""Audio recording functionality using sounddevice."""
+"""Audio recording from devices, pipes and files."""
 
-import sounddevice as sd
 import numpy as np
-from typing import Optional
+from time import monotonic
+from typing import List, Optional, Tuple, Union
 import threading
 import queue
 
+from .input_sources import DeviceSource, InputSource
+from .metrics import RECORDED_SECONDS
+from .resampler import CaptureConverter
+
 
 class AudioRecorder:
-    """Handles audio recording using sounddevice."""
+    """Handles audio recording from an input source (a sounddevice device by default)."""
     
-    def __init__(self, sample_rate: int = 16000, channels: int = 1):
+    def __init__(self, sample_rate: int = 16000, channels: Optional[int] = None,
+                 device: Optional[Union[int, str]] = None, source: Optional[InputSource] = None):
         """
         Initialize the audio recorder.
         
+        The source is opened at its native sample rate and channel count;
+        blocks are queued as captured and downmixed and resampled to mono at
+        ``sample_rate`` when the buffer is read, instead of asking PortAudio
+        or the host to convert.
+        
         Args:
-            sample_rate: Sample rate in Hz (16000 is optimal for Whisper)
-            channels: Number of audio channels (1 for mono)
+            sample_rate: Output sample rate in Hz (16000 is optimal for Whisper)
+            channels: Capture channel count, or None for the device's native count
+            device: sounddevice input device index or name, or None for the default
+            source: Input source to record from instead of a device (see input_sources)
         """
         self.sample_rate = sample_rate
         self.channels = channels
+        self.device = device
+        self.source = source or DeviceSource(device, channels)
         self.recording = False
+        self.paused = False
+        self.segment_start = 0  # Sample offset where the current segment begins
         self.audio_data = []
         self.audio_queue = queue.Queue()
+        self.input_level = 0.0
+        self.first_block_time: Optional[float] = None
+        self._buffer_lock = threading.Lock()
+        self._converter: Optional[CaptureConverter] = None
+        self._capture_format: Optional[Tuple[int, int]] = None
+    
+    def _native_format(self) -> Tuple[int, int]:
+        """Query the source's native (sample_rate, channels)."""
+        return self.source.native_format()
+    
+    def input_ended(self) -> bool:
+        """Whether a finite source (pipe, file) has run out of audio."""
+        return self.source.ended.is_set()
         
     def _audio_callback(self, indata, frames, time, status):
         """Callback function for audio recording."""
         if status:
             print(f"Audio callback status: {status}")
         
-        if self.recording:
+        # Paused blocks are dropped; the stream stays open for resume
+        if self.recording and not self.paused:
+            if self.first_block_time is None:
+                self.first_block_time = monotonic() - frames / self._capture_format[0]
+            
+            # Copy only; conversion happens in _drain_queue, off the audio thread
             self.audio_queue.put(indata.copy())
+            
+            # RMS input level for the live meter; ravel() of the contiguous
+            # block is a view and np.dot needs no temporary array
+            samples = indata.ravel()
+            if samples.size:
+                self.input_level = float(np.sqrt(np.dot(samples, samples) / samples.size))
+    
+    def _drain_queue(self, flush: bool = False) -> None:
+        """
+        Convert queued callback blocks into the recording buffer.
+        
+        Args:
+            flush: Also append the resampler's tail, ending the segment
+        """
+        with self._buffer_lock:
+            # While paused, anything still queued raced the pause after its
+            # flush; drop it like any other paused block
+            convert = flush or not self.paused
+            while not self.audio_queue.empty():
+                block = self.audio_queue.get()
+                if convert:
+                    self.audio_data.append(self._converter.process(block))
+            if flush and self.audio_data:
+                self.audio_data.append(self._converter.flush())
+    
+    def get_buffered_audio(self, start_sample: int = 0) -> Optional[np.ndarray]:
+        """
+        Get the audio recorded so far without stopping the recording.
+        
+        Args:
+            start_sample: Skip audio before this sample offset
+            
+        Returns:
+            Mono audio from start_sample onwards, or None if there is none
+        """
+        self._drain_queue()
+        
+        with self._buffer_lock:
+            chunks = []
+            offset = 0
+            for chunk in self.audio_data:
+                end = offset + len(chunk)
+                if end > start_sample:
+                    chunks.append(chunk[max(start_sample - offset, 0):])
+                offset = end
+        
+        if not chunks:
+            return None
+        
+        return np.concatenate(chunks)
     
     def start_recording(self) -> None:
         """Start audio recording."""
@@ -38,61 +122,93 @@ class AudioRecorder:
             print("Already recording!")
             return
             
-        self.recording = True
-        self.audio_data = []
+        # Open the device in its native format and convert on the fly
+        capture_format = self._native_format()
+        if capture_format != self._capture_format:
+            self._capture_format = capture_format
+            self._converter = CaptureConverter(capture_format[0], capture_format[1], self.sample_rate)
+        self._converter.reset()
         
-        # Clear any existing data in the queue
-        while not self.audio_queue.empty():
-            self.audio_queue.get()
+        self.recording = True
+        self.paused = False
+        self.segment_start = 0
+        self.input_level = 0.0
+        self.first_block_time = None
+        with self._buffer_lock:
+            self.audio_data = []
+            
+            # Clear any existing data in the queue
+            while not self.audio_queue.empty():
+                self.audio_queue.get()
         
-        print("🔴 Recording started... Press SPACE to stop")
+        if not self.source.finite:
+            print("🔴 Recording started... Press SPACE to stop")
         
         # Start the audio stream
-        self.stream = sd.InputStream(
-            callback=self._audio_callback,
-            channels=self.channels,
-            samplerate=self.sample_rate,
-            dtype=np.float32
-        )
+        self.stream = self.source.open_stream(self._audio_callback)
         self.stream.start()
     
+    def pause_recording(self) -> Optional[np.ndarray]:
+        """
+        Pause the recording without closing the stream, ending a segment.
+        
+        Returns:
+            Audio of the segment that just ended, or None if it is empty
+        """
+        if not self.recording or self.paused:
+            return None
+        
+        self.paused = True
+        self.input_level = 0.0
+        self._drain_queue(flush=True)
+        
+        segment = self.get_buffered_audio(self.segment_start)
+        if segment is not None:
+            self.segment_start += len(segment)
+        return segment
+    
+    def resume_recording(self) -> None:
+        """Resume a paused recording, starting a new segment."""
+        if not self.recording or not self.paused:
+            return
+        # The segments are not contiguous, so don't resample across the gap
+        with self._buffer_lock:
+            self._converter.reset()
+        self.paused = False
+    
     def stop_recording(self) -> Optional[np.ndarray]:
         """
         Stop audio recording and return the recorded data.
         
         Returns:
-            Recorded audio data as numpy array, or None if no recording
+            Recorded audio data as numpy array (all segments, from
+            ``segment_start`` on the last one), or None if no recording
         """
         if not self.recording:
             print("Not currently recording!")
             return None
         
         self.recording = False
+        self.input_level = 0.0
         
         # Stop the audio stream
         if hasattr(self, 'stream'):
             self.stream.stop()
             self.stream.close()
         
-        # Collect all audio data from the queue
-        while not self.audio_queue.empty():
-            self.audio_data.append(self.audio_queue.get())
+        # Collect all audio data from the queue, plus the resampler's tail
+        self._drain_queue(flush=not self.paused)
+        self.paused = False
         
         if not self.audio_data:
             print("No audio data recorded!")
             return None
         
-        # Concatenate all audio chunks
-        audio_array = np.concatenate(self.audio_data, axis=0)
-        
-        # Convert to mono if stereo
-        if len(audio_array.shape) > 1 and audio_array.shape[1] > 1:
-            audio_array = np.mean(audio_array, axis=1)
-        
-        # Flatten to 1D array
-        audio_array = audio_array.flatten()
+        # Concatenate all (already mono, resampled) audio chunks
+        audio_array = np.concatenate(self.audio_data)
         
         duration = len(audio_array) / self.sample_rate
+        RECORDED_SECONDS.inc(duration)
         print(f"⏹️  Recording stopped. Duration: {duration:.2f} seconds")
         
         return audio_array
@@ -105,4 +221,144 @@ class AudioRecorder:
     
     def is_recording(self) -> bool:
         """Check if currently recording."""
-        return self.recording
\ No newline at end of file
+        return self.recording
+
+class MultiDeviceRecorder:
+    """
+    Records from several input devices at once (e.g. microphone plus loopback).
+    
+    Each device runs its own AudioRecorder at its native format. On stop,
+    the tracks are aligned on their first-block capture times, padded to a
+    common length and mixed down for transcription. Exposes the same
+    interface as AudioRecorder so it can be used in its place.
+    """
+    
+    def __init__(self, devices: List[Union[int, str, None]], sample_rate: int = 16000):
+        """
+        Initialize the multi-device recorder.
+        
+        Args:
+            devices: sounddevice input devices to record from
+            sample_rate: Output sample rate in Hz
+        """
+        self.sample_rate = sample_rate
+        self.recorders = [AudioRecorder(sample_rate=sample_rate, device=device) for device in devices]
+        self.tracks: Optional[np.ndarray] = None
+        self.segment_start = 0
+    
+    @property
+    def recording(self) -> bool:
+        """Whether any device is recording."""
+        return any(recorder.recording for recorder in self.recorders)
+    
+    @property
+    def paused(self) -> bool:
+        """Whether the recording is paused."""
+        return any(recorder.paused for recorder in self.recorders)
+    
+    @property
+    def input_level(self) -> float:
+        """Loudest input level across devices."""
+        return max(recorder.input_level for recorder in self.recorders)
+    
+    def input_ended(self) -> bool:
+        """Device input never runs out."""
+        return False
+    
+    def start_recording(self) -> None:
+        """Start recording on every device."""
+        self.tracks = None
+        self.segment_start = 0
+        for recorder in self.recorders:
+            recorder.start_recording()
+    
+    def pause_recording(self) -> Optional[np.ndarray]:
+        """Pause every device and return the aligned mix of the segment that ended."""
+        if not self.recording or self.paused:
+            return None
+        for recorder in self.recorders:
+            recorder.pause_recording()
+        segment = self.get_buffered_audio(self.segment_start)
+        if segment is not None:
+            self.segment_start += len(segment)
+        return segment
+    
+    def resume_recording(self) -> None:
+        """Resume every device."""
+        for recorder in self.recorders:
+            recorder.resume_recording()
+    
+    def _align(self, tracks: List[Optional[np.ndarray]], starts: List[Optional[float]]) -> Optional[np.ndarray]:
+        """Pad tracks so they share a start time and length; returns (samples, tracks)."""
+        present = [(track, start) for track, start in zip(tracks, starts) if track is not None]
+        if not present:
+            return None
+        
+        earliest = min(start or 0.0 for _, start in present)
+        offsets = [int(round(((start or earliest) - earliest) * self.sample_rate)) if track is not None else 0
+                   for track, start in zip(tracks, starts)]
+        length = max(offset + (len(track) if track is not None else 0)
+                     for track, offset in zip(tracks, offsets))
+        
+        aligned = np.zeros((length, len(tracks)), dtype=np.float32)
+        for i, (track, offset) in enumerate(zip(tracks, offsets)):
+            if track is not None:
+                aligned[offset:offset + len(track), i] = track
+        return aligned
+    
+    def get_buffered_audio(self, start_sample: int = 0) -> Optional[np.ndarray]:
+        """Get the aligned mix recorded so far without stopping."""
+        tracks = [recorder.get_buffered_audio() for recorder in self.recorders]
+        aligned = self._align(tracks, [recorder.first_block_time for recorder in self.recorders])
+        if aligned is None or len(aligned) <= start_sample:
+            return None
+        return aligned[start_sample:].mean(axis=1)
+    
+    def stop_recording(self) -> Optional[np.ndarray]:
+        """
+        Stop every device and return the aligned mix.
+        
+        The aligned per-device tracks remain available in ``self.tracks``.
+        
+        Returns:
+            Mono mix as numpy array, or None if nothing was recorded
+        """
+        starts = [recorder.first_block_time for recorder in self.recorders]
+        tracks = [recorder.stop_recording() for recorder in self.recorders]
+        
+        self.tracks = self._align(tracks, starts)
+        if self.tracks is None:
+            return None
+        return self.tracks.mean(axis=1)
+    
+    def get_duration(self, audio_data: np.ndarray) -> float:
+        """Get the duration of audio data in seconds."""
+        if audio_data is None:
+            return 0.0
+        return len(audio_data) / self.sample_rate
+    
+    def is_recording(self) -> bool:
+        """Check if currently recording."""
+        return self.recording
+
+
+def create_recorder(device: Optional[Union[int, str]] = None,
+                    second_device: Optional[Union[int, str]] = None,
+                    sample_rate: int = 16000, source: Optional[InputSource] = None):
+    """
+    Create the recorder for the requested input devices.
+    
+    Args:
+        device: Primary input device, or None for the default
+        second_device: Optional second device recorded alongside (e.g. loopback)
+        sample_rate: Output sample rate in Hz
+        source: Non-device input source; devices are ignored when given
+        
+    Returns:
+        AudioRecorder, or MultiDeviceRecorder when a second device is given
+    """
+    if source is not None:
+        return AudioRecorder(sample_rate=sample_rate, source=source)
+    if second_device is not None:
+        return MultiDeviceRecorder([device, second_device], sample_rate=sample_rate)
+    return AudioRecorder(sample_rate=sample_rate, device=device)
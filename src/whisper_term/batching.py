@@ -0,0 +1,106 @@
+"""Micro-batching of transcription requests."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .transcription_engine import TranscriptionEngine
+
+
+# Sentinel telling the scheduler to exit
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Groups concurrent transcription requests into batches.
+
+    The first request of a batch starts a deadline of ``max_wait`` seconds;
+    the batch is dispatched to TranscriptionEngine.transcribe_batch when it
+    is full or the deadline passes, whichever comes first. A lone request
+    therefore waits at most ``max_wait`` longer than it would unbatched.
+    """
+
+    def __init__(self, engine: TranscriptionEngine, max_batch_size: int = 8,
+                 max_wait: float = 0.05, beam_size: Optional[int] = None):
+        """
+        Initialize the batcher and start its scheduler thread.
+
+        Args:
+            engine: Engine that runs the batches
+            max_batch_size: Largest batch to dispatch
+            max_wait: Longest time the first request of a batch waits for company
+            beam_size: Beam width passed to transcribe_batch
+        """
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.beam_size = beam_size
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio_data: np.ndarray) -> Future:
+        """
+        Queue a clip for transcription.
+
+        Args:
+            audio_data: Audio clip as numpy array
+
+        Returns:
+            Future resolving to the clip's result dictionary
+        """
+        future: Future = Future()
+        self._queue.put((audio_data, future))
+        return future
+
+    def close(self) -> None:
+        """Dispatch queued requests and stop the scheduler."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        """Gather a batch starting with ``first``; returns (batch, stop_requested)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        """Scheduler loop."""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch, stop = self._collect(first)
+            batch = [(audio, future) for audio, future in batch if future.set_running_or_notify_cancel()]
+
+            if batch:
+                try:
+                    results = self.engine.transcribe_batch(
+                        [audio for audio, _ in batch], beam_size=self.beam_size
+                    )
+                    for (_, future), result in zip(batch, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, future in batch:
+                        future.set_exception(e)
+
+            if stop:
+                return
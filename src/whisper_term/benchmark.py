@@ -0,0 +1,397 @@
+"""Benchmarks for Whisper Term's performance features."""
+
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from .compute import available_cpus, set_cpu_affinity, use_threads
+from .encoder_cache import EncoderCache
+from .file_manager import load_audio_file, to_pcm16
+from .transcription_engine import TranscriptionEngine
+
+
+def _timed(func, *args, **kwargs):
+    """Run func and return (result, seconds)."""
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def benchmark_encoder_cache(engine: TranscriptionEngine, audio: np.ndarray) -> Dict[str, Any]:
+    """
+    Compare decoder-only re-runs against full re-transcription.
+
+    Uses a throwaway cache so the first windowed pass is always cold.
+
+    Args:
+        engine: Engine to benchmark (its own cache is restored afterwards)
+        audio: Fixture audio
+
+    Returns:
+        Timings in seconds and speedups
+    """
+    engine._load_model()
+    saved_cache = engine.encoder_cache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine.encoder_cache = EncoderCache(cache_dir)
+        try:
+            _, full = _timed(engine.transcribe, audio)
+            _, cold = _timed(engine.transcribe_windows, audio)
+            # Decoder-only rerun with different options
+            _, warm = _timed(engine.transcribe_windows, audio, temperature=0.2)
+        finally:
+            engine.encoder_cache = saved_cache
+
+    return {
+        "audio_seconds": len(audio) / 16000,
+        "full_transcribe_s": full,
+        "windowed_cold_s": cold,
+        "windowed_cached_s": warm,
+        "speedup_vs_full": full / warm if warm else float("inf"),
+        "speedup_vs_cold": cold / warm if warm else float("inf"),
+    }
+
+
+def benchmark_batch(engine: TranscriptionEngine, audio: np.ndarray,
+                    clip_seconds: float = 5.0, batch_size: int = 8) -> Dict[str, Any]:
+    """
+    Compare one-at-a-time decoding of short clips with batched decoding.
+
+    Args:
+        engine: Engine to benchmark
+        audio: Fixture audio, cut into clips of clip_seconds
+        clip_seconds: Length of each clip
+        batch_size: Number of clips
+
+    Returns:
+        Timings in seconds and clips per second for both paths
+    """
+    engine._load_model()
+    step = int(clip_seconds * 16000)
+    clips = [np.roll(audio, -i * step)[:step] for i in range(batch_size)]
+
+    engine.transcribe_batch(clips[:1])  # Warm-up
+    _, sequential = _timed(lambda: [engine.transcribe_batch([clip]) for clip in clips])
+    _, batched = _timed(engine.transcribe_batch, clips)
+
+    return {
+        "clips": batch_size,
+        "clip_seconds": clip_seconds,
+        "sequential_s": sequential,
+        "batched_s": batched,
+        "sequential_clips_per_s": batch_size / sequential,
+        "batched_clips_per_s": batch_size / batched,
+        "speedup": sequential / batched,
+    }
+
+
+def _words(text: str) -> List[str]:
+    """Lower-cased words without punctuation, for WER scoring."""
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1,
+                                           previous + (ref_word != hyp_word))
+    return row[-1] / max(len(ref), 1)
+
+
+def benchmark_prompt(engine: TranscriptionEngine, audio: np.ndarray, reference: str,
+                     runs: int = 2) -> Dict[str, Any]:
+    """
+    Measure what the vocabulary / initial prompt buys and what it costs.
+
+    The fixture is transcribed with and without the engine's prompt and
+    scored against the reference transcript: word error rate, recall of
+    the vocabulary terms that occur in the reference, and decode time.
+
+    Args:
+        engine: Engine configured with a vocabulary and/or initial prompt
+        audio: Fixture audio
+        reference: Correct transcript of the fixture
+        runs: Timed runs per setting after one warm-up; the fastest is kept
+
+    Returns:
+        Accuracy and latency with and without the prompt
+
+    Raises:
+        ValueError: If the engine has no prompt
+    """
+    prompt = engine.prompt
+    if not prompt:
+        raise ValueError("Set a vocabulary or prompt to benchmark")
+
+    terms = [term for term in engine.vocabulary if term.lower() in reference.lower()]
+    results: Dict[str, Any] = {"prompt_chars": len(prompt), "terms_in_reference": len(terms)}
+    try:
+        for label, setting in (("no_prompt", None), ("prompt", prompt)):
+            engine.prompt = setting
+            engine.transcribe(audio)  # Warm-up
+            timings = []
+            for _ in range(runs):
+                result, elapsed = _timed(engine.transcribe, audio)
+                timings.append(elapsed)
+            text = result["text"]
+            results[f"{label}_wer"] = word_error_rate(reference, text)
+            if terms:
+                found = sum(term.lower() in text.lower() for term in terms)
+                results[f"{label}_term_recall"] = found / len(terms)
+            results[f"{label}_seconds"] = min(timings)
+    finally:
+        engine.prompt = prompt
+
+    results["wer_change"] = results["prompt_wer"] - results["no_prompt_wer"]
+    results["latency_cost"] = results["prompt_seconds"] / results["no_prompt_seconds"] - 1
+    return results
+
+
+def benchmark_file_loading(audio: np.ndarray, files: int = 50,
+                           clip_seconds: float = 5.0) -> Dict[str, Any]:
+    """
+    Compare the in-process WAV loader with whisper's ffmpeg loader.
+
+    Clips are written as 16 kHz mono int16 WAV, the format sessions are
+    saved in. The ffmpeg path is skipped if ffmpeg is not installed.
+
+    Args:
+        audio: Fixture audio, cut into clips of clip_seconds
+        files: Number of clip files
+        clip_seconds: Length of each clip
+
+    Returns:
+        Files per second for both paths and the speedup
+    """
+    from scipy.io import wavfile
+
+    step = int(clip_seconds * 16000)
+    results: Dict[str, Any] = {"files": files, "clip_seconds": clip_seconds}
+
+    with tempfile.TemporaryDirectory() as clip_dir:
+        paths = []
+        for i in range(files):
+            path = os.path.join(clip_dir, f"clip_{i}.wav")
+            wavfile.write(path, 16000, to_pcm16(np.roll(audio, -i * step)[:step]))
+            paths.append(path)
+
+        _, native = _timed(lambda: [load_audio_file(path) for path in paths])
+        results["native_files_per_s"] = files / native
+
+        if shutil.which("ffmpeg"):
+            import whisper
+            _, ffmpeg = _timed(lambda: [whisper.load_audio(path) for path in paths])
+            results["ffmpeg_files_per_s"] = files / ffmpeg
+            results["speedup"] = ffmpeg / native
+        else:
+            results["ffmpeg_files_per_s"] = "skipped (ffmpeg not installed)"
+
+    return results
+
+
+_worker_barrier = None
+
+
+def _thread_worker_init(barrier, threads: Optional[int], cpus: Optional[List[Set[int]]],
+                        slot_queue) -> None:
+    """Configure a benchmark process before torch starts its thread pools."""
+    global _worker_barrier
+    _worker_barrier = barrier
+    if cpus:
+        set_cpu_affinity(cpus[slot_queue.get()])
+    use_threads(threads)
+
+
+def _thread_worker_run(model_name: str, models_dir: str, audio: np.ndarray,
+                       runs: int) -> float:
+    """Decode the fixture in lockstep with the other workers; returns seconds per run."""
+    import whisper
+
+    model = whisper.load_model(model_name, download_root=models_dir)
+    options = {"language": "en", "fp16": False, "temperature": 0.0}
+    model.transcribe(audio, **options)  # Warm-up
+
+    _worker_barrier.wait()
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        model.transcribe(audio, **options)
+    return (time.perf_counter() - start_time) / runs
+
+
+def _run_engines(model_name: str, models_dir: str, audio: np.ndarray, engines: int,
+                 threads: Optional[int], pin: bool, runs: int) -> float:
+    """Run ``engines`` decoder processes at once; returns aggregate RTF (lower is better)."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(engines)
+    slots = ctx.Queue()
+    cpus = None
+    if pin:
+        # Split the available CPUs into disjoint, equal blocks
+        all_cpus = sorted(os.sched_getaffinity(0))
+        size = max(len(all_cpus) // engines, 1)
+        cpus = [set(all_cpus[i * size:(i + 1) * size]) or {all_cpus[-1]} for i in range(engines)]
+        for i in range(engines):
+            slots.put(i)
+
+    with ProcessPoolExecutor(max_workers=engines, mp_context=ctx,
+                             initializer=_thread_worker_init,
+                             initargs=(barrier, threads, cpus, slots)) as pool:
+        futures = [pool.submit(_thread_worker_run, model_name, models_dir, audio, runs)
+                   for _ in range(engines)]
+        per_run = max(future.result() for future in futures)
+
+    audio_seconds = len(audio) / 16000
+    return per_run / (audio_seconds * engines)
+
+
+def benchmark_threads(model_name: str, models_dir: str, audio: np.ndarray,
+                      engines: int = 2, runs: int = 2) -> Dict[str, Any]:
+    """
+    Find the best thread settings for single and concurrent decoding.
+
+    Each configuration runs in fresh processes, because torch thread pools
+    are process-wide and cannot be resized reliably once started.
+
+    Args:
+        model_name: Whisper model to benchmark
+        models_dir: Whisper download root
+        audio: Fixture audio
+        engines: Number of concurrent engines for the concurrent case
+        runs: Timed runs per configuration
+
+    Returns:
+        Aggregate RTF per configuration and the best settings
+    """
+    cpus = available_cpus()
+    pinning = hasattr(os, "sched_setaffinity")
+
+    results: Dict[str, Any] = {"cpus": cpus}
+
+    # Single engine: sweep powers of two up to the CPU count
+    candidates = sorted({t for t in [1, 2, 4, 8, 16, 32, 64] if t <= cpus} | {cpus})
+    single = {}
+    for threads in candidates:
+        single[threads] = _run_engines(model_name, models_dir, audio, 1, threads, False, runs)
+        results[f"single_threads={threads}_rtf"] = single[threads]
+    results["best_single_threads"] = min(single, key=single.get)
+
+    # Concurrent engines: default (oversubscribed) vs. split, with and without pinning
+    share = max(cpus // engines, 1)
+    configs = [("default", None, False), (f"threads={share}", share, False)]
+    if pinning:
+        configs.append((f"threads={share}+pinned", share, True))
+    concurrent = {}
+    for label, threads, pin in configs:
+        concurrent[label] = _run_engines(model_name, models_dir, audio, engines, threads, pin, runs)
+        results[f"{engines}_engines_{label}_rtf"] = concurrent[label]
+    results[f"best_{engines}_engines"] = min(concurrent, key=concurrent.get)
+
+    return results
+
+
+def _ingest_worker_init(barrier) -> None:
+    global _worker_barrier
+    _worker_barrier = barrier
+
+
+def _ingest_worker(data_dir: str, sessions: int) -> float:
+    """Create sessions as fast as possible in a shared data dir; returns seconds taken."""
+    import contextlib
+    import io
+
+    from .file_manager import FileManager
+    from .session_manager import SessionManager
+
+    manager = SessionManager(FileManager(data_dir))
+    audio = np.zeros(1600, dtype=np.float32)
+    _worker_barrier.wait()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(sessions):
+            session = manager.create_session(audio, f"note {os.getpid()} {i}", model_name="stress")
+            if session is None:
+                raise RuntimeError("session was not saved")
+            # Rewrite the record too, so the index needs compaction while writers run
+            manager.reindex_session(session.audio_path)
+    return time.perf_counter() - start_time
+
+
+def benchmark_ingest(writers: int = 4, sessions: int = 100) -> Dict[str, Any]:
+    """
+    Stress-test one data dir shared by parallel ingest processes.
+
+    Every writer creates sessions in the same second-resolution id space
+    and appends to the same index; afterwards the index must hold exactly
+    one record per transcript on disk and agree with a full rebuild.
+
+    Args:
+        writers: Writer processes
+        sessions: Sessions created by each writer
+
+    Returns:
+        Throughput and consistency checks
+
+    Raises:
+        RuntimeError: If the data dir is inconsistent afterwards
+    """
+    from .file_manager import FileManager
+    from .session_index import SessionIndex
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(writers)
+    expected = writers * sessions
+    results: Dict[str, Any] = {"writers": writers, "sessions": expected}
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        with ProcessPoolExecutor(max_workers=writers, mp_context=ctx,
+                                 initializer=_ingest_worker_init, initargs=(barrier,)) as pool:
+            futures = [pool.submit(_ingest_worker, data_dir, sessions)
+                       for _ in range(writers)]
+            elapsed = max(future.result() for future in futures)
+        results["sessions_per_s"] = expected / elapsed
+
+        file_manager = FileManager(data_dir)
+        transcripts = sum(1 for _ in file_manager.recordings_dir.rglob("*.txt"))
+        index = SessionIndex(file_manager.base_data_dir / "index.jsonl", file_manager.recordings_dir)
+        indexed = {record["id"]: record for record in index.records()}
+        stats = index.get_stats()
+        index.rebuild()
+        rebuilt = {record["id"]: record for record in index.records()}
+
+        results["transcripts"] = transcripts
+        results["indexed"] = len(indexed)
+        problems = []
+        if not transcripts == len(indexed) == expected:
+            problems.append(f"{expected} sessions, {transcripts} transcripts, {len(indexed)} indexed")
+        if indexed != rebuilt:
+            problems.append("index differs from a rebuild")
+        if stats != index.get_stats():
+            problems.append("storage totals differ from a rebuild")
+        if problems:
+            raise RuntimeError("; ".join(problems))
+        results["consistent"] = True
+
+    return results
+
+
+def print_report(title: str, results: Dict[str, Any]) -> None:
+    """Print benchmark results."""
+    print(f"\n📊 {title}")
+    print("-" * 40)
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"   {key}: {value:.3f}")
+        else:
+            print(f"   {key}: {value}")
@@ -0,0 +1,171 @@
+"""Content-addressed audio storage shared by identical recordings."""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Read size when hashing files that are already on disk
+_CHUNK = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_with_link(blob: Path, target: Path) -> None:
+    """Atomically make ``target`` a hard link to ``blob``."""
+    tmp_path = target.with_name(target.name + ".link")
+    try:
+        os.unlink(tmp_path)
+    except FileNotFoundError:
+        pass
+    os.link(blob, tmp_path)
+    os.replace(tmp_path, target)
+    # rename() does nothing when target already is a link to the blob
+    try:
+        os.unlink(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+class BlobStore:
+    """
+    Audio files named by the SHA-256 of their bytes, in
+    ``<data_dir>/blobs/<2 hex digits>/<sha256><suffix>``.
+
+    A session's audio file is a hard link to its blob, so everything that
+    reads session files sees an ordinary file, while retries, re-imports
+    and other identical recordings share one copy on disk. Files are only
+    ever replaced by rename, never rewritten in place, so a shared blob
+    cannot change under another session. A blob with no other link is
+    referenced by no session and is removed by collect().
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize the store.
+
+        Args:
+            root: Blob directory (created on first use)
+        """
+        self.root = Path(root)
+
+    def path(self, digest: str, suffix: str = ".wav") -> Path:
+        """Path of the blob with this digest."""
+        return self.root / digest[:2] / (digest + suffix)
+
+    def link(self, source: Path, digest: str, target: Path, suffix: str = ".wav") -> bool:
+        """
+        Make ``target`` a hard link to the blob with ``digest``, creating
+        the blob from ``source`` if it is not stored yet.
+
+        Safe against other processes storing or collecting the same blob.
+        ``source`` is left in place (it may be ``target`` itself).
+
+        Args:
+            source: Complete file whose bytes hash to ``digest``
+            digest: SHA-256 of the file
+            target: Session audio path to point at the blob
+            suffix: Audio file suffix, kept on the blob
+
+        Returns:
+            True if the content was already stored (``source`` is a duplicate)
+
+        Raises:
+            OSError: If the file system cannot hard link the files (the
+                caller keeps ``source`` as a plain copy)
+        """
+        blob = self.path(digest, suffix)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        existed = True
+        while True:
+            try:
+                _replace_with_link(blob, target)
+                return existed
+            except FileNotFoundError:
+                pass  # Not stored yet, or collected just now
+            try:
+                os.link(source, blob)
+                existed = False
+            except FileExistsError:
+                pass  # Stored concurrently; link to that copy
+
+    def adopt(self, path: Path, suffix: str, known: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Move an existing audio file into the store, or replace it with a
+        link to an identical blob.
+
+        Args:
+            path: Session audio file
+            suffix: Its audio suffix
+            known: Blob the file was saved as, if recorded; a file that is
+                still linked to it is not hashed again
+
+        Returns:
+            (digest, bytes reclaimed)
+        """
+        try:
+            if known and os.path.samefile(self.path(known, suffix), path):
+                return known, 0
+        except FileNotFoundError:
+            pass
+        stat = os.stat(path)
+        digest = hash_file(path)
+        try:
+            if os.path.samefile(self.path(digest, suffix), path):
+                return digest, 0
+        except FileNotFoundError:
+            pass
+        duplicate = self.link(path, digest, path, suffix)
+        # The old copy is freed unless something else still links to it
+        return digest, stat.st_size if duplicate and stat.st_nlink == 1 else 0
+
+    def release(self, digest: str, suffix: str = ".wav") -> int:
+        """
+        Remove one blob if no session links to it any more.
+
+        Returns:
+            Bytes freed
+        """
+        try:
+            stat = os.stat(self.path(digest, suffix))
+            if stat.st_nlink == 1:
+                os.unlink(self.path(digest, suffix))
+                return stat.st_size
+        except FileNotFoundError:
+            pass
+        return 0
+
+    def collect(self) -> Dict[str, int]:
+        """
+        Remove every blob no session links to any more. Scans the whole
+        store; when the blob is known, release() is enough.
+
+        Returns:
+            Counts of blobs removed and bytes freed
+        """
+        removed = {"blobs": 0, "bytes": 0}
+        try:
+            with os.scandir(self.root) as entries:
+                shards = [entry.path for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            return removed
+        for shard in shards:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                        if stat.st_nlink == 1 and entry.is_file():
+                            os.unlink(entry.path)
+                            removed["blobs"] += 1
+                            removed["bytes"] += stat.st_size
+                    except FileNotFoundError:
+                        pass
+        return removed
@@ -0,0 +1,247 @@
+"""Host calibration and real-time-factor based model selection."""
+
+import json
+import os
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# Models ordered from smallest/least accurate to largest/most accurate
+MODEL_ORDER = ["tiny", "base", "small", "medium", "turbo", "large"]
+
+FIXTURE_SECONDS = 10.0
+SAMPLE_RATE = 16000
+
+
+def _cpu_model() -> str:
+    """CPU model name ("model name" from /proc/cpuinfo on Linux)."""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def host_fingerprint() -> Dict[str, Any]:
+    """
+    Describe the hardware and software that affect decoding speed.
+
+    Only properties of the machine itself are included, so renaming the
+    host or running with other --threads settings keeps the profile.
+    """
+    fingerprint = {
+        "machine": platform.machine(),
+        "processor": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+        fingerprint["torch"] = torch.__version__
+        fingerprint["gpu"] = torch.cuda.get_device_name(0) if torch.cuda.is_available() else None
+    except ImportError:
+        pass
+    return fingerprint
+
+
+def _torch_threads() -> Optional[int]:
+    """Inference threads the calibration ran with (recorded, not part of the fingerprint)."""
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return None
+
+
+def make_fixture(duration: float = FIXTURE_SECONDS, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Build the fixed synthetic calibration fixture.
+
+    A deterministic, speech-like signal: harmonic stacks with a wandering
+    pitch, syllable-rate amplitude modulation and low-level noise.
+    """
+    rng = np.random.default_rng(1234)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    audio = 0.3 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    return (audio / np.max(np.abs(audio)) * 0.5).astype(np.float32)
+
+
+def cached_models(models_dir: Path) -> List[str]:
+    """
+    List model names whose checkpoints are already in the cache directory.
+
+    Args:
+        models_dir: Whisper download root
+
+    Returns:
+        Model names in MODEL_ORDER order
+    """
+    import whisper
+
+    names = []
+    for name in MODEL_ORDER:
+        url = whisper._MODELS.get(name)
+        if url and (Path(models_dir) / os.path.basename(url)).exists():
+            names.append(name)
+    return names
+
+
+def calibrate(models_dir: Path, profile_path: Path,
+              fixture: Optional[np.ndarray] = None, runs: int = 2) -> Dict[str, Any]:
+    """
+    Benchmark every cached model on the fixture and store the host profile.
+
+    Args:
+        models_dir: Whisper download root
+        profile_path: Where to write the profile JSON
+        fixture: Audio to decode (defaults to the synthetic fixture)
+        runs: Timed runs per model after one warm-up; the fastest is kept
+
+    Returns:
+        The stored profile
+    """
+    import whisper
+
+    if fixture is None:
+        fixture = make_fixture()
+    fixture_duration = len(fixture) / SAMPLE_RATE
+
+    results = {}
+    for name in cached_models(models_dir):
+        print(f"⏱️  Calibrating '{name}'...")
+        start_time = time.perf_counter()
+        model = whisper.load_model(name, download_root=str(models_dir))
+        load_time = time.perf_counter() - start_time
+
+        options = {"language": "en", "fp16": False, "temperature": 0.0}
+        model.transcribe(fixture, **options)  # Warm-up
+
+        timings = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            model.transcribe(fixture, **options)
+            timings.append(time.perf_counter() - start_time)
+
+        rtf = min(timings) / fixture_duration
+        results[name] = {"rtf": rtf, "load_time": load_time}
+        print(f"   RTF {rtf:.3f} (load {load_time:.1f}s)")
+        del model
+
+    profile = {
+        "fingerprint": host_fingerprint(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "fixture_duration": fixture_duration,
+        "threads": _torch_threads(),
+        "models": results,
+    }
+
+    profile_path = Path(profile_path)
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+
+    print(f"💾 Host profile saved: {profile_path}")
+    return profile
+
+
+def load_profile(profile_path: Path) -> Optional[Dict[str, Any]]:
+    """Load the host profile, or None if it is missing or was made on another host."""
+    try:
+        with open(profile_path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if profile.get("fingerprint") != host_fingerprint():
+        return None
+    return profile
+
+
+def select_model(profile: Dict[str, Any], expected_duration: float,
+                 target_latency: float) -> Optional[str]:
+    """
+    Pick the largest calibrated model that meets the latency target.
+
+    Args:
+        profile: Host profile from calibrate()
+        expected_duration: Expected recording length in seconds
+        target_latency: Acceptable transcription time in seconds
+
+    Returns:
+        Model name, the fastest calibrated model if none meets the target,
+        or None if the profile has no models
+    """
+    models = profile.get("models", {})
+    calibrated = [name for name in MODEL_ORDER if name in models]
+    if not calibrated:
+        return None
+
+    fitting = [name for name in calibrated
+               if models[name]["rtf"] * expected_duration <= target_latency]
+    if fitting:
+        return fitting[-1]
+    return min(calibrated, key=lambda name: models[name]["rtf"])
+
+
+class AutoModelSelector:
+    """
+    Resolves ``--model auto`` against the host profile.
+
+    The profile is re-read whenever its file changes, so a new calibration
+    takes effect without restarting long-running modes.
+    """
+
+    DEFAULT_MODEL = "base"
+
+    def __init__(self, profile_path: Path, expected_duration: float = 8.0,
+                 target_latency: float = 2.0):
+        """
+        Initialize the selector.
+
+        Args:
+            profile_path: Path of the host profile JSON
+            expected_duration: Expected recording length in seconds
+            target_latency: Acceptable transcription time in seconds
+        """
+        self.profile_path = Path(profile_path)
+        self.expected_duration = expected_duration
+        self.target_latency = target_latency
+        self._profile_mtime: Optional[float] = None
+        self._selected: Optional[str] = None
+
+    def select(self) -> str:
+        """Return the model to use, re-evaluating if the profile changed."""
+        try:
+            mtime = self.profile_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if self._selected is not None and mtime == self._profile_mtime:
+            return self._selected
+
+        self._profile_mtime = mtime
+        profile = load_profile(self.profile_path) if mtime is not None else None
+        selected = select_model(profile, self.expected_duration, self.target_latency) if profile else None
+
+        if selected is None:
+            print(f"⚠️  No host profile for this machine - using '{self.DEFAULT_MODEL}'. "
+                  f"Run 'whisper-term --calibrate' to enable automatic selection")
+            selected = self.DEFAULT_MODEL
+        elif selected != self._selected:
+            rtf = profile["models"][selected]["rtf"]
+            print(f"🤖 Auto-selected model '{selected}' "
+                  f"(~{rtf * self.expected_duration:.1f}s for a {self.expected_duration:.0f}s recording)")
+
+        self._selected = selected
+        return selected
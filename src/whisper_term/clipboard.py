@@ -1,17 +1,98 @@
 """Clipboard operations for cross-platform text copying."""
 
+import json
+import os
+import shutil
+import subprocess
 import sys
-from typing import Optional
+from pathlib import Path
+from typing import List, Optional
+
+
+# Copy commands per display server, in order of preference
+_COPY_COMMANDS = {
+    "darwin": [["pbcopy"]],
+    "wayland": [["wl-copy"]],
+    "x11": [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]],
+    "wsl": [["clip.exe"]],
+}
+
+
+def _environment() -> Optional[str]:
+    """The display environment that decides the copy command, or None for pyperclip."""
+    if sys.platform == "darwin":
+        return "darwin"
+    if sys.platform.startswith("linux"):
+        if os.environ.get("WAYLAND_DISPLAY"):
+            return "wayland"
+        if os.environ.get("DISPLAY"):
+            return "x11"
+        if "microsoft" in os.uname().release.lower():
+            return "wsl"
+    return None
+
+
+def detect_copy_command(cache_path: Optional[Path] = None) -> Optional[List[str]]:
+    """
+    Find the clipboard copy command, remembering the answer across runs.
+
+    The cache is keyed by display environment and revalidated with a
+    single access() check, so later runs skip probing PATH for every
+    candidate.
+
+    Args:
+        cache_path: JSON file to cache the detected command in
+
+    Returns:
+        Command line with an absolute executable path, or None to use pyperclip
+    """
+    environment = _environment()
+    if environment is None:
+        return None
+
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            command = cached.get("command")
+            if cached.get("environment") == environment and \
+                    (command is None or os.access(command[0], os.X_OK)):
+                return command
+        except (OSError, ValueError):
+            pass
+
+    command = None
+    for candidate in _COPY_COMMANDS[environment]:
+        executable = shutil.which(candidate[0])
+        if executable:
+            command = [executable] + candidate[1:]
+            break
+
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"environment": environment, "command": command}, f)
+        except OSError:
+            pass
+    return command
 
 
 class ClipboardManager:
     """Handles clipboard operations across platforms."""
-    
-    def __init__(self):
-        """Initialize clipboard manager."""
+
+    def __init__(self, cache_path: Optional[Path] = None):
+        """
+        Initialize clipboard manager.
+
+        Args:
+            cache_path: File caching the detected copy command between runs
+        """
         self._pyperclip = None
-        self._load_pyperclip()
-    
+        self._command = detect_copy_command(cache_path)
+        if self._command is None:
+            self._load_pyperclip()
+
     def _load_pyperclip(self) -> None:
         """Load pyperclip library with fallback handling."""
         try:
@@ -23,47 +104,59 @@ class ClipboardManager:
         except Exception as e:
             print(f"⚠️  Failed to load clipboard support: {e}")
             self._pyperclip = None
-    
+
     def copy_to_clipboard(self, text: str) -> bool:
         """
         Copy text to clipboard.
-        
+
         Args:
             text: Text to copy to clipboard
-            
+
         Returns:
             True if successful, False otherwise
         """
         if not text:
             return False
-        
+
+        if self._command is not None:
+            try:
+                # xclip and wl-copy fork to own the selection; the parent exits at once
+                subprocess.run(self._command, input=text.encode("utf-8"), timeout=5,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                return True
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"⚠️  Failed to copy to clipboard: {e}")
+                return False
+
         if self._pyperclip is None:
             print("⚠️  Clipboard not available - text not copied")
             return False
-        
+
         try:
             self._pyperclip.copy(text)
             return True
         except Exception as e:
             print(f"⚠️  Failed to copy to clipboard: {e}")
             return False
-    
+
     def get_from_clipboard(self) -> Optional[str]:
         """
         Get text from clipboard.
-        
+
         Returns:
             Text from clipboard or None if failed
         """
+        if self._pyperclip is None:
+            self._load_pyperclip()
         if self._pyperclip is None:
             return None
-        
+
         try:
             return self._pyperclip.paste()
         except Exception as e:
             print(f"⚠️  Failed to read from clipboard: {e}")
             return None
-    
+
     def is_available(self) -> bool:
         """Check if clipboard functionality is available."""
-        return self._pyperclip is not None
\ No newline at end of file
+        return self._command is not None or self._pyperclip is not None
@@ -0,0 +1,112 @@
+"""Compute thread and CPU affinity configuration for inference."""
+
+import os
+import threading
+from typing import Optional, Set
+
+# Intra-op thread count chosen for this process (torch's setting is process-wide)
+_process_threads: Optional[int] = None
+_threads_lock = threading.Lock()
+
+
+def parse_cpu_list(spec: str) -> Set[int]:
+    """
+    Parse a CPU list such as "0-3,6,8-9".
+
+    Args:
+        spec: Comma-separated CPU indices and inclusive ranges
+
+    Returns:
+        Set of CPU indices
+    """
+    cpus: Set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-", 1)
+            cpus.update(range(int(low), int(high) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def set_cpu_affinity(cpus: Set[int]) -> bool:
+    """
+    Pin this process to a set of CPUs.
+
+    Must run before torch starts its thread pools so the pool threads
+    inherit the mask.
+
+    Args:
+        cpus: CPU indices to allow
+
+    Returns:
+        True if the affinity was applied
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        print("⚠️  CPU affinity is not supported on this platform")
+        return False
+    try:
+        os.sched_setaffinity(0, cpus)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Failed to set CPU affinity: {e}")
+        return False
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def set_interop_threads(interop_threads: Optional[int]) -> None:
+    """
+    Set torch's inter-op thread count.
+
+    Torch only accepts this before any parallel work has run, so later
+    calls are ignored with a warning.
+    """
+    if not interop_threads:
+        return
+
+    import torch
+
+    if torch.get_num_interop_threads() == interop_threads:
+        return
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        print("⚠️  Inter-op threads can only be set before inference starts - ignoring")
+
+
+def use_threads(num_threads: Optional[int]) -> None:
+    """
+    Set torch's intra-op (BLAS/OpenMP) thread count for this process.
+
+    The setting is process-wide, so engines running in different threads
+    of one process (server pool, live and full passes) share it; switching
+    it per engine would race, with the last writer winning. The first
+    explicit setting is therefore kept for the life of the process and
+    conflicting later requests are ignored with a warning. Code that needs
+    different counts (the thread benchmark) runs separate processes.
+    """
+    global _process_threads
+    if not num_threads:
+        return
+
+    with _threads_lock:
+        if _process_threads is not None:
+            if _process_threads != num_threads:
+                print(f"⚠️  Inference already uses {_process_threads} threads in this process - "
+                      f"ignoring {num_threads}")
+            return
+
+        import torch
+
+        if torch.get_num_threads() != num_threads:
+            torch.set_num_threads(num_threads)
+        _process_threads = num_threads
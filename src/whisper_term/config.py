@@ -0,0 +1,233 @@
+"""Typed configuration with named profiles, loaded once at startup."""
+
+import dataclasses
+import sys
+import typing
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+
+# Searched in order when no --config is given
+CONFIG_PATHS = [
+    Path("whisper-term.toml"),
+    Path.home() / ".config" / "whisper-term" / "config.toml",
+]
+
+
+@dataclass
+class Config:
+    """
+    Effective settings for one run of Whisper Term.
+
+    Resolved as built-in defaults, then top-level keys of the config file,
+    then the selected profile, then explicit command line flags.
+    """
+
+    # Model
+    model: str = "base"
+    language: str = "english"
+    language_pinning: bool = True
+    user: Optional[str] = None
+    target_latency: float = 2.0
+    expected_duration: float = 8.0
+    model_variant: Optional[str] = None
+    offline: bool = False
+
+    # Compute
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    cpu_affinity: Optional[str] = None
+
+    # Capture
+    device: Union[int, str, None] = None
+    second_device: Union[int, str, None] = None
+
+    # Streaming (live partial transcription)
+    live: bool = False
+    live_interval: float = 1.0
+    live_commit_margin: float = 2.0
+    live_max_window: float = 30.0
+
+    # Diarization
+    diarize: bool = False
+    num_speakers: Optional[int] = None
+
+    # Decoding
+    decode_guard: bool = True
+    encoder_cache_mb: int = 1024
+    batch_size: int = 8
+    beam_size: Optional[int] = None
+
+    # Prompt biasing: comma-separated domain terms and a free-form prompt
+    vocabulary: Optional[str] = None
+    initial_prompt: Optional[str] = None
+    rolling_prompt: bool = True
+
+    # Output and storage
+    clipboard: bool = True
+    outputs: Optional[str] = None
+    output_command: Optional[str] = None
+    output_partials: bool = False
+    data_dir: str = "data"
+
+    # Retention (audio only; transcripts and metadata are kept)
+    audio_codec: str = "flac"
+    retention_compress_days: Optional[float] = None
+    retention_delete_days: Optional[float] = None
+    retention_max_mb: Optional[float] = None
+    retention_interval: float = 3600.0
+
+    # HTTP server (--serve)
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_engines: int = 1
+    server_queue: int = 16
+    server_max_upload_mb: float = 100.0
+    server_save_sessions: bool = True
+
+    # Metrics export (interactive app and --serve)
+    metrics_port: Optional[int] = None
+    metrics_file: Optional[str] = None
+    metrics_interval: float = 15.0
+
+    # Provenance, for --show-config
+    profile: Optional[str] = field(default=None, compare=False)
+    source: Optional[str] = field(default=None, compare=False)
+
+    def with_overrides(self, **overrides: Any) -> "Config":
+        """Return a copy with the given settings replaced, ignoring None values."""
+        changes = {name: _check(name, value) for name, value in overrides.items()
+                   if value is not None}
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Settings as a dictionary (provenance fields excluded)."""
+        return {name: getattr(self, name) for name in _SETTINGS}
+
+
+# Profiles available without a config file; a file may override or extend them
+BUILTIN_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "model": "tiny",
+        "live_interval": 0.5,
+        "encoder_cache_mb": 0,
+    },
+    "accurate": {
+        "model": "small",
+        "beam_size": 5,
+    },
+    "meeting": {
+        "model": "base",
+        "diarize": True,
+        "live": True,
+        "live_max_window": 20.0,
+    },
+}
+
+_SETTINGS = [f.name for f in fields(Config) if f.name not in ("profile", "source")]
+_TYPES = typing.get_type_hints(Config)
+
+
+def _check(name: str, value: Any) -> Any:
+    """Validate one setting against the Config field type."""
+    if name not in _TYPES or name in ("profile", "source"):
+        raise ValueError(f"Unknown setting '{name}'")
+
+    expected = _TYPES[name]
+    allowed = typing.get_args(expected) if typing.get_origin(expected) is Union else (expected,)
+    if value is None and type(None) in allowed:
+        return value
+    if float in allowed and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    for kind in allowed:
+        if kind is not type(None) and isinstance(value, kind) and \
+                not (kind is int and isinstance(value, bool)):
+            return value
+
+    names = " or ".join(kind.__name__ for kind in allowed if kind is not type(None))
+    raise ValueError(f"Setting '{name}' must be {names}, got {value!r}")
+
+
+def _apply(config: Config, table: Dict[str, Any], where: str) -> Config:
+    """Apply a table of settings, naming its location in errors."""
+    try:
+        return dataclasses.replace(config, **{name: _check(name, value)
+                                              for name, value in table.items()})
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}") from None
+
+
+def find_config_file() -> Optional[Path]:
+    """First existing file from CONFIG_PATHS, or None."""
+    for path in CONFIG_PATHS:
+        if path.is_file():
+            return path
+    return None
+
+
+def load_config(path: Optional[Path] = None, profile: Optional[str] = None) -> Config:
+    """
+    Load the configuration file and resolve a profile.
+
+    Args:
+        path: Config file, or None to search CONFIG_PATHS
+        profile: Profile to apply on top of the top-level settings
+
+    Returns:
+        Resolved configuration
+
+    Raises:
+        ValueError: If the file or profile is invalid
+        FileNotFoundError: If an explicit path does not exist
+    """
+    if path is None:
+        path = find_config_file()
+
+    data: Dict[str, Any] = {}
+    if path is not None:
+        with open(path, "rb") as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"{path}: {e}") from None
+
+    profiles = {name: dict(table) for name, table in BUILTIN_PROFILES.items()}
+    file_profiles = data.pop("profiles", {})
+    if not isinstance(file_profiles, dict):
+        raise ValueError(f"{path}: 'profiles' must be a table")
+    for name, table in file_profiles.items():
+        if not isinstance(table, dict):
+            raise ValueError(f"{path}: profile '{name}' must be a table")
+        profiles.setdefault(name, {}).update(table)
+
+    config = _apply(Config(), data, str(path))
+
+    if profile is not None:
+        if profile not in profiles:
+            raise ValueError(f"Unknown profile '{profile}' (available: {', '.join(sorted(profiles))})")
+        config = _apply(config, profiles[profile], f"profile '{profile}'")
+
+    return dataclasses.replace(config, profile=profile, source=str(path) if path else None)
+
+
+def format_config(config: Config) -> str:
+    """Render the effective settings as TOML."""
+    lines = [f"# source: {config.source or 'built-in defaults'}"]
+    if config.profile:
+        lines.append(f"# profile: {config.profile}")
+    for name, value in config.to_dict().items():
+        if value is None:
+            lines.append(f"# {name} = (unset)")
+        elif isinstance(value, bool):
+            lines.append(f"{name} = {'true' if value else 'false'}")
+        elif isinstance(value, str):
+            lines.append(f'{name} = "{value}"')
+        else:
+            lines.append(f"{name} = {value}")
+    return "\n".join(lines)
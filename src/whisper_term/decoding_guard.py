@@ -0,0 +1,211 @@
+"""Early abort of runaway Whisper decodes (repetition loops and silence)."""
+
+import dataclasses
+from typing import Dict, List, Optional, Sequence
+
+import torch
+import whisper
+from whisper.decoding import DecodingOptions, DecodingTask, LogitFilter
+from whisper.utils import compression_ratio
+
+
+def find_repetition(tokens: Sequence[int], max_period: int = 8, min_span: int = 12,
+                    min_repeats: int = 3) -> Optional[int]:
+    """
+    Find a loop at the end of a token sequence.
+
+    A loop is a pattern of up to ``max_period`` tokens repeated back to
+    back at least ``min_repeats`` times and covering at least
+    ``min_span`` tokens.
+
+    Args:
+        tokens: Token sequence
+        max_period: Longest repeated pattern to look for
+        min_span: Shortest looping tail that counts
+        min_repeats: Fewest repetitions that count
+
+    Returns:
+        Index where the redundant copies start (the first copy is kept), or None
+    """
+    n = len(tokens)
+    for period in range(1, max_period + 1):
+        span = period * max(min_repeats, -(-min_span // period))
+        if span > n:
+            continue
+        start = n - span
+        if all(tokens[start + i] == tokens[start + i % period] for i in range(period, span)):
+            # Include earlier copies of the pattern in the loop
+            while start >= period and tokens[start - period:start] == tokens[start:start + period]:
+                start -= period
+            return start + period
+    return None
+
+
+class RepetitionGuard(LogitFilter):
+    """
+    Logit filter that ends a sequence with EOT as soon as it loops, or once
+    it is clearly decoding noise: low average log-probability in a window
+    the model already rates as probably silent.
+
+    Appended after Whisper's own filters, so it sees the final logits.
+    """
+
+    def __init__(self, task: DecodingTask, max_period: int = 8, min_span: int = 12,
+                 logprob_threshold: float = -1.0, no_speech_threshold: float = 0.6,
+                 min_tokens: int = 8):
+        self.eot = task.tokenizer.eot
+        self.sample_begin = task.sample_begin
+        self.n_group = task.n_group
+        # Beam search reorders rows between steps, so running log-probs are only
+        # tracked for greedy and best-of sampling
+        self.track_logprobs = task.options.beam_size is None
+        self.max_period = max_period
+        self.min_span = min_span
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.min_tokens = min_tokens
+
+        self.no_speech_probs: Optional[torch.Tensor] = None
+        self.no_speech_audio: set = set()
+        self._sum_logprobs: Optional[torch.Tensor] = None
+        self._last_logprobs: Optional[torch.Tensor] = None
+
+    def apply(self, logits: torch.Tensor, tokens: torch.Tensor) -> None:
+        n_sampled = tokens.shape[1] - self.sample_begin
+        stop = []
+
+        if self.track_logprobs:
+            if self._sum_logprobs is None:
+                self._sum_logprobs = torch.zeros(tokens.shape[0], device=logits.device)
+            elif n_sampled > 0 and self._last_logprobs is not None:
+                last = tokens[:, -1]
+                chosen = self._last_logprobs.gather(1, last.unsqueeze(1)).squeeze(1)
+                self._sum_logprobs += torch.where(last == self.eot, torch.zeros_like(chosen), chosen)
+
+        rows = tokens[:, self.sample_begin:].tolist()
+        for row, sampled in enumerate(rows):
+            if sampled and sampled[-1] == self.eot:
+                continue
+            text = [t for t in sampled if t < self.eot]
+
+            if find_repetition(text, self.max_period, self.min_span) is not None:
+                stop.append(row)
+            elif (self.track_logprobs and self.no_speech_probs is not None
+                  and n_sampled >= self.min_tokens
+                  and self.no_speech_probs[row] > self.no_speech_threshold
+                  and self._sum_logprobs[row] / n_sampled < self.logprob_threshold):
+                stop.append(row)
+                self.no_speech_audio.add(row // self.n_group)
+
+        if stop:
+            logits[stop] = -float("inf")
+            logits[stop, self.eot] = 0
+
+        if self.track_logprobs:
+            self._last_logprobs = torch.log_softmax(logits.float(), dim=-1)
+
+
+class GuardedDecoder:
+    """
+    Drop-in replacement for ``model.decode`` that runs each decode with a
+    RepetitionGuard.
+
+    ``model.transcribe`` calls ``model.decode`` once per segment and
+    temperature, so installing this on the model instance guards every
+    fallback attempt too: a looping attempt ends early instead of running
+    to the full sample length. Looping tails are trimmed to one copy so
+    the fallback checks see the text the user will see.
+    """
+
+    def __init__(self, model: "whisper.model.Whisper", **guard_options):
+        """
+        Initialize the decoder.
+
+        Args:
+            model: Whisper model the decoder belongs to
+            **guard_options: RepetitionGuard thresholds
+        """
+        self.model = model
+        self.guard_options = guard_options
+        self.hits: Dict[str, int] = {"repetition": 0, "no_speech": 0}
+        self.last_hits: List[List[str]] = []
+
+    def reset(self) -> Dict[str, int]:
+        """Return the hit counts since the last reset and clear them."""
+        hits, self.hits = self.hits, {"repetition": 0, "no_speech": 0}
+        return hits
+
+    @torch.no_grad()
+    def __call__(self, mel: torch.Tensor, options: DecodingOptions = DecodingOptions(),
+                 **kwargs):
+        if kwargs:
+            options = dataclasses.replace(options, **kwargs)
+
+        single = mel.ndim == 2
+        if single:
+            mel = mel.unsqueeze(0)
+
+        task = DecodingTask(self.model, options)
+        guard = RepetitionGuard(task, **self.guard_options)
+        task.logit_filters.append(guard)
+
+        # Capture the no-speech probability the task computes on its first step
+        inference_logits = task.inference.logits
+
+        def logits(tokens, audio_features):
+            output = inference_logits(tokens, audio_features)
+            if guard.no_speech_probs is None and task.tokenizer.no_speech is not None:
+                probs = output[:, task.sot_index].float().softmax(dim=-1)
+                guard.no_speech_probs = probs[:, task.tokenizer.no_speech]
+            return output
+
+        task.inference.logits = logits
+
+        results = task.run(mel)
+
+        self.last_hits = []
+        for audio, result in enumerate(results):
+            hits = []
+            trimmed = self._trim(task, result)
+            if trimmed is not result:
+                hits.append("repetition")
+                results[audio] = trimmed
+            if audio in guard.no_speech_audio:
+                hits.append("no_speech")
+            for hit in hits:
+                self.hits[hit] += 1
+            self.last_hits.append(hits)
+
+        return results[0] if single else results
+
+    def _trim(self, task: DecodingTask, result):
+        """Cut a looping tail down to one copy, recomputing text and compression ratio."""
+        eot = task.tokenizer.eot
+        positions = [i for i, t in enumerate(result.tokens) if t < eot]
+        cut = find_repetition([result.tokens[i] for i in positions],
+                              self.guard_options.get("max_period", 8),
+                              self.guard_options.get("min_span", 12))
+        if cut is None:
+            return result
+
+        tokens = result.tokens[:positions[cut]]
+        text = task.tokenizer.decode([t for t in tokens if t < eot]).strip()
+        return dataclasses.replace(
+            result, tokens=tokens, text=text, compression_ratio=compression_ratio(text)
+        )
+
+
+def install_guard(model: "whisper.model.Whisper", **guard_options) -> GuardedDecoder:
+    """
+    Guard all decodes of a model instance.
+
+    Args:
+        model: Loaded Whisper model
+        **guard_options: RepetitionGuard thresholds
+
+    Returns:
+        The installed decoder, for reading hit counts
+    """
+    decoder = GuardedDecoder(model, **guard_options)
+    model.decode = decoder
+    return decoder
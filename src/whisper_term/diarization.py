@@ -0,0 +1,357 @@
+"""CPU speaker diarization for meeting recordings."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.fft import dct
+
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400  # 25 ms
+HOP_LENGTH = 160    # 10 ms
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 20
+
+
+def _mel_filterbank(sample_rate: int = SAMPLE_RATE, n_fft: int = N_FFT,
+                    n_mels: int = N_MELS) -> np.ndarray:
+    """Triangular mel filterbank of shape (n_mels, n_fft // 2 + 1)."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(n_mels):
+        left, center, right = bins[i], bins[i + 1], bins[i + 2]
+        if center > left:
+            bank[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+_MEL_BANK = _mel_filterbank()
+_WINDOW = np.hanning(FRAME_LENGTH).astype(np.float32)
+
+
+def _frames(audio: np.ndarray) -> np.ndarray:
+    """Split audio into overlapping 25 ms frames (a strided view)."""
+    if len(audio) < FRAME_LENGTH:
+        audio = np.pad(audio, (0, FRAME_LENGTH - len(audio)))
+    return np.lib.stride_tricks.sliding_window_view(audio, FRAME_LENGTH)[::HOP_LENGTH]
+
+
+def mfcc(audio: np.ndarray) -> np.ndarray:
+    """Compute MFCCs (without c0) of shape (frames, N_MFCC - 1)."""
+    spectrum = np.abs(np.fft.rfft(_frames(audio) * _WINDOW, n=N_FFT)) ** 2
+    log_mel = np.log(spectrum @ _MEL_BANK.T + 1e-10)
+    return dct(log_mel, type=2, norm="ortho", axis=1)[:, 1:N_MFCC]
+
+
+def detect_speech(audio: np.ndarray, min_speech: float = 0.4, min_gap: float = 0.3,
+                  max_segment: float = 3.0) -> List[Tuple[float, float]]:
+    """
+    Energy-based voice activity detection.
+
+    Args:
+        audio: Mono audio at 16 kHz
+        min_speech: Drop speech regions shorter than this, in seconds
+        min_gap: Merge regions separated by less than this, in seconds
+        max_segment: Split regions longer than this so speaker turns can be found
+
+    Returns:
+        List of (start, end) times in seconds
+    """
+    if len(audio) < FRAME_LENGTH:
+        return []
+
+    frames = _frames(audio)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    threshold = max(np.percentile(energy_db, 10) + 12.0, -50.0)
+    speech = energy_db > threshold
+
+    # Rising/falling edges of the speech mask
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * HOP_LENGTH / SAMPLE_RATE
+    ends = np.flatnonzero(edges == -1) * HOP_LENGTH / SAMPLE_RATE
+
+    regions: List[List[float]] = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    segments = []
+    for start, end in regions:
+        if end - start < min_speech:
+            continue
+        pieces = max(int(np.ceil((end - start) / max_segment)), 1)
+        bounds = np.linspace(start, end, pieces + 1)
+        segments.extend(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+    return segments
+
+
+def extract_embedding(audio: np.ndarray) -> np.ndarray:
+    """
+    Compute a speaker embedding for one speech segment.
+
+    Mean and standard deviation of the segment's MFCCs, L2-normalized.
+    """
+    features = mfcc(audio)
+    embedding = np.concatenate((features.mean(axis=0), features.std(axis=0)))
+    return (embedding / (np.linalg.norm(embedding) + 1e-10)).astype(np.float32)
+
+
+def kmeans(embeddings: np.ndarray, num_clusters: int, iterations: int = 20,
+           seed: int = 0) -> np.ndarray:
+    """
+    Cluster embeddings with k-means++ initialized k-means (O(n·k) per step).
+
+    Returns:
+        Cluster label per embedding
+    """
+    n = len(embeddings)
+    num_clusters = min(num_clusters, n)
+    rng = np.random.default_rng(seed)
+
+    centroids = [embeddings[rng.integers(n)]]
+    for _ in range(1, num_clusters):
+        dist = np.min([np.sum((embeddings - c) ** 2, axis=1) for c in centroids], axis=0)
+        total = dist.sum()
+        probs = dist / total if total > 0 else np.full(n, 1.0 / n)
+        centroids.append(embeddings[rng.choice(n, p=probs)])
+    centroids = np.array(centroids)
+
+    labels = None
+    for _ in range(iterations):
+        dist = ((embeddings[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        new_labels = dist.argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for k in range(num_clusters):
+            members = embeddings[labels == k]
+            if len(members):
+                centroids[k] = members.mean(axis=0)
+    return labels
+
+
+class IncrementalDiarizer:
+    """
+    Online speaker diarization over audio windows.
+
+    Each window is run through VAD and embedding extraction once, and each
+    segment is assigned to the nearest speaker centroid (or starts a new
+    speaker) in O(speakers) time. Long recordings never trigger a pass
+    over all previous segments. Embeddings are kept so that the recording
+    can be re-clustered for a fixed speaker count without recomputing them.
+    """
+
+    def __init__(self, max_speakers: int = 8, threshold: float = 0.93):
+        """
+        Initialize the diarizer.
+
+        Args:
+            max_speakers: Upper bound on the number of speakers
+            threshold: Cosine similarity needed to join an existing speaker
+        """
+        self.max_speakers = max_speakers
+        self.threshold = threshold
+        self.times: List[Tuple[float, float]] = []
+        self.embeddings: List[np.ndarray] = []
+        self.labels: List[int] = []
+        self._centroids: List[np.ndarray] = []
+        self._counts: List[int] = []
+
+    def process_window(self, audio: np.ndarray, offset: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Diarize the next window of a recording.
+
+        Args:
+            audio: Mono 16 kHz audio for this window
+            offset: Start time of the window within the recording, in seconds
+
+        Returns:
+            Speaker turns found in this window
+        """
+        turns = []
+        for start, end in detect_speech(audio):
+            segment = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            embedding = extract_embedding(segment)
+            label = self._assign(embedding)
+
+            self.times.append((offset + start, offset + end))
+            self.embeddings.append(embedding)
+            self.labels.append(label)
+            turns.append({"start": offset + start, "end": offset + end, "speaker": label})
+        return turns
+
+    def _assign(self, embedding: np.ndarray) -> int:
+        """Assign an embedding to a speaker, updating that speaker's centroid."""
+        if self._centroids:
+            sims = [float(np.dot(embedding, c) / (np.linalg.norm(c) + 1e-10)) for c in self._centroids]
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold or len(self._centroids) >= self.max_speakers:
+                self._counts[best] += 1
+                self._centroids[best] += (embedding - self._centroids[best]) / self._counts[best]
+                return best
+
+        self._centroids.append(embedding.copy())
+        self._counts.append(1)
+        return len(self._centroids) - 1
+
+    def turns(self) -> List[Dict[str, Any]]:
+        """All speaker turns found so far."""
+        return [{"start": start, "end": end, "speaker": label}
+                for (start, end), label in zip(self.times, self.labels)]
+
+
+def diarize(audio: np.ndarray, window: float = 30.0,
+            diarizer: Optional[IncrementalDiarizer] = None) -> IncrementalDiarizer:
+    """
+    Diarize a full recording window by window.
+
+    Args:
+        audio: Mono 16 kHz audio
+        window: Window length in seconds
+        diarizer: Diarizer to continue with, or None for a new one
+
+    Returns:
+        The diarizer holding turns and cached embeddings
+    """
+    diarizer = diarizer or IncrementalDiarizer()
+    step = int(window * SAMPLE_RATE)
+    for start in range(0, len(audio), step):
+        diarizer.process_window(audio[start:start + step], offset=start / SAMPLE_RATE)
+    return diarizer
+
+
+def recluster(times: List[Tuple[float, float]], embeddings: np.ndarray,
+              num_speakers: int) -> List[Dict[str, Any]]:
+    """
+    Relabel cached embeddings for a fixed number of speakers.
+
+    Args:
+        times: (start, end) of each embedded segment
+        embeddings: Cached embeddings, one row per segment
+        num_speakers: Desired speaker count
+
+    Returns:
+        Speaker turns
+    """
+    if len(embeddings) == 0:
+        return []
+    labels = kmeans(np.asarray(embeddings), num_speakers)
+
+    # Number speakers by first appearance so labels read naturally
+    order: Dict[int, int] = {}
+    for label in labels:
+        order.setdefault(int(label), len(order))
+    return [{"start": start, "end": end, "speaker": order[int(label)]}
+            for (start, end), label in zip(times, labels)]
+
+
+def label_segments(segments: List[Dict[str, Any]],
+                   turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Label transcription segments with the speaker they overlap most.
+
+    Both lists are in time order, so one sweep over the turns serves every
+    segment: turns that end before a segment starts are never needed again.
+
+    Args:
+        segments: Whisper segments with "start", "end" and "text", by start
+        turns: Speaker turns from diarization
+
+    Returns:
+        Compact segments with "start", "end", "speaker" and "text"
+    """
+    # Already sorted when they come from diarization; cheap to make sure
+    turns = sorted(turns, key=lambda turn: turn["start"])
+    labelled = []
+    first = 0
+    for segment in segments:
+        while first < len(turns) and turns[first]["end"] <= segment["start"]:
+            first += 1
+        overlap: Dict[int, float] = {}
+        for index in range(first, len(turns)):
+            turn = turns[index]
+            if turn["start"] >= segment["end"]:
+                break
+            shared = min(segment["end"], turn["end"]) - max(segment["start"], turn["start"])
+            if shared > 0:
+                overlap[turn["speaker"]] = overlap.get(turn["speaker"], 0.0) + shared
+        speaker = max(overlap, key=overlap.get) if overlap else None
+        labelled.append({
+            "start": round(float(segment["start"]), 2),
+            "end": round(float(segment["end"]), 2),
+            "speaker": speaker,
+            "text": segment["text"].strip(),
+        })
+    return labelled
+
+
+def diarize_result(audio: np.ndarray, result: Dict[str, Any],
+                   num_speakers: Optional[int] = None) -> Tuple[IncrementalDiarizer, List[Dict[str, Any]]]:
+    """
+    Diarize a recording and label its transcription segments.
+
+    Args:
+        audio: Mono 16 kHz audio
+        result: Transcription result with "segments"
+        num_speakers: Fixed speaker count, or None to discover speakers online
+
+    Returns:
+        Tuple of (diarizer with cached embeddings, labelled segments)
+    """
+    diarizer = diarize(audio)
+    turns = diarizer.turns()
+    if num_speakers:
+        turns = recluster(diarizer.times, np.array(diarizer.embeddings), num_speakers)
+    return diarizer, label_segments(result.get("segments", []), turns)
+
+
+def count_speakers(labelled: List[Dict[str, Any]]) -> int:
+    """Number of distinct speakers in labelled segments."""
+    return len({segment["speaker"] for segment in labelled if segment["speaker"] is not None})
+
+
+def format_labelled(labelled: List[Dict[str, Any]]) -> str:
+    """Render labelled segments as a speaker-annotated transcript."""
+    lines = []
+    for segment in labelled:
+        speaker = f"S{segment['speaker'] + 1}" if segment["speaker"] is not None else "S?"
+        if lines and lines[-1][0] == speaker:
+            lines[-1][1].append(segment["text"])
+        else:
+            lines.append((speaker, [segment["text"]]))
+    return "\n".join(f"[{speaker}] {' '.join(texts)}" for speaker, texts in lines)
+
+
+def save_embeddings(path: Path, checksum: str, diarizer: IncrementalDiarizer) -> None:
+    """Cache a recording's segment embeddings, keyed by its audio checksum."""
+    np.savez_compressed(
+        path,
+        checksum=np.array(checksum),
+        times=np.array(diarizer.times, dtype=np.float32).reshape(-1, 2),
+        embeddings=np.array(diarizer.embeddings, dtype=np.float32).reshape(len(diarizer.embeddings), -1),
+    )
+
+
+def load_embeddings(path: Path, checksum: str) -> Optional[Tuple[List[Tuple[float, float]], np.ndarray]]:
+    """Load cached embeddings, or None if missing or made for different audio."""
+    try:
+        with np.load(path) as data:
+            if str(data["checksum"]) != checksum:
+                return None
+            return [tuple(t) for t in data["times"].tolist()], data["embeddings"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
@@ -4,38 +4,43 @@ import sys
 from datetime import datetime
 from typing import Optional
 
-from .audio_recorder import AudioRecorder
+from .audio_recorder import create_recorder
+from .config import Config
+from .input_sources import InputSource
 from .transcription_engine import TranscriptionEngine
 from .file_manager import FileManager
 from .session_manager import SessionManager
-from .clipboard import ClipboardManager
+from .output_sinks import create_router
+from .diarization import diarize_result, format_labelled, count_speakers
 
 
 class DirectModeHandler:
     """Handles direct CLI mode without interactive interface."""
     
-    def __init__(self, model_name: str = "base", language: str = "english", 
-                 clipboard_enabled: bool = True):
+    def __init__(self, config: Optional[Config] = None, source: Optional[InputSource] = None):
         """
         Initialize direct mode handler.
         
         Args:
-            model_name: Whisper model to use
-            language: Language for transcription
-            clipboard_enabled: Whether to copy to clipboard
+            config: Effective settings (defaults if None)
+            source: Record from this input source (stdin, pipe, WAV replay)
+                instead of the configured devices
         """
-        self.model_name = model_name
-        self.language = language
-        self.clipboard_enabled = clipboard_enabled
-        self.clipboard_manager = ClipboardManager() if clipboard_enabled else None
+        config = config or Config()
+        self.config = config
+        self.model_name = config.model
+        self.language = config.language
+        self.diarize = config.diarize
+        self.num_speakers = config.num_speakers
+        # Copies to the clipboard unless other outputs are configured
+        self.outputs = create_router(config, default_clipboard=True)
         
         # Initialize components
-        self.audio_recorder = AudioRecorder(sample_rate=16000, channels=1)
-        self.transcription_engine = TranscriptionEngine(
-            model_name=model_name, 
-            language=language
-        )
-        self.file_manager = FileManager()
+        self.source = source
+        self.audio_recorder = create_recorder(config.device, config.second_device,
+                                              sample_rate=16000, source=source)
+        self.transcription_engine = TranscriptionEngine.from_config(config)
+        self.file_manager = FileManager(config.data_dir)
         self.session_manager = SessionManager(self.file_manager)
     
     def run_direct_recording(self) -> bool:
@@ -50,22 +55,32 @@ class DirectModeHandler:
             print("=" * 30)
             
             # Load model
-            print(f"\n🔄 Loading model '{self.model_name}'...")
+            print(f"\n🔄 Loading model '{self.transcription_engine.model_name}'...")
             # Model loading happens during first transcription
             
-            # Start recording
-            print("\n🎤 Recording... Press ENTER to stop")
-            print("   Press Ctrl+C to cancel")
-            
-            self.audio_recorder.start_recording()
-            
-            # Wait for user to stop recording
-            try:
-                input()  # Wait for ENTER
-            except KeyboardInterrupt:
-                print("\n\n⚠️  Recording cancelled by user")
-                self.audio_recorder.stop_recording()
-                return False
+            if self.source is not None:
+                # Stdin may be the audio itself, so record until the input ends
+                print("\n🎤 Recording until end of input... Press Ctrl+C to stop early")
+                self.audio_recorder.start_recording()
+                try:
+                    while not self.audio_recorder.input_ended():
+                        self.source.ended.wait(0.1)
+                except KeyboardInterrupt:
+                    print()
+            else:
+                # Start recording
+                print("\n🎤 Recording... Press ENTER to stop")
+                print("   Press Ctrl+C to cancel")
+                
+                self.audio_recorder.start_recording()
+                
+                # Wait for user to stop recording
+                try:
+                    input()  # Wait for ENTER
+                except KeyboardInterrupt:
+                    print("\n\n⚠️  Recording cancelled by user")
+                    self.audio_recorder.stop_recording()
+                    return False
             
             # Stop recording and get audio data
             audio_data = self.audio_recorder.stop_recording()
@@ -76,17 +91,18 @@ class DirectModeHandler:
             
             # Save audio file immediately for reliability
             timestamp = datetime.now()
-            audio_path, text_path = self.file_manager.get_session_paths(timestamp)
+            audio_path, text_path = self.file_manager.reserve_session_paths(timestamp)
             
             print(f"💾 Saving audio file...")
-            audio_saved = self.file_manager.save_audio(
+            audio_blob = self.file_manager.save_audio(
                 audio_data, 
                 audio_path, 
                 self.audio_recorder.sample_rate
             )
             
-            if not audio_saved:
+            if not audio_blob:
                 print("❌ Failed to save audio file")
+                self.file_manager.release_session_paths(audio_path)
                 return False
             
             # Process transcription
@@ -98,31 +114,47 @@ class DirectModeHandler:
                 print("⚠️  No speech detected or transcription failed")
                 transcription = ""
             
+            # Optional speaker diarization
+            diarizer, speaker_segments = None, None
+            if self.diarize and result.get("segments"):
+                print("🗣️  Diarizing speakers...")
+                diarizer, speaker_segments = diarize_result(audio_data, result, self.num_speakers)
+            
             # Display result
-            if transcription:
+            if speaker_segments:
+                print(f"\n✅ Transcription by speaker:\n{format_labelled(speaker_segments)}")
+            elif transcription:
                 print(f"\n✅ Transcription: \"{transcription}\"")
             else:
                 print("\n⚠️  No transcription generated")
             
-            # Copy to clipboard
-            if self.clipboard_enabled and transcription:
-                if self.clipboard_manager and self.clipboard_manager.copy_to_clipboard(transcription):
-                    print("📋 Copied to clipboard!")
-                else:
-                    print("⚠️  Failed to copy to clipboard")
-            
-            # Save text file
-            text_saved = self.file_manager.save_text(transcription, text_path)
-            if not text_saved:
-                print("⚠️  Failed to save text file")
+            # Deliver to clipboard and other outputs
+            if self.outputs and transcription:
+                for sink, delivered in self.outputs.deliver(transcription).items():
+                    if sink == "clipboard":
+                        print("📋 Copied to clipboard!" if delivered else "⚠️  Failed to copy to clipboard")
+                    elif not delivered:
+                        print(f"⚠️  Failed to write transcription to {sink}")
             
-            # Create session record
+            # Create session record (saves text and metadata; the audio is
+            # already on disk)
             session = self.session_manager.create_session(
                 audio_data=audio_data,
                 transcription=transcription,
-                sample_rate=self.audio_recorder.sample_rate
+                sample_rate=self.audio_recorder.sample_rate,
+                model_name=self.transcription_engine.model_name,
+                language=result.get("language"),
+                decode_time=result.get("decode_time"),
+                segments=result.get("segments"),
+                speaker_count=count_speakers(speaker_segments) if diarizer else None,
+                guard_hits=result.get("guard_hits"),
+                audio_path=audio_path,
+                audio_blob=audio_blob
             )
             
+            if session and diarizer:
+                self.session_manager.save_diarization(session, diarizer, speaker_segments)
+            
             if session:
                 duration = self.audio_recorder.get_duration(audio_data)
                 print(f"\n📊 Session completed:")
@@ -145,6 +177,5 @@ class DirectModeHandler:
         return {
             "model_name": self.model_name,
             "language": self.language,
-            "clipboard_enabled": self.clipboard_enabled,
-            "clipboard_available": self.clipboard_manager.is_available() if self.clipboard_manager else False
+            "outputs": [sink.name for sink in self.outputs.sinks] if self.outputs else []
         }
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""Size-bounded on-disk cache of Whisper encoder outputs."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .metrics import ENCODER_CACHE_LOOKUPS
+
+
+class EncoderCache:
+    """
+    Stores encoder outputs per 30-second window, keyed by audio hash and model.
+
+    Layout: ``<cache_dir>/<model>/<audio_hash>/<window>.npy``, where the
+    model key names the loaded weights (e.g. ``base`` or ``base.int8``). Reads refresh
+    a file's mtime, and when the cache grows past ``max_bytes`` the least
+    recently used windows are evicted down to 90% of the limit.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root directory of the cache
+            max_bytes: Size limit for all cached windows
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, audio_hash: str, model_name: str, window: int) -> Path:
+        """Path of one cached window."""
+        return self.cache_dir / model_name / audio_hash / f"{window:05d}.npy"
+
+    def get(self, audio_hash: str, model_name: str, window: int) -> Optional[np.ndarray]:
+        """
+        Look up the encoder output for one window.
+
+        Args:
+            audio_hash: Checksum of the full recording
+            model_name: Model weights the output belongs to (name and variant)
+            window: Index of the 30-second window
+
+        Returns:
+            Encoder output array, or None on a miss
+        """
+        path = self._path(audio_hash, model_name, window)
+        try:
+            features = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            ENCODER_CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        ENCODER_CACHE_LOOKUPS.inc(result="hit")
+        return features
+
+    def put(self, audio_hash: str, model_name: str, window: int, features: np.ndarray) -> None:
+        """
+        Store the encoder output for one window and evict if over the limit.
+
+        Args:
+            audio_hash: Checksum of the full recording
+            model_name: Model weights the output belongs to (name and variant)
+            window: Index of the 30-second window
+            features: Encoder output
+        """
+        path = self._path(audio_hash, model_name, window)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp.npy")
+            np.save(tmp_path, features)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Failed to cache encoder output: {e}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            else:
+                self._total_bytes += path.stat().st_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """List cached files as (mtime, size, path) and return them with the total size."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npy"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        """Delete least recently used windows until the cache is at 90% of its limit."""
+        entries, total = self._scan()
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+            try:
+                os.rmdir(os.path.dirname(path))  # Only succeeds once empty
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def get_info(self) -> dict:
+        """Cache statistics."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            total = self._total_bytes
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": str(self.cache_dir),
+            "size_mb": total / (1024 * 1024),
+            "max_mb": self.max_bytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
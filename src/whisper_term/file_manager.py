@@ -1,12 +1,225 @@
 """File management for audio recordings and transcriptions."""
 
 import os
+import io
+import gzip
+import json
+import shutil
+import struct
+import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List, Dict, Any
 import numpy as np
 from scipy.io import wavfile
 
+from .blob_store import BlobStore
+from .locking import create_exclusive
+from .metrics import BYTES_WRITTEN
+from .models import SessionMetadata
+from .resampler import StreamingResampler
+
+
+def to_pcm16(audio_data: np.ndarray) -> np.ndarray:
+    """
+    Convert audio data to the int16 PCM layout stored in WAV files.
+    
+    Args:
+        audio_data: Audio data as numpy array (float in [-1, 1] or int16)
+        
+    Returns:
+        Audio data as int16 numpy array
+    """
+    if audio_data.dtype == np.float32 or audio_data.dtype == np.float64:
+        audio_data = np.clip(audio_data, -1.0, 1.0)
+        audio_data = (audio_data * 32767).astype(np.int16)
+    return audio_data
+
+
+def compute_checksum(audio_data: np.ndarray) -> str:
+    """Compute the SHA-256 checksum of audio data as stored on disk."""
+    pcm = np.ascontiguousarray(to_pcm16(audio_data))
+    return hashlib.sha256(pcm.tobytes()).hexdigest()
+
+
+def write_wav(audio_data: np.ndarray, path: Path, sample_rate: int) -> str:
+    """
+    Write audio as a 16-bit PCM WAV file, hashing the bytes as they are written.
+    
+    Produces the same file as scipy's wavfile.write, but the header is
+    computed up front so the file is written (and hashed) strictly in order,
+    without seeking back or reading it again.
+    
+    Args:
+        audio_data: Audio data (float in [-1, 1] or int16), mono or (samples, channels)
+        path: File to write
+        sample_rate: Sample rate of the audio
+        
+    Returns:
+        SHA-256 of the file
+    """
+    pcm = np.ascontiguousarray(to_pcm16(audio_data), dtype="<i2")
+    channels = 1 if pcm.ndim == 1 else pcm.shape[1]
+    block_align = channels * pcm.itemsize
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + pcm.nbytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b"data", pcm.nbytes
+    )
+    
+    digest = hashlib.sha256(header)
+    data = memoryview(pcm).cast("B")
+    with open(path, "wb") as f:
+        f.write(header)
+        for start in range(0, len(data), 1024 * 1024):
+            chunk = data[start:start + 1024 * 1024]
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+# Offset and scale mapping integer PCM samples to [-1, 1]
+_PCM_SCALE = {
+    np.dtype(np.uint8): (128, 1 / 128),
+    np.dtype(np.int16): (0, 1 / 32768),
+    np.dtype(np.int32): (0, 1 / 2147483648),
+}
+
+
+def pcm_to_float32(data: np.ndarray) -> np.ndarray:
+    """
+    Convert PCM samples to mono float32 in [-1, 1].
+    
+    Downmixing and scaling run as vectorized float32 passes into a single
+    new array, so memory-mapped input is read exactly once.
+    
+    Args:
+        data: Samples as (frames,) or (frames, channels), integer PCM or float
+        
+    Returns:
+        Mono float32 audio (never a view of the input)
+    """
+    channels = data.shape[1] if data.ndim > 1 else 1
+    if data.ndim > 1:
+        audio_data = np.add.reduce(data, axis=1, dtype=np.float32)
+    else:
+        audio_data = data.astype(np.float32)
+    
+    offset, scale = _PCM_SCALE.get(data.dtype, (0, 1.0))
+    if offset:
+        audio_data -= offset * channels
+    scale /= channels
+    if scale != 1.0:
+        audio_data *= scale
+    return audio_data
+
+
+def read_wav(audio_path: Path) -> Tuple[int, np.ndarray]:
+    """
+    Read a WAV file as mono float32 audio in [-1, 1].
+    
+    Files are memory-mapped where the encoding allows, so samples go
+    straight from the page cache into the float32 conversion.
+    
+    Args:
+        audio_path: Path to the WAV file, or a binary file object
+        
+    Returns:
+        Tuple of (sample_rate, audio_data)
+    """
+    if hasattr(audio_path, "read"):
+        sample_rate, data = wavfile.read(audio_path)
+    else:
+        try:
+            sample_rate, data = wavfile.read(str(audio_path), mmap=True)
+        except ValueError:
+            # 24-bit and other layouts cannot be memory-mapped
+            sample_rate, data = wavfile.read(str(audio_path))
+    return sample_rate, pcm_to_float32(data)
+
+
+# Stored audio file suffix per SessionMetadata.audio_state
+AUDIO_SUFFIXES = {"wav": ".wav", "flac": ".flac", "gzip": ".wav.gz"}
+
+
+def _soundfile():
+    """Import the optional soundfile module, or None if unavailable."""
+    try:
+        import soundfile
+        return soundfile
+    except ImportError:
+        return None
+
+
+def stored_audio_path(audio_path: Path, audio_state: str) -> Path:
+    """Path of a session's audio as stored in the given state."""
+    audio_path = Path(audio_path)
+    return audio_path.parent / (audio_path.stem + AUDIO_SUFFIXES[audio_state])
+
+
+def read_audio(path: Path) -> Tuple[int, np.ndarray]:
+    """
+    Read a stored audio file (WAV, FLAC or gzipped WAV) as mono float32.
+    
+    Args:
+        path: Path to the audio file
+        
+    Returns:
+        Tuple of (sample_rate, audio_data)
+    """
+    path = Path(path)
+    if path.name.endswith(".wav.gz"):
+        with gzip.open(path, "rb") as f:
+            return read_wav(io.BytesIO(f.read()))
+    if path.suffix == ".flac":
+        soundfile = _soundfile()
+        if soundfile is None:
+            raise RuntimeError("Reading FLAC audio requires the 'soundfile' package")
+        audio_data, sample_rate = soundfile.read(str(path), dtype="float32", always_2d=True)
+        return sample_rate, pcm_to_float32(audio_data)
+    return read_wav(path)
+
+
+def _resample(audio_data: np.ndarray, input_rate: int, output_rate: int) -> np.ndarray:
+    """Resample a whole file, in blocks to bound the filter's working memory."""
+    resampler = StreamingResampler(input_rate, output_rate)
+    block = input_rate * 10
+    chunks = [resampler.process(audio_data[i:i + block]) for i in range(0, len(audio_data), block)]
+    chunks.append(resampler.flush())
+    return np.concatenate(chunks)
+
+
+def load_audio_file(path: Path, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Load an audio file as mono float32 at the given sample rate.
+    
+    WAV (plain or gzipped) and, with soundfile installed, FLAC are decoded
+    in-process; other formats fall back to whisper's ffmpeg loader, which
+    spawns a subprocess per file.
+    
+    Args:
+        path: Audio file
+        sample_rate: Output sample rate in Hz
+        
+    Returns:
+        Audio data in [-1, 1]
+    """
+    path = Path(path)
+    name = path.name.lower()
+    if name.endswith((".wav", ".wav.gz")) or (name.endswith(".flac") and _soundfile() is not None):
+        try:
+            file_rate, audio_data = read_audio(path)
+        except ValueError:
+            file_rate = None  # Compressed WAV encodings scipy cannot read
+        if file_rate is not None:
+            if file_rate != sample_rate:
+                audio_data = _resample(audio_data, file_rate, sample_rate)
+            return audio_data
+    
+    import whisper
+    return whisper.load_audio(str(path), sr=sample_rate)
+
 
 class FileManager:
     """Handles file operations for recordings and transcriptions."""
@@ -21,6 +234,7 @@ class FileManager:
         self.base_data_dir = Path(base_data_dir)
         self.recordings_dir = self.base_data_dir / "recordings"
         self.models_dir = self.base_data_dir / "models"
+        self.blobs = BlobStore(self.base_data_dir / "blobs")
         
         # Create directories if they don't exist
         self._ensure_directories()
@@ -55,10 +269,50 @@ class FileManager:
         
         return audio_path, text_path
     
+    def reserve_session_paths(self, timestamp: datetime) -> Tuple[Path, Path]:
+        """
+        Get the file paths for a new session, claiming its id exclusively.
+        
+        The transcript file (which is never aged out) is created with
+        O_EXCL, so concurrent processes starting a session in the same
+        second get distinct ids: YYYYMMDD_HHMMSS, then YYYYMMDD_HHMMSS_1,
+        _2, ... which still sort chronologically.
+        
+        Args:
+            timestamp: Timestamp for the session
+            
+        Returns:
+            Tuple of (audio_path, text_path); the text file exists but is empty
+        """
+        audio_path, text_path = self.get_session_paths(timestamp)
+        stem = audio_path.stem
+        attempt = 0
+        while not create_exclusive(text_path):
+            attempt += 1
+            audio_path = audio_path.with_name(f"{stem}_{attempt}.wav")
+            text_path = audio_path.with_suffix(".txt")
+        return audio_path, text_path
+    
+    def release_session_paths(self, audio_path: Path) -> None:
+        """
+        Give back a session id claimed with reserve_session_paths that was
+        never saved, so it does not linger as an empty session.
+        
+        Args:
+            audio_path: The reserved session's audio path
+        """
+        for path in (audio_path, audio_path.with_suffix(".txt")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️  Failed to remove {path}: {e}")
+    
     def save_audio(self, audio_data: np.ndarray, audio_path: Path, 
-                   sample_rate: int = 16000) -> bool:
+                   sample_rate: int = 16000) -> Optional[str]:
         """
-        Save audio data to a WAV file.
+        Save audio data to a WAV file, stored once per distinct content.
         
         Args:
             audio_data: Audio data as numpy array
@@ -66,27 +320,47 @@ class FileManager:
             sample_rate: Sample rate of the audio
             
         Returns:
-            True if successful, False otherwise
+            SHA-256 of the WAV file (its blob id), or None if error
         """
         try:
             # Ensure the directory exists
             audio_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Normalize audio data to prevent clipping
-            if audio_data.dtype == np.float32 or audio_data.dtype == np.float64:
-                # Convert float audio to int16 for WAV format
-                audio_data = np.clip(audio_data, -1.0, 1.0)
-                audio_data = (audio_data * 32767).astype(np.int16)
-            
-            # Save as WAV file
-            wavfile.write(str(audio_path), sample_rate, audio_data)
+            # Write to a temporary file first so readers never see a partial WAV
+            tmp_path = audio_path.with_name(audio_path.name + ".tmp")
+            digest = write_wav(audio_data, tmp_path, sample_rate)
+            BYTES_WRITTEN.inc(os.path.getsize(tmp_path), kind="audio")
+            duplicate = self.link_audio(tmp_path, digest, audio_path)
             
-            print(f"💾 Audio saved: {audio_path}")
-            return True
+            print(f"💾 Audio saved: {audio_path}" + (" (identical audio already stored)" if duplicate else ""))
+            return digest
             
         except Exception as e:
             print(f"❌ Error saving audio: {e}")
+            return None
+    
+    def link_audio(self, tmp_path: Path, digest: str, audio_path: Path) -> bool:
+        """
+        Put a fully written audio file in place as a link to its blob.
+        
+        Args:
+            tmp_path: Temporary file holding the audio (removed)
+            digest: SHA-256 of the file
+            audio_path: The session's audio file (.wav, .flac or .wav.gz)
+            
+        Returns:
+            True if identical audio was already stored
+        """
+        suffix = next(s for s in AUDIO_SUFFIXES.values() if audio_path.name.endswith(s))
+        try:
+            duplicate = self.blobs.link(tmp_path, digest, audio_path, suffix)
+        except OSError:
+            # No hard links on this file system (or the blob is at its link
+            # limit): keep a plain copy
+            os.replace(tmp_path, audio_path)
             return False
+        os.unlink(tmp_path)
+        return duplicate
     
     def save_text(self, text: str, text_path: Path) -> bool:
         """
@@ -103,9 +377,12 @@ class FileManager:
             # Ensure the directory exists
             text_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Save as UTF-8 text file
-            with open(text_path, 'w', encoding='utf-8') as f:
+            # Save as UTF-8 text file, replaced atomically for lock-free readers
+            tmp_path = text_path.with_name(text_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 f.write(text)
+            BYTES_WRITTEN.inc(os.path.getsize(tmp_path), kind="text")
+            os.replace(tmp_path, text_path)
             
             print(f"📝 Text saved: {text_path}")
             return True
@@ -114,6 +391,171 @@ class FileManager:
             print(f"❌ Error saving text: {e}")
             return False
     
+    def get_metadata_path(self, audio_path: Path) -> Path:
+        """Get the metadata sidecar path for a session's audio file."""
+        return Path(audio_path).with_suffix(".json")
+    
+    def save_metadata(self, metadata: SessionMetadata, metadata_path: Path) -> bool:
+        """
+        Save session metadata to a JSON sidecar file.
+        
+        Args:
+            metadata: Session metadata
+            metadata_path: Path to save the sidecar
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            metadata_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial sidecar
+            tmp_path = metadata_path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata.to_dict(), f, ensure_ascii=False)
+            BYTES_WRITTEN.inc(os.path.getsize(tmp_path), kind="metadata")
+            os.replace(tmp_path, metadata_path)
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error saving metadata: {e}")
+            return False
+    
+    def load_metadata(self, metadata_path: Path) -> Optional[SessionMetadata]:
+        """
+        Load session metadata from a JSON sidecar file.
+        
+        Args:
+            metadata_path: Path to the sidecar
+            
+        Returns:
+            SessionMetadata or None if missing or unreadable
+        """
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                return SessionMetadata.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"❌ Error loading metadata: {e}")
+            return None
+    
+    def save_speakers(self, labelled: List[Dict[str, Any]], speakers_path: Path) -> bool:
+        """
+        Save speaker-labelled segments to a JSON sidecar file.
+        
+        Args:
+            labelled: Segments with start, end, speaker and text
+            speakers_path: Path to save the sidecar
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            speakers_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(speakers_path, 'w', encoding='utf-8') as f:
+                json.dump(labelled, f, ensure_ascii=False)
+            
+            print(f"🗣️  Speakers saved: {speakers_path}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error saving speakers: {e}")
+            return False
+    
+    def load_speakers(self, speakers_path: Path) -> Optional[List[Dict[str, Any]]]:
+        """Load speaker-labelled segments, or None if missing or unreadable."""
+        try:
+            with open(speakers_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"❌ Error loading speakers: {e}")
+            return None
+    
+    def find_audio(self, audio_path: Path) -> Optional[Path]:
+        """
+        Find a session's stored audio, which retention may have compressed.
+        
+        Args:
+            audio_path: The session's canonical .wav path
+            
+        Returns:
+            Path of the existing audio file, or None if there is none
+        """
+        for audio_state in AUDIO_SUFFIXES:
+            path = stored_audio_path(audio_path, audio_state)
+            if path.exists():
+                return path
+        return None
+    
+    def load_audio(self, audio_path: Path) -> Optional[np.ndarray]:
+        """
+        Load a session's audio as mono float32 audio.
+        
+        Args:
+            audio_path: Path to the audio file (compressed copies are found too)
+            
+        Returns:
+            Audio data in [-1, 1], or None if error
+        """
+        try:
+            stored_path = self.find_audio(audio_path)
+            if stored_path is None:
+                print(f"❌ Audio file not found: {audio_path}")
+                return None
+            _, audio_data = read_audio(stored_path)
+            return audio_data
+            
+        except Exception as e:
+            print(f"❌ Error loading audio: {e}")
+            return None
+    
+    def compress_audio(self, audio_path: Path, codec: str = "flac") -> Optional[Path]:
+        """
+        Replace a session's WAV file with a losslessly compressed copy.
+        
+        The compressed file is written under a temporary name and renamed
+        into place before the WAV is removed, so the audio always exists
+        in at least one form.
+        
+        Args:
+            audio_path: The session's .wav path
+            codec: "flac" (needs soundfile) or "gzip"
+            
+        Returns:
+            Path of the compressed file, or None if error
+        """
+        target = stored_audio_path(audio_path, codec)
+        tmp_path = target.with_name(target.name + ".tmp")
+        try:
+            if codec == "flac":
+                soundfile = _soundfile()
+                if soundfile is None:
+                    raise RuntimeError("FLAC compression requires the 'soundfile' package")
+                sample_rate, audio_data = wavfile.read(str(audio_path))
+                soundfile.write(str(tmp_path), audio_data, sample_rate,
+                                format="FLAC", subtype="PCM_16")
+            elif codec == "gzip":
+                with open(audio_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                raise ValueError(f"Unknown audio codec '{codec}'")
+            
+            os.replace(tmp_path, target)
+            os.remove(audio_path)
+            return target
+            
+        except Exception as e:
+            print(f"❌ Error compressing audio: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
+    
     def load_text(self, text_path: Path) -> Optional[str]:
         """
         Load transcription text from a file.
@@ -157,19 +599,16 @@ class FileManager:
                     if not date_dir.is_dir():
                         continue
                     
-                    # Find all WAV files in this date directory
-                    wav_files = list(date_dir.glob("*.wav"))
-                    
-                    for wav_file in wav_files:
-                        # Get corresponding text file
-                        text_file = wav_file.with_suffix(".txt")
+                    # Transcripts are kept forever; audio may be compressed or aged out
+                    for text_file in date_dir.glob("*.txt"):
+                        wav_file = text_file.with_suffix(".wav")
                         
                         sessions.append({
                             "date": date_dir.name,
                             "audio_path": wav_file,
                             "text_path": text_file,
-                            "timestamp": wav_file.stem,
-                            "exists": wav_file.exists() and text_file.exists()
+                            "timestamp": text_file.stem,
+                            "exists": True
                         })
             
             # Sort by timestamp (most recent first)
@@ -185,6 +624,9 @@ class FileManager:
         """
         Get information about storage usage.
         
+        Walks and stats the whole recordings tree; SessionManager.get_storage_info
+        reads the cached totals instead.
+        
         Returns:
             Dictionary with storage statistics
         """
@@ -0,0 +1,242 @@
+"""Audio input sources: sounddevice, raw PCM streams and WAV replay."""
+
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Tuple, Union
+
+import numpy as np
+
+
+# Raw PCM sample formats accepted on stdin, FIFOs and sockets
+PCM_FORMATS = {"s16le": "<i2", "s32le": "<i4", "f32le": "<f4"}
+
+
+def _to_float32(block: np.ndarray) -> np.ndarray:
+    """Scale integer PCM samples to float32 in [-1, 1], keeping channels."""
+    if block.dtype.kind == "f":
+        return block.astype(np.float32)
+    if block.dtype.kind == "u":
+        # 8-bit PCM is unsigned
+        return (block.astype(np.float32) - 128) * (1 / 128)
+    return block.astype(np.float32) * (1 / 2 ** (8 * block.dtype.itemsize - 1))
+
+
+class InputSource:
+    """
+    Where a recorder gets its audio.
+
+    A source reports its native format and opens a stream that calls
+    ``callback(indata, frames, time, status)`` with float32
+    (frames, channels) blocks, the same contract as a sounddevice
+    InputStream. Sources that can run out (pipes, files) set ``ended``
+    when they do.
+    """
+
+    def __init__(self):
+        self.ended = threading.Event()
+
+    @property
+    def finite(self) -> bool:
+        """Whether the source ends by itself (recording stops at its end)."""
+        return True
+
+    def native_format(self) -> Tuple[int, int]:
+        """The source's (sample_rate, channels)."""
+        raise NotImplementedError
+
+    def open_stream(self, callback: Callable):
+        """Open a stream with start(), stop() and close() that feeds callback."""
+        raise NotImplementedError
+
+
+class DeviceSource(InputSource):
+    """A sounddevice input device, opened at its native format."""
+
+    def __init__(self, device: Optional[Union[int, str]] = None, channels: Optional[int] = None):
+        """
+        Initialize the source.
+
+        Args:
+            device: sounddevice input device index or name, or None for the default
+            channels: Capture channel count, or None for the device's native count
+        """
+        super().__init__()
+        self.device = device
+        self.channels = channels
+
+    @property
+    def finite(self) -> bool:
+        return False
+
+    def native_format(self) -> Tuple[int, int]:
+        import sounddevice as sd
+
+        info = sd.query_devices(self.device, 'input')
+        capture_rate = int(info['default_samplerate'])
+        capture_channels = self.channels or max(int(info['max_input_channels']), 1)
+        return capture_rate, capture_channels
+
+    def open_stream(self, callback: Callable):
+        import sounddevice as sd
+
+        sample_rate, channels = self.native_format()
+        return sd.InputStream(
+            device=self.device,
+            callback=callback,
+            channels=channels,
+            samplerate=sample_rate,
+            dtype=np.float32
+        )
+
+
+class _ReaderStream:
+    """Feeds a callback from a thread that pulls blocks out of a source."""
+
+    def __init__(self, source: InputSource, read_blocks: Callable, callback: Callable):
+        self.source = source
+        self.read_blocks = read_blocks
+        self.callback = callback
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        try:
+            for block in self.read_blocks(self._stopping):
+                if self._stopping.is_set():
+                    break
+                self.callback(block, len(block), None, None)
+        except OSError as e:
+            print(f"⚠️  Input stream error: {e}")
+        finally:
+            self.source.ended.set()
+
+    def start(self) -> None:
+        self.source.ended.clear()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def close(self) -> None:
+        # A reader blocked on a quiet pipe is a daemon thread and exits with the process
+        if self._thread is not None:
+            self._thread.join(timeout=0.5)
+
+
+class PCMStreamSource(InputSource):
+    """
+    Raw interleaved PCM from stdin, a FIFO, a file or a Unix socket.
+
+    The stream is opened when recording starts (opening a FIFO waits for
+    a writer), and recording ends at end of stream.
+    """
+
+    def __init__(self, target: str = "-", sample_rate: int = 16000, channels: int = 1,
+                 sample_format: str = "s16le", block_seconds: float = 0.1):
+        """
+        Initialize the source.
+
+        Args:
+            target: "-" for stdin, "unix:PATH" for a Unix socket, else a FIFO or file path
+            sample_rate: Sample rate of the stream in Hz
+            channels: Interleaved channel count
+            sample_format: One of PCM_FORMATS
+            block_seconds: Audio per callback block
+        """
+        super().__init__()
+        if sample_format not in PCM_FORMATS:
+            raise ValueError(f"Unknown sample format '{sample_format}' "
+                             f"(available: {', '.join(PCM_FORMATS)})")
+        self.target = target
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = np.dtype(PCM_FORMATS[sample_format])
+        self.block_frames = max(int(sample_rate * block_seconds), 1)
+        self._socket: Optional[socket.socket] = None
+
+    def native_format(self) -> Tuple[int, int]:
+        return self.sample_rate, self.channels
+
+    def _open(self) -> BinaryIO:
+        if self.target == "-":
+            return sys.stdin.buffer
+        if self.target.startswith("unix:"):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(self.target[len("unix:"):])
+            return self._socket.makefile("rb")
+        return open(self.target, "rb")
+
+    def _read_blocks(self, stopping: threading.Event):
+        stream = self._open()
+        frame_bytes = self.dtype.itemsize * self.channels
+        try:
+            while not stopping.is_set():
+                data = stream.read(self.block_frames * frame_bytes)
+                if not data:
+                    return
+                # Drop a trailing partial frame
+                usable = len(data) - len(data) % frame_bytes
+                if usable:
+                    samples = np.frombuffer(data[:usable], dtype=self.dtype)
+                    yield _to_float32(samples.reshape(-1, self.channels))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def open_stream(self, callback: Callable) -> _ReaderStream:
+        return _ReaderStream(self, self._read_blocks, callback)
+
+
+class WavReplaySource(InputSource):
+    """
+    Replays a WAV file as if it were being recorded.
+
+    In real time the blocks are paced by the wall clock, exercising the
+    same timing as a microphone; otherwise they are delivered as fast as
+    the pipeline takes them, for benchmarks.
+    """
+
+    def __init__(self, path: Path, realtime: bool = True, block_seconds: float = 0.1):
+        """
+        Initialize the source.
+
+        Args:
+            path: WAV file to replay
+            realtime: Pace blocks at the file's sample rate
+            block_seconds: Audio per callback block
+        """
+        super().__init__()
+        from scipy.io import wavfile
+
+        self.path = Path(path)
+        self.realtime = realtime
+        try:
+            self.sample_rate, data = wavfile.read(str(self.path), mmap=True)
+        except ValueError:
+            self.sample_rate, data = wavfile.read(str(self.path))
+        self._data = data if data.ndim > 1 else data.reshape(-1, 1)
+        self.block_frames = max(int(self.sample_rate * block_seconds), 1)
+
+    def native_format(self) -> Tuple[int, int]:
+        return self.sample_rate, self._data.shape[1]
+
+    def _read_blocks(self, stopping: threading.Event):
+        start_time = time.monotonic()
+        for offset in range(0, len(self._data), self.block_frames):
+            if self.realtime:
+                # Block n is available once its last sample has "arrived"
+                due = start_time + (offset + self.block_frames) / self.sample_rate
+                if stopping.wait(max(due - time.monotonic(), 0)):
+                    return
+            yield _to_float32(self._data[offset:offset + self.block_frames])
+
+    def open_stream(self, callback: Callable) -> _ReaderStream:
+        return _ReaderStream(self, self._read_blocks, callback)
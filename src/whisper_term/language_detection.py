@@ -0,0 +1,190 @@
+"""Language detection that runs once per session, with per-user priors."""
+
+import getpass
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .locking import file_lock
+from .metrics import LANGUAGE_DETECTIONS
+
+
+# Detections at least this probable pin the language
+PIN_CONFIDENCE = 0.8
+
+# A pinned window decoding worse than this (and not silent) triggers redetection
+LOW_AVG_LOGPROB = -1.0
+SPEECH_NO_SPEECH_PROB = 0.5
+
+# A user's prior is trusted after this many sessions, if one language dominates
+PRIOR_MIN_SESSIONS = 3
+PRIOR_MIN_SHARE = 0.8
+
+
+def current_user() -> str:
+    """Login name the priors are kept under."""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "default"
+
+
+class LanguagePriors:
+    """
+    Languages each user has spoken, in ``<data_dir>/language_priors.json``.
+
+    Maps user name to per-language session counts. A user whose sessions
+    are dominated by one language starts new sessions pinned to it, so
+    detection is skipped entirely.
+    """
+
+    def __init__(self, path: Path, user: str):
+        """
+        Initialize the priors for one user.
+
+        Args:
+            path: Priors file (shared by all users of the data dir)
+            user: User the sessions are attributed to
+        """
+        self.path = Path(path)
+        self.user = user
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def counts(self) -> Dict[str, int]:
+        """Sessions per language for this user."""
+        return dict(self._read().get(self.user, {}))
+
+    def prior(self) -> Optional[str]:
+        """The user's usual language, or None if there is no clear one yet."""
+        counts = self.counts()
+        total = sum(counts.values())
+        if total < PRIOR_MIN_SESSIONS:
+            return None
+        language = max(counts, key=counts.get)
+        return language if counts[language] >= PRIOR_MIN_SHARE * total else None
+
+    def record(self, language: str) -> None:
+        """Count one session in ``language`` for this user."""
+        try:
+            with file_lock(self.path.with_name(self.path.name + ".lock")):
+                data = self._read()
+                counts = data.setdefault(self.user, {})
+                counts[language] = counts.get(language, 0) + 1
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Failed to save language priors: {e}")
+
+
+def detect(model, audio_features) -> Tuple[str, float]:
+    """
+    Most likely language of one window.
+
+    Args:
+        model: Multilingual Whisper model
+        audio_features: Log-mel spectrogram or encoder output of the window
+            (encoder output costs one decoder step, no encoder pass)
+
+    Returns:
+        (language code, probability)
+    """
+    _, probs = model.detect_language(audio_features)
+    if isinstance(probs, list):
+        probs = probs[0]
+    language = max(probs, key=probs.get)
+    return language, probs[language]
+
+
+def low_confidence(segments: List[Dict[str, Any]]) -> bool:
+    """Whether decoded speech looks like it was decoded in the wrong language."""
+    speech = [seg for seg in segments
+              if seg.get("no_speech_prob", 0.0) < SPEECH_NO_SPEECH_PROB and "avg_logprob" in seg]
+    if not speech:
+        return False
+    return sum(seg["avg_logprob"] for seg in speech) / len(speech) < LOW_AVG_LOGPROB
+
+
+class LanguagePin:
+    """
+    The language of a ``--language auto`` session.
+
+    Until a window is detected with at least PIN_CONFIDENCE, every window
+    is detected (cheaply, from its encoder output where available); after
+    that the language is pinned and later windows skip detection. A pinned
+    window that decodes with low confidence is detected again, and a
+    different confident answer re-pins the session. Pinned languages are
+    counted in the user's priors, and a clear prior pins new sessions
+    from the start.
+    """
+
+    def __init__(self, priors: Optional[LanguagePriors] = None):
+        """
+        Initialize the pin, from the user's prior if there is one.
+
+        Args:
+            priors: Per-user language history, or None to always detect
+        """
+        self.priors = priors
+        self.language: Optional[str] = priors.prior() if priors else None
+        self.source: Optional[str] = "prior" if self.language else None
+        self._lock = threading.Lock()
+
+    def resolve(self, model, audio_features) -> str:
+        """
+        Language to decode a window in, detecting it unless pinned.
+
+        Args:
+            model: Multilingual Whisper model
+            audio_features: Mel spectrogram or encoder output of the window
+        """
+        with self._lock:
+            if self.language is not None:
+                return self.language
+        language, probability = detect(model, audio_features)
+        if probability >= PIN_CONFIDENCE:
+            self._pin(language, "detected")
+            LANGUAGE_DETECTIONS.inc(outcome="pinned")
+        else:
+            LANGUAGE_DETECTIONS.inc(outcome="unsure")
+        return language
+
+    def recheck(self, model, audio_features) -> Optional[str]:
+        """
+        Redetect a pinned window that decoded with low confidence (see
+        low_confidence; the caller checks, so clean windows cost nothing).
+
+        Returns:
+            The new language if the window should be decoded again, else None
+        """
+        with self._lock:
+            pinned = self.language
+        if pinned is None:
+            return None
+        language, probability = detect(model, audio_features)
+        if language == pinned or probability < PIN_CONFIDENCE:
+            LANGUAGE_DETECTIONS.inc(outcome="confirmed")
+            return None
+        print(f"🌐 Language changed: {pinned} → {language}")
+        self._pin(language, "redetected")
+        LANGUAGE_DETECTIONS.inc(outcome="redetected")
+        return language
+
+    def _pin(self, language: str, source: str) -> None:
+        with self._lock:
+            self.language = language
+            self.source = source
+
+    def record(self) -> None:
+        """Count the finished transcription towards the user's priors."""
+        if self.priors is not None and self.language is not None:
+            self.priors.record(self.language)
@@ -0,0 +1,115 @@
+"""Live partial transcription while a recording is in progress."""
+
+import threading
+from typing import Callable, Optional
+
+from .audio_recorder import AudioRecorder
+from .transcription_engine import TranscriptionEngine
+from .renderer import TerminalRenderer
+from .prompting import ROLLING_CONTEXT_CHARS
+
+
+class LiveTranscriber:
+    """
+    Periodically decodes the uncommitted tail of the current recording.
+
+    Segments that end at least ``commit_margin`` seconds before the end of
+    the buffer are considered stable: they are committed to the renderer
+    and never decoded again. The rest is shown as tentative text and is
+    replaced on the next pass. The decoded window therefore stays short
+    even for long recordings.
+    """
+
+    def __init__(self, audio_recorder: AudioRecorder,
+                 transcription_engine: TranscriptionEngine,
+                 renderer: TerminalRenderer, interval: float = 1.0,
+                 commit_margin: float = 2.0, max_window: float = 30.0,
+                 on_commit: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the live transcriber.
+
+        Args:
+            audio_recorder: Recorder to read buffered audio from
+            transcription_engine: Engine used for partial decoding
+            renderer: Renderer receiving tentative and committed text
+            interval: Seconds between partial passes
+            commit_margin: Segments ending this close to the buffer end stay tentative
+            max_window: Longest window to decode, in seconds (Whisper's context is 30s)
+            on_commit: Called with each piece of committed text (e.g. output sinks)
+        """
+        self.audio_recorder = audio_recorder
+        self.transcription_engine = transcription_engine
+        self.renderer = renderer
+        self.interval = interval
+        self.commit_margin = commit_margin
+        self.max_window = max_window
+        self.on_commit = on_commit
+
+        self._stop_event: Optional[threading.Event] = None
+
+    def start(self) -> None:
+        """Start partial decoding for a new recording."""
+        self.stop()
+        # Each recording gets its own stop event so a lingering pass from
+        # the previous recording can never touch the new one
+        self._stop_event = threading.Event()
+        thread = threading.Thread(
+            target=self._run, args=(self._stop_event,),
+            name="live-transcriber", daemon=True
+        )
+        thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop partial decoding.
+
+        Does not wait for an in-flight pass; its result is discarded.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+        self.renderer.reset()
+
+    def _run(self, stop_event: threading.Event) -> None:
+        """Partial decoding loop for one recording."""
+        sample_rate = self.audio_recorder.sample_rate
+        min_samples = int(0.5 * sample_rate)
+        committed_samples = 0
+        committed_text = ""
+
+        while not stop_event.wait(self.interval):
+            # Nothing new arrives while paused
+            if self.audio_recorder.paused:
+                continue
+            audio = self.audio_recorder.get_buffered_audio(committed_samples)
+            if audio is None or len(audio) < min_samples:
+                continue
+
+            max_samples = int(self.max_window * sample_rate)
+            if len(audio) > max_samples:
+                audio = audio[:max_samples]
+
+            # The committed text continues into this window (rolling prompt)
+            result = self.transcription_engine.transcribe_partial(audio, context=committed_text)
+            if result is None or stop_event.is_set():
+                continue
+
+            buffered = len(audio) / sample_rate
+            segments = result["segments"]
+
+            # A full window must make progress even if nothing looks stable
+            horizon = buffered - self.commit_margin
+            if len(audio) >= max_samples and segments:
+                horizon = max(horizon, segments[0]["end"])
+
+            stable = [seg for seg in segments if seg["end"] <= horizon]
+            if stable:
+                committed = " ".join(seg["text"].strip() for seg in stable)
+                self.renderer.commit(committed)
+                if self.on_commit:
+                    self.on_commit(committed)
+                committed_samples += int(stable[-1]["end"] * sample_rate)
+                committed_text = f"{committed_text} {committed}"[-ROLLING_CONTEXT_CHARS:]
+
+            tentative = segments[len(stable):]
+            self.renderer.set_tentative(" ".join(seg["text"].strip() for seg in tentative))
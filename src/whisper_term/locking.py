@@ -0,0 +1,61 @@
+"""Advisory file locks shared by concurrent whisper-term processes."""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on ``path`` (created if missing) for the block.
+
+    Locks are flock()-style: they belong to the open file, so they
+    serialize threads of one process as well as separate processes, and
+    are released by the OS if the holder dies. Readers that tolerate a
+    concurrent writer should not lock at all.
+
+    Args:
+        path: Lock file
+        shared: Take a shared (read) lock instead of an exclusive one
+            (exclusive only on Windows)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def create_exclusive(path: Path) -> bool:
+    """
+    Create an empty file only if it does not exist yet (atomic across processes).
+
+    Returns:
+        True if this call created the file
+    """
+    try:
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        return True
+    except FileExistsError:
+        return False
@@ -4,7 +4,93 @@ import sys
 import argparse
 from pathlib import Path
 
-from .app import WhisperTermApp
+from .config import load_config, format_config
+
+
+# Flags that override config settings of the same name when given
+_CONFIG_FLAGS = [
+    'model', 'language', 'language_pinning', 'user', 'target_latency', 'expected_duration', 'model_variant', 'offline',
+    'threads', 'interop_threads', 'cpu_affinity', 'device', 'second_device',
+    'live', 'diarize', 'num_speakers', 'decode_guard', 'encoder_cache_mb', 'batch_size', 'beam_size',
+    'vocabulary', 'initial_prompt', 'rolling_prompt',
+    'clipboard', 'outputs', 'output_command', 'output_partials', 'data_dir',
+    'retention_compress_days', 'retention_delete_days', 'retention_max_mb',
+    'server_host', 'server_port', 'server_engines', 'server_queue',
+    'metrics_port', 'metrics_file',
+]
+
+
+def _device_arg(value: str):
+    """Parse a device argument as an index if numeric, else as a name."""
+    return int(value) if value.isdigit() else value
+
+
+def _load_audio_file(path: str):
+    """Load an audio file as 16 kHz mono float32."""
+    from .file_manager import load_audio_file
+    return load_audio_file(Path(path))
+
+
+def _models_command(args, models_dir: Path) -> int:
+    """Run a 'models' subcommand; returns the exit status."""
+    from . import model_store
+    
+    action = args.models_command
+    if action == 'list':
+        print(f"📦 Models in {models_dir}:")
+        for entry in model_store.cache_listing(models_dir):
+            if entry['cached']:
+                state = "verified" if entry['verified'] else "unverified"
+                line = f"  {entry['name']:16} {entry['size'] / (1024 * 1024):8.1f} MB  {state}"
+            else:
+                line = f"  {entry['name']:16} {'-':>8}     not cached"
+            for variant, size in entry['variants'].items():
+                line += f"  +{variant} ({size / (1024 * 1024):.0f} MB)"
+            print(line)
+        return 0
+    
+    names = args.names or [entry['name'] for entry in model_store.cache_listing(models_dir)
+                           if entry['cached']]
+    try:
+        for name in names:
+            model_store.expected_sha256(name)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    if action == 'rm':
+        freed = sum(model_store.remove(name, models_dir) for name in names)
+        print(f"🗑️  Removed {', '.join(names)} ({freed / (1024 * 1024):.1f} MB freed)")
+        return 0
+    
+    if action == 'pull':
+        results = model_store.run_parallel(
+            lambda name: model_store.pull(name, models_dir, force=args.force), names, args.workers
+        )
+    elif action == 'verify':
+        results = model_store.run_parallel(
+            lambda name: model_store.verify(name, models_dir), names, args.workers
+        )
+        for name, ok in results.items():
+            if ok is True:
+                print(f"✅ {name}: checksum OK")
+            elif ok is False:
+                cached = model_store.checkpoint_path(name, models_dir).exists()
+                results[name] = RuntimeError("checksum mismatch" if cached else "not cached")
+    else:
+        # Conversion loads whole models; one at a time keeps memory bounded
+        results = {}
+        for name in names:
+            try:
+                results[name] = model_store.convert(name, models_dir, args.variant)
+                print(f"✅ {name}: {args.variant} variant saved to {results[name]}")
+            except Exception as e:
+                results[name] = e
+    
+    failed = {name: e for name, e in results.items() if isinstance(e, Exception)}
+    for name, e in failed.items():
+        print(f"❌ {name}: {e}")
+    return 1 if failed else 0
 
 
 def main():
@@ -17,6 +103,9 @@ def main():
         epilog="""
 Examples:
   whisper-term              # Start the interactive app
+  whisper-term -p meeting   # Use the "meeting" settings profile
+  whisper-term models pull base small   # Prefetch and verify models
+  arecord -f S16_LE -r 16000 -c 1 | whisper-term --stdin   # Headless input
   whisper-term --help       # Show this help message
 
 Controls:
@@ -33,16 +122,71 @@ For more information, visit: https://github.com/user/whisper-term
         version='Whisper Term 0.1.0'
     )
     
+    parser.add_argument(
+        '--config',
+        type=Path,
+        metavar='FILE',
+        help='Config file (default: ./whisper-term.toml, then ~/.config/whisper-term/config.toml)'
+    )
+    
+    parser.add_argument(
+        '--profile', '-p',
+        help='Named settings profile, e.g. fast, accurate or meeting'
+    )
+    
+    parser.add_argument(
+        '--show-config',
+        action='store_true',
+        help='Print the effective settings and exit'
+    )
+    
     parser.add_argument(
         '--model', '-m',
-        default='base',
-        choices=['tiny', 'base', 'small', 'medium', 'large', 'turbo'],
-        help='Whisper model to use (default: base)'
+        choices=['tiny', 'base', 'small', 'medium', 'large', 'turbo', 'auto'],
+        help='Whisper model to use; "auto" picks from the --calibrate profile (default: base)'
+    )
+    
+    parser.add_argument(
+        '--target-latency',
+        type=float,
+        metavar='SECONDS',
+        help='Acceptable transcription time for --model auto (default: 2.0)'
+    )
+    
+    parser.add_argument(
+        '--expected-duration',
+        type=float,
+        metavar='SECONDS',
+        help='Expected recording length for --model auto (default: 8.0)'
+    )
+    
+    parser.add_argument(
+        '--model-variant',
+        choices=['int8', 'mmap'],
+        help='Load a precomputed model variant made with "models convert"'
+    )
+    
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        default=None,
+        help='Never download models; fail if the model is not cached'
+    )
+    
+    parser.add_argument(
+        '--calibrate',
+        action='store_true',
+        help='Benchmark locally cached models and store the host profile, then exit'
+    )
+    
+    parser.add_argument(
+        '--fixture',
+        metavar='AUDIO_FILE',
+        help='Audio file to use for --calibrate instead of the built-in fixture'
     )
     
     parser.add_argument(
         '--language', '-l',
-        default='english',
         help='Language for transcription (default: english)'
     )
     
@@ -52,19 +196,355 @@ For more information, visit: https://github.com/user/whisper-term
         help='Start recording immediately (bypass interactive mode)'
     )
     
+    parser.add_argument(
+        '--stdin',
+        action='store_true',
+        help='Record raw PCM from stdin until end of input (implies --record)'
+    )
+    
+    parser.add_argument(
+        '--input',
+        metavar='PATH',
+        help='Record raw PCM from a FIFO, file or unix:SOCKET until end of input (implies --record)'
+    )
+    
+    parser.add_argument(
+        '--input-rate',
+        type=int,
+        default=16000,
+        metavar='HZ',
+        help='Sample rate of --stdin/--input audio (default: 16000)'
+    )
+    
+    parser.add_argument(
+        '--input-channels',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Interleaved channels of --stdin/--input audio (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--input-format',
+        choices=['s16le', 's32le', 'f32le'],
+        default='s16le',
+        help='Sample format of --stdin/--input audio (default: s16le)'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        metavar='WAV_FILE',
+        help='Record a WAV file replayed in real time, as if from a microphone (implies --record)'
+    )
+    
+    parser.add_argument(
+        '--replay-fast',
+        action='store_true',
+        help='With --replay, feed audio as fast as the pipeline takes it'
+    )
+    
     parser.add_argument(
         '--clipboard', '-c',
         action='store_true',
-        default=True,
+        default=None,
         help='Copy transcription to clipboard (default: True)'
     )
     
+    parser.add_argument(
+        '--no-clipboard',
+        dest='clipboard',
+        action='store_false',
+        default=None,
+        help='Do not copy transcriptions to the clipboard'
+    )
+    
+    parser.add_argument(
+        '--sink',
+        action='append',
+        metavar='SPEC',
+        help='Send transcriptions to clipboard, stdout, file:PATH or fifo:PATH (repeatable)'
+    )
+    
+    parser.add_argument(
+        '--on-transcript',
+        dest='output_command',
+        metavar='COMMAND',
+        help='Run a shell command per transcription, with the text on stdin'
+    )
+    
+    parser.add_argument(
+        '--partials',
+        dest='output_partials',
+        action='store_true',
+        default=None,
+        help='With --live, send committed text to stdout/file/FIFO sinks as it is recognized'
+    )
+    
     parser.add_argument(
         '--data-dir',
-        default='data',
         help='Directory for data storage (default: data)'
     )
     
+    parser.add_argument(
+        '--device',
+        type=_device_arg,
+        metavar='DEVICE',
+        help='Input device index or name (default: system default)'
+    )
+    
+    parser.add_argument(
+        '--second-device',
+        type=_device_arg,
+        metavar='DEVICE',
+        help='Second input device to record alongside, e.g. a loopback device'
+    )
+    
+    parser.add_argument(
+        '--list-devices',
+        action='store_true',
+        help='List audio devices and exit'
+    )
+    
+    parser.add_argument(
+        '--diarize',
+        action='store_true',
+        default=None,
+        help='Label transcription segments by speaker (meeting recordings)'
+    )
+    
+    parser.add_argument(
+        '--num-speakers',
+        type=int,
+        metavar='N',
+        help='Fixed speaker count for --diarize / --rediarize (default: discover)'
+    )
+    
+    parser.add_argument(
+        '--rediarize',
+        metavar='AUDIO_FILE',
+        help='Relabel a diarized session for --num-speakers using cached embeddings, then exit'
+    )
+    
+    parser.add_argument(
+        '--redecode',
+        metavar='AUDIO_FILE',
+        help='Re-decode a recording with --language/--prompt/--temperature, reusing cached encoder outputs'
+    )
+    
+    parser.add_argument(
+        '--prompt',
+        dest='initial_prompt',
+        help='Text to condition transcription on (context, spelling, style)'
+    )
+    
+    parser.add_argument(
+        '--vocabulary',
+        metavar='TERMS',
+        help='Comma-separated domain terms to bias recognition towards, e.g. "Kubernetes, gRPC"'
+    )
+    
+    parser.add_argument(
+        '--no-rolling-prompt',
+        dest='rolling_prompt',
+        action='store_false',
+        default=None,
+        help='Do not carry the previous window\'s text into the prompt (windowed and live decoding)'
+    )
+    
+    parser.add_argument(
+        '--no-language-pinning',
+        dest='language_pinning',
+        action='store_false',
+        default=None,
+        help='With --language auto, detect the language in every window instead of pinning it per session'
+    )
+    
+    parser.add_argument(
+        '--user',
+        metavar='NAME',
+        help='Whose language history to use for --language auto (default: login name)'
+    )
+    
+    parser.add_argument(
+        '--reference',
+        metavar='TEXT_FILE',
+        help='Reference transcript of --fixture for --benchmark prompt'
+    )
+    
+    parser.add_argument(
+        '--temperature',
+        type=float,
+        default=0.0,
+        help='Sampling temperature for --redecode (default: 0.0)'
+    )
+    
+    parser.add_argument(
+        '--encoder-cache-mb',
+        type=int,
+        metavar='MB',
+        help='Size limit of the encoder output cache used by --redecode (default: 1024, 0 disables)'
+    )
+    
+    parser.add_argument(
+        '--transcribe',
+        nargs='+',
+        metavar='AUDIO_FILE',
+        help='Transcribe audio files (short clips are decoded in batches) and exit'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        metavar='N',
+        help='Clips per batch for --transcribe and --benchmark batch (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--beam-size',
+        type=int,
+        metavar='N',
+        help='Beam width for batched decoding (default: greedy)'
+    )
+    
+    parser.add_argument(
+        '--no-decode-guard',
+        dest='decode_guard',
+        action='store_false',
+        default=None,
+        help='Do not cut looping or silent decodes short'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        metavar='N',
+        help='Torch intra-op (BLAS/OpenMP) threads for inference (default: torch default)'
+    )
+    
+    parser.add_argument(
+        '--interop-threads',
+        type=int,
+        metavar='N',
+        help='Torch inter-op threads (default: torch default)'
+    )
+    
+    parser.add_argument(
+        '--cpu-affinity',
+        metavar='CPUS',
+        help='Pin the process to CPUs, e.g. "0-3" or "0,2,4-7" (Linux)'
+    )
+    
+    parser.add_argument(
+        '--engines',
+        type=int,
+        default=2,
+        metavar='N',
+        help='Concurrent engines for --benchmark threads (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--writers',
+        type=int,
+        default=4,
+        metavar='N',
+        help='Writer processes for --benchmark ingest (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--benchmark',
+        choices=['encoder-cache', 'batch', 'threads', 'loading', 'ingest', 'prompt'],
+        help='Run a benchmark on --fixture (or the built-in fixture) and exit'
+    )
+    
+    parser.add_argument(
+        '--retention',
+        action='store_true',
+        help='Apply the retention_* settings to stored recordings, then exit'
+    )
+    
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='With --retention, only report what would be compressed or deleted'
+    )
+    
+    parser.add_argument(
+        '--compress-after-days',
+        dest='retention_compress_days',
+        type=float,
+        metavar='DAYS',
+        help='Compress audio older than DAYS (retention)'
+    )
+    
+    parser.add_argument(
+        '--delete-audio-after-days',
+        dest='retention_delete_days',
+        type=float,
+        metavar='DAYS',
+        help='Delete audio older than DAYS; transcripts are kept (retention)'
+    )
+    
+    parser.add_argument(
+        '--max-storage-mb',
+        dest='retention_max_mb',
+        type=float,
+        metavar='MB',
+        help='Delete the oldest audio once recordings exceed MB (retention)'
+    )
+    
+    parser.add_argument(
+        '--reconcile',
+        action='store_true',
+        help='Recompute the session index and storage totals from disk, then exit'
+    )
+    
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Move existing recordings into the content-addressed blob store so identical audio is stored once, then exit'
+    )
+    
+    parser.add_argument(
+        '--export',
+        metavar='RANGE',
+        help='Export sessions in a date range (2025-07, 2025-07-01..2025-07-15, all) to one bundle'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=['tar.zst', 'jsonl', 'parquet'],
+        help='Bundle format for --export (default: from --output, else tar.zst)'
+    )
+    
+    parser.add_argument(
+        '--output', '-o',
+        type=Path,
+        metavar='FILE',
+        help='Bundle path for --export (default: whisper-term-<RANGE>.<format>)'
+    )
+    
+    parser.add_argument(
+        '--import',
+        dest='import_bundles',
+        nargs='+',
+        type=Path,
+        metavar='BUNDLE',
+        help='Import session bundles into the data directory, then exit'
+    )
+    
+    parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='With --import, replace sessions that already exist'
+    )
+    
+    parser.add_argument(
+        '--live',
+        action='store_true',
+        default=None,
+        help='Show partial transcription and input level while recording (interactive mode)'
+    )
+    
     parser.add_argument(
         '--recent',
         type=int,
@@ -72,18 +552,145 @@ For more information, visit: https://github.com/user/whisper-term
         help='Show N recent sessions and exit'
     )
     
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run the OpenAI-compatible /v1/audio/transcriptions server'
+    )
+    
+    parser.add_argument(
+        '--host',
+        dest='server_host',
+        help='Address for --serve (default: 127.0.0.1)'
+    )
+    
+    parser.add_argument(
+        '--port',
+        dest='server_port',
+        type=int,
+        help='Port for --serve (default: 8000)'
+    )
+    
+    parser.add_argument(
+        '--server-engines',
+        type=int,
+        metavar='N',
+        help='Engines (model copies) serving requests with --serve (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--server-queue',
+        type=int,
+        metavar='N',
+        help='Requests accepted at once by --serve before answering 429 (default: 16)'
+    )
+    
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='PORT',
+        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics (interactive and --serve)'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        metavar='PATH',
+        help='Write Prometheus metrics to PATH every metrics_interval seconds'
+    )
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    models_parser = subparsers.add_parser(
+        'models',
+        help='Manage cached Whisper models (list, pull, verify, rm, convert)'
+    )
+    models_actions = models_parser.add_subparsers(dest='models_command', metavar='ACTION')
+    models_actions.required = True
+    models_actions.add_parser('list', help='Show known models, cache sizes and variants')
+    for action, help_text in (('pull', 'Download and verify models'),
+                              ('verify', 'Check cached models against their checksums'),
+                              ('rm', 'Delete cached models and their variants'),
+                              ('convert', 'Precompute an optimized model variant')):
+        action_parser = models_actions.add_parser(action, help=help_text)
+        action_parser.add_argument(
+            'names',
+            nargs='+' if action in ('pull', 'rm', 'convert') else '*',
+            metavar='MODEL',
+            help='Model names' + (' (default: all cached)' if action == 'verify' else '')
+        )
+        if action in ('pull', 'verify'):
+            action_parser.add_argument('--workers', type=int, default=4,
+                                       help='Models processed in parallel (default: 4)')
+        if action == 'pull':
+            action_parser.add_argument('--force', action='store_true',
+                                       help='Download even if a verified copy is cached')
+        if action == 'convert':
+            action_parser.add_argument('--variant', choices=['int8', 'mmap'], required=True,
+                                       help='int8: quantized for CPU; mmap: memory-mapped fp32')
+    
     args = parser.parse_args()
+    args.outputs = ",".join(args.sink) if args.sink else None
+    
+    # Resolve settings once: defaults < config file < profile < flags
+    try:
+        config = load_config(args.config, args.profile).with_overrides(
+            **{name: getattr(args, name) for name in _CONFIG_FLAGS}
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ Config error: {e}")
+        sys.exit(1)
+    
+    if args.show_config:
+        print(format_config(config))
+        return
+    
+    # The stdout sink owns the real stdout; status messages move to stderr
+    if config.outputs and "stdout" in [part.strip() for part in config.outputs.split(",")]:
+        sys.stdout = sys.stderr
+    
+    # Pin before torch starts its thread pools so they inherit the mask
+    if config.cpu_affinity:
+        from .compute import parse_cpu_list, set_cpu_affinity
+        try:
+            cpus = parse_cpu_list(config.cpu_affinity)
+        except ValueError:
+            print(f"❌ Invalid CPU list: {config.cpu_affinity}")
+            sys.exit(1)
+        set_cpu_affinity(cpus)
+    
+    # Handle the models subcommand
+    if args.command == 'models':
+        sys.exit(_models_command(args, Path(config.data_dir) / "models"))
+    
+    # Handle --serve option
+    if args.serve:
+        from .server import run_server
+        run_server(config)
+        return
     
-    # Handle --record option (direct mode)
-    if args.record:
+    # Handle --list-devices option
+    if args.list_devices:
+        import sounddevice as sd
+        print(sd.query_devices())
+        return
+    
+    # Handle --record option (direct mode), from a device or another input source
+    if args.record or args.stdin or args.input or args.replay:
         from .direct_mode import DirectModeHandler
+        from .input_sources import PCMStreamSource, WavReplaySource
         
         try:
-            direct_handler = DirectModeHandler(
-                model_name=args.model,
-                language=args.language,
-                clipboard_enabled=args.clipboard
-            )
+            source = None
+            if args.replay:
+                source = WavReplaySource(Path(args.replay), realtime=not args.replay_fast)
+            elif args.stdin or args.input:
+                source = PCMStreamSource(
+                    '-' if args.stdin else args.input,
+                    sample_rate=args.input_rate,
+                    channels=args.input_channels,
+                    sample_format=args.input_format
+                )
+            
+            direct_handler = DirectModeHandler(config, source=source)
             
             success = direct_handler.run_direct_recording()
             sys.exit(0 if success else 1)
@@ -92,13 +699,241 @@ For more information, visit: https://github.com/user/whisper-term
             print(f"❌ Direct mode error: {e}")
             sys.exit(1)
     
+    # Handle --calibrate option
+    if args.calibrate:
+        try:
+            from .calibration import calibrate, cached_models
+            
+            data_dir = Path(config.data_dir)
+            models_dir = data_dir / "models"
+            
+            if not cached_models(models_dir):
+                print(f"⚠️  No cached models in {models_dir} - run 'whisper-term models pull <model>' first")
+                sys.exit(1)
+            
+            fixture = _load_audio_file(args.fixture) if args.fixture else None
+            
+            calibrate(models_dir, data_dir / "host_profile.json", fixture=fixture)
+            return
+            
+        except Exception as e:
+            print(f"❌ Calibration error: {e}")
+            sys.exit(1)
+    
+    # Handle --redecode option
+    if args.redecode:
+        try:
+            from .transcription_engine import TranscriptionEngine
+            
+            engine = TranscriptionEngine.from_config(config)
+            audio_data = _load_audio_file(args.redecode)
+            result = engine.transcribe_windows(audio_data, temperature=args.temperature)
+            if "error" in result:
+                sys.exit(1)
+            
+            print(f"\n💬 {result['text']}")
+            print(f"⏱️  Decoded in {result['decode_time']:.2f}s")
+            if engine.encoder_cache:
+                info = engine.encoder_cache.get_info()
+                print(f"🗄️  Encoder cache: {info['hits']} hit(s), {info['misses']} miss(es), "
+                      f"{info['size_mb']:.1f}/{info['max_mb']:.0f} MB")
+            return
+            
+        except Exception as e:
+            print(f"❌ Re-decode error: {e}")
+            sys.exit(1)
+    
+    # Handle --transcribe option
+    if args.transcribe:
+        try:
+            from .transcription_engine import TranscriptionEngine
+            
+            engine = TranscriptionEngine.from_config(config)
+            
+            failed = False
+            for start in range(0, len(args.transcribe), config.batch_size):
+                paths = args.transcribe[start:start + config.batch_size]
+                clips = [_load_audio_file(path) for path in paths]
+                for path, result in zip(paths, engine.transcribe_batch(clips, beam_size=config.beam_size)):
+                    failed = failed or "error" in result
+                    print(f"{path}\t{result['text']}")
+            
+            sys.exit(1 if failed else 0)
+            
+        except Exception as e:
+            print(f"❌ Transcription error: {e}")
+            sys.exit(1)
+    
+    # Handle --benchmark option
+    if args.benchmark:
+        try:
+            from .transcription_engine import TranscriptionEngine
+            from .calibration import make_fixture
+            from . import benchmark
+            
+            if args.benchmark == 'ingest':
+                results = benchmark.benchmark_ingest(writers=args.writers)
+                benchmark.print_report("Parallel ingest into one data dir", results)
+                return
+            
+            if args.benchmark == 'prompt' and not (args.fixture and args.reference):
+                print("❌ --benchmark prompt needs --fixture with speech and its --reference transcript")
+                sys.exit(1)
+            
+            audio_data = _load_audio_file(args.fixture) if args.fixture else make_fixture()
+            
+            if args.benchmark == 'loading':
+                results = benchmark.benchmark_file_loading(audio_data)
+                benchmark.print_report("Audio file loading: in-process vs ffmpeg (files/s)", results)
+                return
+            
+            if args.benchmark == 'threads':
+                model_name = 'base' if config.model == 'auto' else config.model
+                results = benchmark.benchmark_threads(
+                    model_name, str(Path(config.data_dir) / "models"), audio_data, engines=args.engines
+                )
+                benchmark.print_report("Thread settings: aggregate RTF (lower is better)", results)
+                return
+            
+            engine = TranscriptionEngine.from_config(config)
+            
+            if args.benchmark == 'encoder-cache':
+                results = benchmark.benchmark_encoder_cache(engine, audio_data)
+                benchmark.print_report("Encoder cache: decoder-only rerun vs full re-transcribe", results)
+            elif args.benchmark == 'batch':
+                results = benchmark.benchmark_batch(engine, audio_data, batch_size=config.batch_size)
+                benchmark.print_report("Batched vs one-at-a-time decoding of short clips", results)
+            elif args.benchmark == 'prompt':
+                reference = Path(args.reference).read_text(encoding='utf-8')
+                results = benchmark.benchmark_prompt(engine, audio_data, reference)
+                benchmark.print_report("Vocabulary prompt: accuracy gain vs latency cost", results)
+            return
+            
+        except Exception as e:
+            print(f"❌ Benchmark error: {e}")
+            sys.exit(1)
+    
+    # Handle --rediarize option
+    if args.rediarize:
+        if not config.num_speakers:
+            print("❌ --rediarize requires --num-speakers")
+            sys.exit(1)
+        
+        from .file_manager import FileManager
+        from .session_manager import SessionManager
+        from .diarization import format_labelled
+        
+        session_manager = SessionManager(FileManager(config.data_dir))
+        labelled = session_manager.rediarize(args.rediarize, config.num_speakers)
+        if labelled is None:
+            sys.exit(1)
+        
+        print(format_labelled(labelled))
+        return
+    
+    # Handle --retention option
+    if args.retention:
+        try:
+            from .file_manager import FileManager
+            from .session_manager import SessionManager
+            from .retention import RetentionEngine, RetentionPolicy
+            
+            policy = RetentionPolicy.from_config(config)
+            if not policy.enabled:
+                print("⚠️  No retention rules set - use --compress-after-days, "
+                      "--delete-audio-after-days or --max-storage-mb (or retention_* in the config)")
+                sys.exit(1)
+            
+            engine = RetentionEngine(SessionManager(FileManager(config.data_dir)), policy)
+            report = engine.run_all(dry_run=args.dry_run)
+            
+            for action in report.actions:
+                label = "compress" if action.action == "compress" else "delete audio"
+                print(f"   {action.session_id}: {label} ({action.reason})")
+            print(report.summary())
+            sys.exit(1 if report.failed else 0)
+            
+        except ValueError as e:
+            print(f"❌ Retention error: {e}")
+            sys.exit(1)
+    
+    # Handle --reconcile option
+    if args.reconcile:
+        try:
+            from .file_manager import FileManager
+            from .session_manager import SessionManager
+            
+            session_manager = SessionManager(FileManager(config.data_dir))
+            result = session_manager.reconcile_storage()
+            before, after = result["before"], result["after"]
+            
+            print("📊 Storage (reconciled):")
+            for month, totals in after["months"].items():
+                print(f"   {month}: {totals['sessions']} sessions, {totals['files']} files, "
+                      f"{totals['bytes'] / (1024 * 1024):.1f} MB, {totals['audio_seconds'] / 60:.1f} min audio")
+            print(f"   Total: {after['total_sessions']} sessions, {after['total_files']} files, "
+                  f"{after['total_size_mb']:.1f} MB, {after['audio_seconds'] / 60:.1f} min audio")
+            
+            drift = after['total_size_bytes'] - before['total_size_bytes']
+            if drift or after['total_files'] != before['total_files']:
+                print(f"   Corrected cached totals by {after['total_files'] - before['total_files']:+d} files, "
+                      f"{drift / (1024 * 1024):+.1f} MB")
+            return
+            
+        except Exception as e:
+            print(f"❌ Reconcile error: {e}")
+            sys.exit(1)
+    
+    # Handle --dedup option
+    if args.dedup:
+        try:
+            from .file_manager import FileManager
+            from .session_manager import SessionManager
+            
+            file_manager = FileManager(config.data_dir)
+            report = SessionManager(file_manager).deduplicate_audio()
+            collected = file_manager.blobs.collect()
+            print(f"🧬 Deduplicated {report['files']} audio file(s): {report['duplicates']} duplicate(s), "
+                  f"{(report['bytes_reclaimed'] + collected['bytes']) / (1024 * 1024):.1f} MB reclaimed")
+            return
+            
+        except Exception as e:
+            print(f"❌ Dedup error: {e}")
+            sys.exit(1)
+    
+    # Handle --export / --import options
+    if args.export or args.import_bundles:
+        try:
+            from .file_manager import FileManager
+            from .session_manager import SessionManager
+            from .archive import SessionArchiver, detect_format
+            
+            archiver = SessionArchiver(SessionManager(FileManager(config.data_dir)))
+            
+            if args.export:
+                fmt = args.format or (detect_format(args.output) if args.output else 'tar.zst')
+                output = args.output or Path(f"whisper-term-{args.export.replace('..', '_to_')}.{fmt}")
+                counts = archiver.export(args.export, output, fmt)
+                print(f"📦 Exported {counts['sessions']} session(s), {counts['files']} files, "
+                      f"{counts['bytes'] / (1024 * 1024):.1f} MB to {output}")
+            
+            for bundle in args.import_bundles or []:
+                counts = archiver.import_bundle(bundle, overwrite=args.overwrite)
+                print(f"📥 Imported {counts['sessions']} session(s) ({counts['files']} files) from {bundle}"
+                      + (f", skipped {counts['skipped']} existing" if counts['skipped'] else ""))
+            return
+            
+        except Exception as e:
+            print(f"❌ Archive error: {e}")
+            sys.exit(1)
+    
     # Handle --recent option
     if args.recent:
         try:
             from .file_manager import FileManager
             from .session_manager import SessionManager
             
-            file_manager = FileManager(args.data_dir)
+            file_manager = FileManager(config.data_dir)
             session_manager = SessionManager(file_manager)
             
             print(f"📋 Recent Sessions (last {args.recent}):")
@@ -131,22 +966,14 @@ For more information, visit: https://github.com/user/whisper-term
         print("   Recommended: Python 3.8-3.11")
     
     # Create data directory if it doesn't exist
-    data_dir = Path(args.data_dir)
+    data_dir = Path(config.data_dir)
     data_dir.mkdir(parents=True, exist_ok=True)
     
     try:
-        # Initialize and run the application
-        app = WhisperTermApp(
-            model_name=args.model,
-            language=args.language
-        )
+        # Initialize and run the application (imports torch and whisper)
+        from .app import WhisperTermApp
         
-        # Override data directory if provided
-        if args.data_dir != 'data':
-            app.file_manager.base_data_dir = Path(args.data_dir)
-            app.file_manager.recordings_dir = app.file_manager.base_data_dir / "recordings"
-            app.file_manager.models_dir = app.file_manager.base_data_dir / "models"
-            app.file_manager._ensure_directories()
+        app = WhisperTermApp(config)
         
         # Run the application
         app.run()
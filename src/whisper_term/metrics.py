@@ -0,0 +1,372 @@
+"""Process metrics in the Prometheus text format."""
+
+import bisect
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """A named metric with optional labels; children are keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self._samples()) + "\n"
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        # An unlabelled metric reports 0 before its first update
+        self._values: Dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down.
+
+    Besides ``set``, a child can be bound to a function that is called
+    when the metrics are rendered (e.g. a queue's ``qsize``), so the
+    instrumented code does no work at all between scrapes.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        # An unlabelled metric reports 0 before its first update
+        self._values: Dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue  # The source went away; report nothing for it
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets, plus their sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = sorted(buckets)
+        # Per child: observations per bucket (last slot is +Inf) and their sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[slot] += 1
+            self._sums[key] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = sorted((key, list(counts), self._sums[key])
+                              for key, counts in self._counts.items())
+        lines = []
+        for key, counts, total in children:
+            cumulative = 0
+            for bound, count in zip(self.buckets + [math.inf], counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  **kwargs) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, **kwargs))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = Registry()
+
+# Instrumentation points. Updates take one short lock each and happen per
+# transcription, file or cache lookup, never per audio block: the audio
+# callback is not instrumented (recorded audio is counted when a recording
+# stops).
+TRANSCRIPTIONS = REGISTRY.counter(
+    "whisper_term_transcriptions_total", "Finished transcriptions", ["model", "mode"])
+TRANSCRIPTION_ERRORS = REGISTRY.counter(
+    "whisper_term_transcription_errors_total", "Failed transcriptions", ["model", "mode"])
+DECODE_SECONDS = REGISTRY.histogram(
+    "whisper_term_decode_seconds", "Wall-clock time of one transcription", ["model", "mode"])
+RTF = REGISTRY.histogram(
+    "whisper_term_rtf", "Real-time factor (decode time / audio duration)", ["model"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5))
+AUDIO_SECONDS = REGISTRY.counter(
+    "whisper_term_transcribed_audio_seconds_total", "Audio transcribed", ["model"])
+RECORDED_SECONDS = REGISTRY.counter(
+    "whisper_term_recorded_audio_seconds_total", "Audio captured from input sources")
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "whisper_term_model_load_seconds", "Time to load a model", ["model"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 120))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "whisper_term_queue_depth", "Items waiting in a work queue", ["queue"])
+BYTES_WRITTEN = REGISTRY.counter(
+    "whisper_term_bytes_written_total", "Bytes of session files written", ["kind"])
+ENCODER_CACHE_LOOKUPS = REGISTRY.counter(
+    "whisper_term_encoder_cache_lookups_total", "Encoder cache lookups", ["result"])
+LANGUAGE_DETECTIONS = REGISTRY.counter(
+    "whisper_term_language_detections_total",
+    "Language detections for --language auto (pinned, unsure, confirmed, redetected)", ["outcome"])
+ENCODER_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "whisper_term_encoder_cache_hit_ratio", "Share of encoder cache lookups that hit")
+
+
+def _hit_ratio() -> float:
+    hits = ENCODER_CACHE_LOOKUPS.value(result="hit")
+    total = hits + ENCODER_CACHE_LOOKUPS.value(result="miss")
+    return hits / total if total else 0.0
+
+
+ENCODER_CACHE_HIT_RATIO.set_function(_hit_ratio)
+
+
+def observe_transcription(model: str, mode: str, result: dict, audio_seconds: float) -> None:
+    """
+    Record one transcription result from TranscriptionEngine.
+
+    Args:
+        model: Model name
+        mode: Engine entry point (full, file, windows, batch)
+        result: The engine's result dictionary
+        audio_seconds: Duration of the transcribed audio
+    """
+    if "error" in result:
+        TRANSCRIPTION_ERRORS.inc(model=model, mode=mode)
+        return
+    TRANSCRIPTIONS.inc(model=model, mode=mode)
+    decode_time = result.get("decode_time")
+    if decode_time is None:
+        return
+    DECODE_SECONDS.observe(decode_time, model=model, mode=mode)
+    if audio_seconds > 0:
+        AUDIO_SECONDS.inc(audio_seconds, model=model)
+        RTF.observe(decode_time / audio_seconds, model=model)
+
+
+def write_metrics(path: Path, registry: Registry = REGISTRY) -> None:
+    """Write the current metrics to a file atomically (for node_exporter's textfile collector)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """
+    Serves ``GET /metrics`` on a local port and/or dumps the metrics to a
+    file every ``interval`` seconds, from daemon threads.
+    """
+
+    def __init__(self, port: Optional[int] = None, host: str = "127.0.0.1",
+                 path: Optional[Path] = None, interval: float = 15.0,
+                 registry: Registry = REGISTRY):
+        """
+        Initialize the exporter; nothing runs until start().
+
+        Args:
+            port: HTTP port for the text endpoint, or None for no endpoint
+            host: Interface to bind the endpoint to
+            path: File to dump the metrics to, or None for no dump
+            interval: Seconds between file dumps
+            registry: Metrics to export
+        """
+        self.port = port
+        self.host = host
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self.port is not None:
+            registry = self.registry
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                        self.send_error(404)
+                        return
+                    body = registry.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # Scrapes would flood the terminal
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                  name="metrics-http", daemon=True))
+            print(f"📈 Metrics at http://{self.host}:{self._server.server_address[1]}/metrics")
+
+        if self.path is not None:
+            self._threads.append(threading.Thread(target=self._dump_loop,
+                                                  name="metrics-dump", daemon=True))
+            print(f"📈 Metrics written to {self.path} every {self.interval:g}s")
+
+        for thread in self._threads:
+            thread.start()
+
+    def _dump(self) -> None:
+        try:
+            write_metrics(self.path, self.registry)
+        except OSError as e:
+            print(f"⚠️  Failed to write metrics: {e}")
+
+    def _dump_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._dump()
+
+    def stop(self) -> None:
+        """Stop the endpoint and write a final dump."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self.path is not None:
+            self._dump()
+
+
+def start_exporter(config: Config) -> Optional[MetricsExporter]:
+    """
+    Start the exporter for the configured metrics_port / metrics_file.
+
+    Returns:
+        Running exporter, or None if metrics export is off
+    """
+    if config.metrics_port is None and not config.metrics_file:
+        return None
+    exporter = MetricsExporter(
+        port=config.metrics_port,
+        path=Path(config.metrics_file).expanduser() if config.metrics_file else None,
+        interval=config.metrics_interval,
+    )
+    exporter.start()
+    return exporter
@@ -0,0 +1,390 @@
+"""Whisper model cache: prefetch, verification, removal and optimized variants."""
+
+import hashlib
+import json
+import os
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import whisper
+
+from .locking import file_lock
+
+VARIANTS = ["int8", "mmap"]
+
+_CHUNK = 1024 * 1024
+
+
+def model_names() -> List[str]:
+    """All model names whisper can download."""
+    return list(whisper._MODELS)
+
+
+def _url(name: str) -> str:
+    if name not in whisper._MODELS:
+        raise ValueError(f"Unknown model '{name}' (available: {', '.join(model_names())})")
+    return whisper._MODELS[name]
+
+
+def expected_sha256(name: str) -> str:
+    """Checksum of a model checkpoint; whisper's download URLs embed it."""
+    return _url(name).split("/")[-2]
+
+
+def checkpoint_path(name: str, models_dir: Path) -> Path:
+    """Cache path of a model's checkpoint."""
+    return Path(models_dir) / os.path.basename(_url(name))
+
+
+def variant_path(name: str, models_dir: Path, variant: str) -> Path:
+    """Cache path of a precomputed model variant."""
+    return Path(models_dir) / f"{name}.{variant}.pt"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Verification stamps: checkpoints whose hash was checked, keyed by file name
+# and invalidated when size or mtime change
+
+def _stamps_path(models_dir: Path) -> Path:
+    return Path(models_dir) / "verified.json"
+
+
+def _download_lock(name: str, models_dir: Path):
+    """Lock held while a model is downloaded, by any process sharing the cache."""
+    return file_lock(Path(models_dir) / f".{name}.lock")
+
+
+def _read_stamps(models_dir: Path) -> Dict[str, Any]:
+    try:
+        with open(_stamps_path(models_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _stamp(path: Path, sha256: Optional[str]) -> None:
+    """Record (or with sha256=None, drop) a verified checkpoint."""
+    with file_lock(path.parent / ".verified.lock"):
+        stamps = _read_stamps(path.parent)
+        if sha256 is None:
+            stamps.pop(path.name, None)
+        else:
+            st = path.stat()
+            stamps[path.name] = {"sha256": sha256, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        tmp_path = _stamps_path(path.parent).with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stamps, f, indent=1)
+        os.replace(tmp_path, _stamps_path(path.parent))
+
+
+def is_verified(name: str, models_dir: Path) -> bool:
+    """Whether a cached checkpoint was verified and has not changed since."""
+    path = checkpoint_path(name, models_dir)
+    stamp = _read_stamps(models_dir).get(path.name)
+    if not stamp or stamp.get("sha256") != expected_sha256(name):
+        return False
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    return st.st_size == stamp["size"] and st.st_mtime_ns == stamp["mtime_ns"]
+
+
+def pull(name: str, models_dir: Path, force: bool = False) -> Path:
+    """
+    Download a checkpoint, hashing it as it streams, and verify it.
+
+    Concurrent pulls of one model (from any process) download it once;
+    the others wait and find it cached.
+
+    Args:
+        name: Model name
+        models_dir: Whisper download root
+        force: Download even if a verified copy is cached
+
+    Returns:
+        Path of the verified checkpoint
+
+    Raises:
+        RuntimeError: If the download does not match the expected checksum
+    """
+    path = checkpoint_path(name, models_dir)
+    with _download_lock(name, models_dir):
+        if not force and path.exists() and (is_verified(name, models_dir) or verify(name, models_dir)):
+            print(f"✅ {name}: already cached")
+            return path
+
+        part_path = path.with_name(path.name + ".part")
+        digest = hashlib.sha256()
+
+        with urllib.request.urlopen(_url(name)) as response, open(part_path, "wb") as f:
+            total = int(response.info().get("Content-Length") or 0)
+            done = 0
+            next_report = 0.1
+            print(f"⬇️  {name}: downloading {total / (1024 * 1024):.0f} MB")
+            for chunk in iter(lambda: response.read(_CHUNK), b""):
+                f.write(chunk)
+                digest.update(chunk)
+                done += len(chunk)
+                if total and done / total >= next_report:
+                    print(f"   {name}: {done / total:.0%}")
+                    next_report += 0.1
+
+        if digest.hexdigest() != expected_sha256(name):
+            os.remove(part_path)
+            raise RuntimeError(f"{name}: checksum mismatch, download discarded")
+
+        os.replace(part_path, path)
+        _stamp(path, digest.hexdigest())
+        print(f"✅ {name}: downloaded and verified")
+        return path
+
+
+def verify(name: str, models_dir: Path) -> bool:
+    """
+    Hash a cached checkpoint against its expected checksum.
+
+    Returns:
+        True if the checkpoint exists and matches
+    """
+    path = checkpoint_path(name, models_dir)
+    if not path.exists():
+        return False
+    sha256 = _file_sha256(path)
+    ok = sha256 == expected_sha256(name)
+    _stamp(path, sha256 if ok else None)
+    return ok
+
+
+def remove(name: str, models_dir: Path) -> int:
+    """
+    Delete a model's checkpoint and variants.
+
+    Returns:
+        Bytes freed
+    """
+    freed = 0
+    paths = [checkpoint_path(name, models_dir)]
+    paths += [variant_path(name, models_dir, variant) for variant in VARIANTS]
+    for path in paths:
+        try:
+            size = path.stat().st_size
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            continue
+        if path == paths[0]:
+            _stamp(path, None)
+    return freed
+
+
+def cache_listing(models_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Describe every known model's cache state.
+
+    Returns:
+        One dictionary per model with name, cached, verified, size and variants
+    """
+    listing = []
+    for name in model_names():
+        path = checkpoint_path(name, models_dir)
+        variants = {}
+        for variant in VARIANTS:
+            vpath = variant_path(name, models_dir, variant)
+            if vpath.exists():
+                variants[variant] = vpath.stat().st_size
+        listing.append({
+            "name": name,
+            "cached": path.exists(),
+            "verified": is_verified(name, models_dir),
+            "size": path.stat().st_size if path.exists() else 0,
+            "variants": variants,
+        })
+    return listing
+
+
+def run_parallel(func, names: List[str], workers: int = 4) -> Dict[str, Any]:
+    """
+    Apply func(name) to several models concurrently.
+
+    Returns:
+        Result or raised exception per model name
+    """
+    def call(name):
+        try:
+            return func(name)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        return dict(zip(names, pool.map(call, names)))
+
+
+# Loading
+
+def _default_device() -> str:
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _finish(model, name: str, device: str):
+    """Apply load_model's post-load steps."""
+    if name in whisper._ALIGNMENT_HEADS:
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[name])
+    return model.to(device)
+
+
+def _load_checkpoint(path: Path, name: str, device: str):
+    """Load a verified checkpoint without whisper's hash-on-every-load."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    checkpoint = torch.load(path, map_location="cpu")
+    model = Whisper(ModelDimensions(**checkpoint["dims"]))
+    model.load_state_dict(checkpoint["model_state_dict"])
+    return _finish(model, name, device)
+
+
+def _plain_linears(module) -> None:
+    """Swap whisper's Linear subclass for nn.Linear so dynamic quantization applies."""
+    import torch
+    from whisper.model import Linear
+
+    for child_name, child in module.named_children():
+        if isinstance(child, Linear):
+            plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain.weight = child.weight
+            plain.bias = child.bias
+            setattr(module, child_name, plain)
+        else:
+            _plain_linears(child)
+
+
+def _quantize(model):
+    import torch
+
+    _plain_linears(model)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def convert(name: str, models_dir: Path, variant: str) -> Path:
+    """
+    Precompute an optimized variant of a cached model.
+
+    ``int8`` stores a dynamically quantized model (CPU only: smaller and
+    faster linear layers). ``mmap`` stores fp32 weights that load with
+    torch.load(mmap=True), so loading is near-instant and concurrent
+    engines share pages.
+
+    Args:
+        name: Model name (must be cached, see pull)
+        models_dir: Whisper download root
+        variant: One of VARIANTS
+
+    Returns:
+        Path of the variant file
+    """
+    import torch
+    from dataclasses import asdict
+
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant '{variant}' (available: {', '.join(VARIANTS)})")
+    path = checkpoint_path(name, models_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"{name} is not cached - run 'whisper-term models pull {name}' first")
+
+    model = _load_checkpoint(path, name, "cpu").float()
+    if variant == "int8":
+        model = _quantize(model)
+
+    target = variant_path(name, models_dir, variant)
+    tmp_path = target.with_name(target.name + ".tmp")
+    torch.save({
+        "variant": variant,
+        "dims": asdict(model.dims),
+        "model_state_dict": model.state_dict(),
+    }, tmp_path)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _load_variant(path: Path, name: str, variant: str, device: str):
+    """Load a variant written by convert()."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    if variant == "mmap":
+        try:
+            checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        except TypeError:
+            print("⚠️  This torch version cannot memory-map checkpoints - loading normally")
+            checkpoint = torch.load(path, map_location="cpu")
+        model = Whisper(ModelDimensions(**checkpoint["dims"]))
+        try:
+            model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        except TypeError:
+            model.load_state_dict(checkpoint["model_state_dict"])
+        return _finish(model, name, device)
+
+    # Quantized weights are only usable on CPU
+    checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    model = _quantize(Whisper(ModelDimensions(**checkpoint["dims"])))
+    model.load_state_dict(checkpoint["model_state_dict"])
+    return _finish(model, name, "cpu")
+
+
+def load_model(name: str, models_dir: Path, variant: Optional[str] = None,
+               offline: bool = False, device: Optional[str] = None):
+    """
+    Load a model, preferring a precomputed variant and verified cache.
+
+    Args:
+        name: Model name
+        models_dir: Whisper download root
+        variant: Preferred variant ("int8", "mmap") if it has been converted
+        offline: Fail instead of downloading a missing checkpoint
+        device: Torch device (default: CUDA if available)
+
+    Returns:
+        Loaded Whisper model
+    """
+    device = device or _default_device()
+    if name not in whisper._MODELS:
+        # A checkpoint path; whisper loads it as is
+        return whisper.load_model(name, device=device, download_root=str(models_dir))
+
+    if variant:
+        vpath = variant_path(name, models_dir, variant)
+        if vpath.exists():
+            return _load_variant(vpath, name, variant, device)
+        print(f"⚠️  No {variant} variant of '{name}' - run 'whisper-term models convert {name} "
+              f"--variant {variant}'; loading the standard checkpoint")
+
+    path = checkpoint_path(name, models_dir)
+    if path.exists() and is_verified(name, models_dir):
+        return _load_checkpoint(path, name, device)
+
+    if not path.exists():
+        if offline:
+            raise RuntimeError(f"Model '{name}' is not cached and offline mode is on - "
+                               f"run 'whisper-term models pull {name}'")
+        print(f"⬇️  Model '{name}' is not cached - downloading now "
+              f"(prefetch with 'whisper-term models pull {name}')")
+
+    # whisper downloads straight into the cache, so one process at a time
+    with _download_lock(name, models_dir):
+        if path.exists() and is_verified(name, models_dir):
+            return _load_checkpoint(path, name, device)  # Pulled while we waited
+        # whisper downloads if needed and checks the hash; remember the check
+        model = whisper.load_model(name, device=device, download_root=str(models_dir))
+        _stamp(path, expected_sha256(name))
+    return model
@@ -1,23 +1,205 @@
 """Data models for Whisper Term."""
 
-from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+PREVIEW_LENGTH = 100
+
+
+def make_preview(text: str, length: int = PREVIEW_LENGTH) -> str:
+    """Shorten text to a one-line preview."""
+    if not text:
+        return ""
+    return text[:length] + "..." if len(text) > length else text
+
+
+def join_parts(results: List[Dict[str, Any]], durations: List[float]) -> Dict[str, Any]:
+    """
+    Combine the transcriptions of a paused-and-resumed recording.
+
+    Args:
+        results: Transcription result of each part, in recording order
+        durations: Audio length of each part, in seconds
+
+    Returns:
+        One transcription result for the whole recording, with segment
+        times shifted onto the joined audio and a "parts" list recording
+        where each part lies in the audio (seconds) and the text (characters)
+    """
+    texts: List[str] = []
+    segments: List[Dict[str, Any]] = []
+    parts: List[Dict[str, Any]] = []
+    text_length = 0
+    start = 0.0
+    for result, duration in zip(results, durations):
+        text = result.get("text", "").strip()
+        if text and texts:
+            text_length += 1  # Joining space
+        parts.append({
+            "start": start,
+            "end": start + duration,
+            "text_start": text_length,
+            "text_end": text_length + len(text),
+            "language": result.get("language"),
+            "decode_time": result.get("decode_time"),
+        })
+        if text:
+            texts.append(text)
+            text_length += len(text)
+        for segment in result.get("segments") or []:
+            segments.append(dict(segment, id=len(segments),
+                                 start=segment["start"] + start, end=segment["end"] + start))
+        start += duration
+
+    joined = {
+        "text": " ".join(texts),
+        "language": next((r["language"] for r in results if r.get("language")), None),
+        "segments": segments,
+        "decode_time": sum(r.get("decode_time") or 0.0 for r in results),
+        "guard_hits": sum(r.get("guard_hits") or 0 for r in results),
+        "parts": parts,
+    }
+    errors = [r["error"] for r in results if r.get("error")]
+    if errors:
+        joined["error"] = errors[0]
+    return joined
+
+
+class SessionMetadata:
+    """
+    Structured metadata written once per session as a JSON sidecar.
+
+    Everything needed to list a session lives here, so listing never has
+    to open the audio or read the full transcription.
+    """
+
+    VERSION = 1
+
+    __slots__ = (
+        "model", "language", "duration", "decode_time", "rtf",
+        "sample_rate", "checksum", "transcript_length", "preview",
+        "segment_count", "speaker_count", "audio_state", "guard_hits", "parts",
+        "audio_blob",
+    )
+
+    def __init__(self, model: Optional[str] = None, language: Optional[str] = None,
+                 duration: float = 0.0, decode_time: Optional[float] = None,
+                 rtf: Optional[float] = None, sample_rate: int = 16000,
+                 checksum: Optional[str] = None, transcript_length: int = 0,
+                 preview: str = "", segment_count: int = 0,
+                 speaker_count: Optional[int] = None, audio_state: str = "wav",
+                 guard_hits: int = 0, parts: Optional[List[Dict[str, Any]]] = None,
+                 audio_blob: Optional[str] = None):
+        """
+        Initialize session metadata.
+
+        Args:
+            model: Whisper model used for transcription
+            language: Detected or requested language
+            duration: Audio duration in seconds
+            decode_time: Wall-clock transcription time in seconds
+            rtf: Real-time factor (decode_time / duration)
+            sample_rate: Audio sample rate
+            checksum: SHA-256 of the stored PCM samples
+            transcript_length: Number of characters in the transcription
+            preview: Short transcription preview
+            segment_count: Number of Whisper segments
+            speaker_count: Number of speakers found by diarization, if run
+            audio_state: How the audio is stored: "wav", a compressed
+                codec ("flac", "gzip") or "deleted" by retention
+            guard_hits: Decodes cut short by the repetition/silence guard
+            parts: For a recording that was paused and resumed, where each
+                part lies in the audio and the text (see join_parts)
+            audio_blob: SHA-256 of the stored audio file, which names the
+                blob it shares with identical recordings (see blob_store)
+        """
+        self.model = model
+        self.language = language
+        self.duration = duration
+        self.decode_time = decode_time
+        self.rtf = rtf
+        self.sample_rate = sample_rate
+        self.checksum = checksum
+        self.transcript_length = transcript_length
+        self.preview = preview
+        self.segment_count = segment_count
+        self.speaker_count = speaker_count
+        self.audio_state = audio_state
+        self.guard_hits = guard_hits
+        self.parts = parts
+        self.audio_blob = audio_blob
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metadata to a JSON-serializable dictionary."""
+        data = {"version": self.VERSION}
+        for name in self.__slots__:
+            data[name] = getattr(self, name)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionMetadata":
+        """Create metadata from a dictionary, ignoring unknown keys."""
+        return cls(**{k: v for k, v in data.items() if k in cls.__slots__})
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SessionMetadata({fields})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SessionMetadata):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
 
 
-@dataclass
 class RecordingSession:
-    """Represents a recording session with metadata."""
-    
-    timestamp: datetime
-    audio_path: Path
-    text_path: Path
-    transcription: str
-    duration: float
-    
-    def __post_init__(self):
-        """Ensure paths are Path objects."""
-        if not isinstance(self.audio_path, Path):
-            self.audio_path = Path(self.audio_path)
-        if not isinstance(self.text_path, Path):
-            self.text_path = Path(self.text_path)
\ No newline at end of file
+    """
+    Represents a recording session with metadata.
+
+    Uses __slots__ so that large session listings stay compact. The
+    transcription is None when the session was loaded from its sidecar
+    without reading the text file.
+    """
+
+    __slots__ = ("timestamp", "audio_path", "text_path", "transcription",
+                 "duration", "metadata")
+
+    def __init__(self, timestamp: datetime, audio_path: Path, text_path: Path,
+                 transcription: Optional[str], duration: float,
+                 metadata: Optional[SessionMetadata] = None):
+        """Initialize the session, ensuring paths are Path objects."""
+        self.timestamp = timestamp
+        self.audio_path = audio_path if isinstance(audio_path, Path) else Path(audio_path)
+        self.text_path = text_path if isinstance(text_path, Path) else Path(text_path)
+        self.transcription = transcription
+        self.duration = duration
+        self.metadata = metadata
+
+    @property
+    def metadata_path(self) -> Path:
+        """Path of the JSON metadata sidecar."""
+        return self.audio_path.with_suffix(".json")
+
+    @property
+    def transcript_length(self) -> int:
+        """Transcription length, without reading the text file if possible."""
+        if self.transcription is not None:
+            return len(self.transcription)
+        return self.metadata.transcript_length if self.metadata else 0
+
+    @property
+    def preview(self) -> str:
+        """Transcription preview, without reading the text file if possible."""
+        if self.transcription is not None:
+            return make_preview(self.transcription)
+        return self.metadata.preview if self.metadata else ""
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RecordingSession({fields})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RecordingSession):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
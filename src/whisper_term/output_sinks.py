@@ -0,0 +1,284 @@
+"""Delivery of transcriptions to the clipboard, stdout, files, FIFOs and commands."""
+
+import errno
+import os
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+from .clipboard import ClipboardManager
+from .config import Config
+
+
+class OutputSink:
+    """
+    A destination for transcriptions.
+
+    ``write`` receives each finished transcription. Sinks created with
+    ``partials=True`` also receive committed live text through
+    ``write_partial`` as it is recognized (interactive --live mode),
+    followed by the finished transcription as usual.
+    """
+
+    name = "sink"
+
+    def __init__(self, partials: bool = False):
+        self.partials = partials
+
+    def write(self, text: str) -> bool:
+        """Deliver a finished transcription; returns success."""
+        raise NotImplementedError
+
+    def write_partial(self, text: str) -> None:
+        """Deliver committed live text (only called if partials is set)."""
+        self.write(text)
+
+    def close(self) -> None:
+        """Release any resources."""
+
+
+class ClipboardSink(OutputSink):
+    """Copies finished transcriptions to the clipboard."""
+
+    name = "clipboard"
+
+    def __init__(self, cache_path: Optional[Path] = None):
+        super().__init__(partials=False)
+        self.clipboard = ClipboardManager(cache_path)
+
+    def write(self, text: str) -> bool:
+        return self.clipboard.copy_to_clipboard(text)
+
+
+class StreamSink(OutputSink):
+    """Writes one line per transcription to a text stream, flushed at once."""
+
+    name = "stdout"
+
+    def __init__(self, stream: Optional[TextIO] = None, partials: bool = False):
+        super().__init__(partials)
+        # main points sys.stdout at stderr while this sink owns the real stdout
+        self.stream = stream or sys.__stdout__
+
+    def write(self, text: str) -> bool:
+        try:
+            self.stream.write(text + "\n")
+            self.stream.flush()
+            return True
+        except (OSError, ValueError):
+            return False  # Reader went away
+
+
+class FileSink(OutputSink):
+    """Appends one line per transcription to a file."""
+
+    name = "file"
+
+    def __init__(self, path: Path, partials: bool = False):
+        super().__init__(partials)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def write(self, text: str) -> bool:
+        try:
+            self._file.write(text + "\n")
+            return True
+        except OSError as e:
+            print(f"⚠️  Failed to append to {self.path}: {e}")
+            return False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FifoSink(OutputSink):
+    """
+    Writes one line per transcription to a named pipe.
+
+    The pipe is opened non-blocking per write, so a missing reader never
+    stalls transcription; text is dropped until someone is listening.
+    """
+
+    name = "fifo"
+
+    def __init__(self, path: Path, partials: bool = False):
+        super().__init__(partials)
+        self.path = Path(path)
+        if not self.path.exists():
+            os.mkfifo(self.path)
+
+    def write(self, text: str) -> bool:
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != errno.ENXIO:  # ENXIO: no reader
+                print(f"⚠️  Failed to open {self.path}: {e}")
+            return False
+        try:
+            os.write(fd, (text + "\n").encode("utf-8"))
+            return True
+        except OSError:
+            return False
+        finally:
+            os.close(fd)
+
+
+class CommandSink(OutputSink):
+    """Runs a shell command per finished transcription, with the text on stdin."""
+
+    name = "command"
+
+    def __init__(self, command: str, timeout: float = 30.0):
+        super().__init__(partials=False)
+        self.command = command
+        self.timeout = timeout
+
+    def write(self, text: str) -> bool:
+        try:
+            subprocess.run(self.command, shell=True, input=text.encode("utf-8"),
+                           timeout=self.timeout, check=True)
+            return True
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️  Output command failed: {e}")
+            return False
+
+
+# Sentinel telling the delivery thread to exit
+_STOP = object()
+
+
+class OutputRouter:
+    """
+    Fans transcriptions out to sinks on a delivery thread.
+
+    ``write`` and ``write_partial`` only queue the text, so a slow sink
+    (a command hook, a clipboard helper) never holds up transcription;
+    ``deliver`` writes synchronously when the caller wants the outcome.
+    """
+
+    def __init__(self, sinks: List[OutputSink]):
+        """
+        Initialize the router and start its delivery thread.
+
+        Args:
+            sinks: Destinations, written in order
+        """
+        self.sinks = sinks
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="output-router", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()  # flush() marker
+                continue
+            partial, text = item
+            for sink in self.sinks:
+                try:
+                    if not partial:
+                        sink.write(text)
+                    elif sink.partials:
+                        sink.write_partial(text)
+                except Exception as e:
+                    print(f"⚠️  Output to {sink.name} failed: {e}")
+
+    def write(self, text: str) -> None:
+        """Queue a finished transcription for every sink."""
+        if text:
+            self._queue.put((False, text))
+
+    def write_partial(self, text: str) -> None:
+        """Queue committed live text for sinks that take partials."""
+        if text:
+            self._queue.put((True, text))
+
+    def deliver(self, text: str) -> Dict[str, bool]:
+        """
+        Write a finished transcription now, after anything already queued.
+
+        Returns:
+            Success per sink name
+        """
+        self.flush()
+        results = {}
+        for sink in self.sinks:
+            try:
+                results[sink.name] = sink.write(text)
+            except Exception as e:
+                print(f"⚠️  Output to {sink.name} failed: {e}")
+                results[sink.name] = False
+        return results
+
+    def flush(self) -> None:
+        """Wait until queued text has been delivered."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """Deliver queued text, stop the thread and close the sinks."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+def parse_sinks(spec: str, data_dir: Path, partials: bool = False) -> List[OutputSink]:
+    """
+    Build sinks from a comma-separated spec.
+
+    Entries: ``clipboard``, ``stdout``, ``file:PATH`` and ``fifo:PATH``.
+
+    Args:
+        spec: Sink spec
+        data_dir: Data directory (holds the clipboard detection cache)
+        partials: Send committed live text to stdout, file and FIFO sinks
+
+    Raises:
+        ValueError: On an unknown entry
+    """
+    sinks: List[OutputSink] = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, target = entry.partition(":")
+        if kind == "clipboard":
+            sinks.append(ClipboardSink(data_dir / "cache" / "clipboard.json"))
+        elif kind == "stdout":
+            sinks.append(StreamSink(partials=partials))
+        elif kind == "file" and target:
+            sinks.append(FileSink(Path(target).expanduser(), partials=partials))
+        elif kind == "fifo" and target:
+            sinks.append(FifoSink(Path(target).expanduser(), partials=partials))
+        else:
+            raise ValueError(f"Unknown output '{entry}' (use clipboard, stdout, file:PATH or fifo:PATH)")
+    return sinks
+
+
+def create_router(config: Config, default_clipboard: bool = False) -> Optional[OutputRouter]:
+    """
+    Create the router for the configured outputs.
+
+    Args:
+        config: Effective settings (outputs, output_command, output_partials, clipboard)
+        default_clipboard: Copy to the clipboard when no outputs are configured
+
+    Returns:
+        Router, or None if there is nowhere to send transcriptions
+    """
+    spec = config.outputs
+    if spec is None:
+        spec = "clipboard" if default_clipboard and config.clipboard else ""
+    elif not config.clipboard:
+        spec = ",".join(part for part in spec.split(",") if part.strip() != "clipboard")
+
+    sinks = parse_sinks(spec, Path(config.data_dir), config.output_partials)
+    if config.output_command:
+        sinks.append(CommandSink(config.output_command))
+    return OutputRouter(sinks) if sinks else None
@@ -0,0 +1,249 @@
+"""Staged transcription pipeline for the interactive app."""
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .transcription_engine import TranscriptionEngine
+from .session_manager import SessionManager
+from .models import RecordingSession, join_parts
+from .diarization import count_speakers, diarize_result
+from .metrics import QUEUE_DEPTH
+
+
+@dataclass
+class TranscriptionJob:
+    """A single recording moving through the pipeline."""
+
+    seq: int
+    audio_data: np.ndarray
+    sample_rate: int
+    result: Dict[str, Any] = field(default_factory=dict)
+    session: Optional[RecordingSession] = None
+    diarizer: Any = None
+    speaker_segments: Optional[List[Dict[str, Any]]] = None
+    part: Optional[int] = None  # Index of a part of a paused recording
+    parts: Optional[List["TranscriptionJob"]] = None  # Earlier parts, on the last part
+
+
+# Sentinel telling a worker to exit
+_STOP = object()
+
+
+class TranscriptionPipeline:
+    """
+    Runs recordings through capture → transcribe → persist → output stages.
+
+    Each stage has its own worker thread connected by queues, so new
+    recordings can be captured while earlier ones are still decoding.
+    Both workers are single-threaded FIFOs, so results are delivered to
+    the output callback in the order recordings were submitted.
+
+    A recording that is paused and resumed is submitted part by part:
+    each part is transcribed as soon as it ends, and the last one joins
+    the earlier results into one session, so no part is decoded twice.
+    """
+
+    def __init__(self, transcription_engine: TranscriptionEngine,
+                 session_manager: SessionManager,
+                 on_complete: Callable[[TranscriptionJob], None],
+                 diarize: bool = False, num_speakers: Optional[int] = None,
+                 on_part: Optional[Callable[[TranscriptionJob], None]] = None):
+        """
+        Initialize the pipeline and start its workers.
+
+        Args:
+            transcription_engine: Engine used by the transcribe stage
+            session_manager: Session manager used by the persist stage
+            on_complete: Output callback, invoked once per job in submission order
+            diarize: Label transcription segments by speaker
+            num_speakers: Fixed speaker count for diarization, or None to discover
+            on_part: Called from the transcribe stage with each transcribed
+                part of a paused recording
+        """
+        self.transcription_engine = transcription_engine
+        self.session_manager = session_manager
+        self.on_complete = on_complete
+        self.on_part = on_part
+        self.diarize = diarize
+        self.num_speakers = num_speakers
+
+        self._transcribe_queue: "queue.Queue" = queue.Queue()
+        self._persist_queue: "queue.Queue" = queue.Queue()
+        QUEUE_DEPTH.set_function(self._transcribe_queue.qsize, queue="transcribe")
+        QUEUE_DEPTH.set_function(self._persist_queue.qsize, queue="persist")
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._next_seq = 0
+        self._pending = 0
+        self._open_parts: List[TranscriptionJob] = []
+
+        self._workers = [
+            threading.Thread(target=self._transcribe_worker, name="transcribe-worker", daemon=True),
+            threading.Thread(target=self._persist_worker, name="persist-worker", daemon=True),
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit_part(self, audio_data: np.ndarray, sample_rate: int) -> None:
+        """
+        Queue a finished part of a paused recording for transcription.
+
+        The part is saved with the rest of the recording by the next submit().
+
+        Args:
+            audio_data: Audio of the part
+            sample_rate: Audio sample rate
+        """
+        with self._lock:
+            job = TranscriptionJob(self._next_seq, audio_data, sample_rate,
+                                   part=len(self._open_parts))
+            self._open_parts.append(job)
+
+        self._transcribe_queue.put(job)
+
+    def submit(self, audio_data: np.ndarray, sample_rate: int) -> int:
+        """
+        Queue a recording for transcription.
+
+        Args:
+            audio_data: Recorded audio data (only the last part, if parts
+                were submitted with submit_part)
+            sample_rate: Audio sample rate
+
+        Returns:
+            Sequence number of the queued job
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending += 1
+            parts, self._open_parts = self._open_parts, []
+
+        self._transcribe_queue.put(TranscriptionJob(seq, audio_data, sample_rate,
+                                                    parts=parts or None))
+        return seq
+
+    def pending_count(self) -> int:
+        """Number of recordings submitted but not yet output."""
+        with self._lock:
+            return self._pending
+
+    def status_line(self) -> str:
+        """One-line pipeline status for the terminal."""
+        pending = self.pending_count()
+        if pending == 0:
+            return "✅ Queue empty"
+        return f"⏳ Queue: {pending} pending transcription{'s' if pending != 1 else ''}"
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every submitted job has been output.
+
+        Args:
+            timeout: Maximum time to wait in seconds, or None to wait forever
+
+        Returns:
+            True if the pipeline is idle, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop the workers.
+
+        Args:
+            wait: Whether to finish queued jobs before returning
+        """
+        self._transcribe_queue.put(_STOP)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _transcribe_worker(self) -> None:
+        """Transcribe stage: decode audio and hand the result to the persist stage."""
+        while True:
+            job = self._transcribe_queue.get()
+            if job is _STOP:
+                self._persist_queue.put(_STOP)
+                return
+
+            try:
+                job.result = self.transcription_engine.transcribe(job.audio_data)
+            except Exception as e:
+                print(f"❌ Transcription error: {e}")
+                job.result = {"text": "", "error": str(e)}
+
+            if job.part is not None:
+                if self.on_part:
+                    try:
+                        self.on_part(job)
+                    except Exception as e:
+                        print(f"❌ Pipeline output error: {e}")
+                continue
+
+            if job.parts:
+                # FIFO order: the earlier parts were transcribed before this one
+                parts = job.parts + [job]
+                job.result = join_parts(
+                    [part.result for part in parts],
+                    [len(part.audio_data) / job.sample_rate for part in parts]
+                )
+                job.audio_data = np.concatenate([part.audio_data for part in parts])
+                job.parts = None
+
+            if self.diarize and job.result.get("segments"):
+                try:
+                    job.diarizer, job.speaker_segments = diarize_result(
+                        job.audio_data, job.result, self.num_speakers
+                    )
+                except Exception as e:
+                    print(f"❌ Diarization error: {e}")
+
+            self._persist_queue.put(job)
+
+    def _persist_worker(self) -> None:
+        """Persist and output stage: save the session, then report it."""
+        while True:
+            job = self._persist_queue.get()
+            if job is _STOP:
+                return
+
+            try:
+                result = job.result
+                job.session = self.session_manager.create_session(
+                    audio_data=job.audio_data,
+                    transcription=result.get("text", ""),
+                    sample_rate=job.sample_rate,
+                    model_name=self.transcription_engine.model_name,
+                    language=result.get("language"),
+                    decode_time=result.get("decode_time"),
+                    segments=result.get("segments"),
+                    speaker_count=count_speakers(job.speaker_segments) if job.diarizer else None,
+                    guard_hits=result.get("guard_hits"),
+                    parts=result.get("parts")
+                )
+                if job.session and job.diarizer:
+                    self.session_manager.save_diarization(
+                        job.session, job.diarizer, job.speaker_segments
+                    )
+                # Audio is on disk now; release it while the job is reported
+                job.audio_data = None
+            except Exception as e:
+                print(f"❌ Failed to save session: {e}")
+
+            with self._idle:
+                self._pending -= 1
+
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                print(f"❌ Pipeline output error: {e}")
+            finally:
+                with self._idle:
+                    self._idle.notify_all()
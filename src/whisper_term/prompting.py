@@ -0,0 +1,86 @@
+"""Prompt biasing: vocabulary prompts, cached prompt tokens and rolling context."""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+
+# Whisper keeps at most n_text_ctx // 2 - 1 prompt tokens (the last ones)
+MAX_PROMPT_TOKENS = 223
+
+# Longest committed text carried into a live pass's prompt, in characters
+ROLLING_CONTEXT_CHARS = 400
+
+
+def parse_vocabulary(spec: Optional[str]) -> List[str]:
+    """
+    Split a comma-separated vocabulary ("Kubernetes, gRPC, Jane Doe") into
+    terms, dropping blanks and duplicates.
+    """
+    terms: List[str] = []
+    for term in (spec or "").split(","):
+        term = term.strip()
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def build_prompt(vocabulary: Optional[str], initial_prompt: Optional[str]) -> Optional[str]:
+    """
+    Combine vocabulary terms and a free-form prompt into one initial prompt.
+
+    Whisper follows the spelling and style of the text it is conditioned
+    on, so listing domain terms makes it prefer them over similar-sounding
+    words.
+
+    Returns:
+        Prompt text, or None if neither is set
+    """
+    parts = []
+    terms = parse_vocabulary(vocabulary)
+    if terms:
+        parts.append(", ".join(terms) + ".")
+    if initial_prompt and initial_prompt.strip():
+        parts.append(initial_prompt.strip())
+    return " ".join(parts) or None
+
+
+@lru_cache(maxsize=256)
+def encode_prompt(text: str, multilingual: bool, num_languages: int = 99) -> Tuple[int, ...]:
+    """
+    Tokenize prompt text once per model family (cached).
+
+    Args:
+        text: Prompt text
+        multilingual: Whether the model uses the multilingual tokenizer
+        num_languages: Languages of the model's tokenizer
+
+    Returns:
+        Token ids, at most MAX_PROMPT_TOKENS (the end of the text is kept)
+    """
+    from whisper.tokenizer import get_tokenizer
+
+    tokenizer = get_tokenizer(multilingual, num_languages=num_languages)
+    return tuple(tokenizer.encode(" " + text.strip())[-MAX_PROMPT_TOKENS:])
+
+
+def rolling_prompt(base: Sequence[int], previous: Sequence[int]) -> List[int]:
+    """
+    Prompt for the next window: the base prompt, then as much of the
+    previous window's text as fits. Whisper drops prompt tokens from the
+    front, so the previous text is trimmed instead of the vocabulary.
+    """
+    budget = MAX_PROMPT_TOKENS - len(base)
+    tail = list(previous[-budget:]) if budget > 0 and previous else []
+    return list(base) + tail
+
+
+def rolling_text(base: Optional[str], context: Optional[str]) -> Optional[str]:
+    """
+    Text prompt for a live pass: the base prompt plus the end of the text
+    committed so far, cut at a word boundary.
+    """
+    if context:
+        context = context.strip()
+        if len(context) > ROLLING_CONTEXT_CHARS:
+            context = context[-ROLLING_CONTEXT_CHARS:].split(" ", 1)[-1]
+    return " ".join(part for part in (base, context) if part) or None
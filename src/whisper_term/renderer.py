@@ -0,0 +1,180 @@
+"""Terminal rendering of live transcription and input level."""
+
+import math
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, TextIO
+
+
+METER_WIDTH = 10
+METER_FLOOR_DB = -60.0
+
+
+def format_level_meter(level: float, width: int = METER_WIDTH) -> str:
+    """
+    Render an RMS level as a fixed-width bar on a dB scale.
+
+    Args:
+        level: RMS amplitude in [0, 1]
+        width: Number of bar cells
+
+    Returns:
+        Meter string such as "[██████    ]"
+    """
+    db = 20 * math.log10(max(level, 1e-6))
+    fraction = min(max((db - METER_FLOOR_DB) / -METER_FLOOR_DB, 0.0), 1.0)
+    filled = int(round(fraction * width))
+    return "[" + "█" * filled + " " * (width - filled) + "]"
+
+
+class TerminalRenderer:
+    """
+    Draws a single live status line with committed text scrolling above it.
+
+    The line shows the input level meter and the current tentative
+    transcription, which is replaced in place as new hypotheses arrive.
+    Committed text is printed once as a normal line. Redraws happen on a
+    dedicated thread at most ``max_fps`` times per second and only when the
+    line actually changed; unchanged prefixes are not rewritten.
+    """
+
+    def __init__(self, stream: TextIO = sys.stdout, max_fps: float = 10.0,
+                 level_source: Optional[Callable[[], Optional[float]]] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            stream: Output stream (live line is only drawn on a TTY)
+            max_fps: Maximum redraws per second
+            level_source: Callable returning the current input level, or
+                None to hide the meter
+        """
+        self.stream = stream
+        self.interval = 1.0 / max_fps
+        self.level_source = level_source
+        self.live = hasattr(stream, "isatty") and stream.isatty()
+
+        self._lock = threading.Lock()
+        self._tentative = ""
+        self._committed: List[str] = []
+        self._last_line = ""
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the render thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="renderer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush pending output, clear the live line and stop the render thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._flush_committed()
+            self._clear_line()
+
+    def set_tentative(self, text: str) -> None:
+        """Replace the tentative (not yet stable) text."""
+        with self._lock:
+            self._tentative = text
+
+    def commit(self, text: str) -> None:
+        """Print stable text once above the live line."""
+        if not text:
+            return
+        with self._lock:
+            self._committed.append(text)
+
+    def reset(self) -> None:
+        """Drop tentative text, e.g. when a recording ends."""
+        with self._lock:
+            self._tentative = ""
+
+    @contextmanager
+    def suspended(self):
+        """
+        Temporarily remove the live line so other output can be printed.
+
+        The line is redrawn from scratch on the next tick.
+        """
+        with self._lock:
+            self._flush_committed()
+            self._clear_line()
+            yield
+
+    def _run(self) -> None:
+        """Render loop; sleeps between ticks so decoding keeps the CPU."""
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                self._flush_committed()
+                self._render()
+
+    def _compose(self) -> str:
+        """Build the live line for the current state."""
+        parts = []
+        level = self.level_source() if self.level_source else None
+        if level is not None:
+            parts.append("🎤 " + format_level_meter(level))
+        if self._tentative:
+            parts.append(self._tentative)
+        line = " ".join(parts)
+
+        width = max(shutil.get_terminal_size().columns - 1, 10)
+        if len(line) > width:
+            # Keep the newest words visible
+            line = "…" + line[-(width - 1):]
+        return line
+
+    def _render(self) -> None:
+        """Redraw the live line, writing only what changed."""
+        if not self.live:
+            return
+
+        line = self._compose()
+        last = self._last_line
+        if line == last:
+            return
+
+        prefix = 0
+        for old_char, new_char in zip(last, line):
+            if old_char != new_char:
+                break
+            prefix += 1
+
+        removed = last[prefix:]
+        if prefix == len(last):
+            out = line[prefix:]
+        elif removed.isascii() and removed.isprintable():
+            # Back up over the changed tail only
+            out = "\b" * len(removed) + line[prefix:] + "\x1b[K"
+        else:
+            out = "\r" + line + "\x1b[K"
+
+        self.stream.write(out)
+        self.stream.flush()
+        self._last_line = line
+
+    def _clear_line(self) -> None:
+        """Erase the live line."""
+        if self.live and self._last_line:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+        self._last_line = ""
+
+    def _flush_committed(self) -> None:
+        """Print committed text above the live line."""
+        if not self._committed:
+            return
+        self._clear_line()
+        for text in self._committed:
+            self.stream.write(f"💬 {text}\n")
+        self.stream.flush()
+        self._committed.clear()
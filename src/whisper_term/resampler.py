@@ -0,0 +1,167 @@
+"""Streaming downmix and polyphase resampling for audio capture."""
+
+import math
+
+import numpy as np
+from scipy import signal
+
+
+class StreamingResampler:
+    """
+    Streaming polyphase FIR resampler for mono float32 audio.
+
+    Blocks of any size can be pushed through ``process``; the output is
+    identical to resampling the concatenated input in one pass. Each block
+    is handled with a single vectorized gather and multiply-accumulate over
+    the polyphase filter bank, keeping only ``taps - 1`` input samples of
+    history between blocks. The filter's group delay is compensated, so
+    output sample n lines up with input time n / output_rate.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int = 16000, quality: int = 16):
+        """
+        Initialize the resampler.
+
+        Args:
+            input_rate: Sample rate of the incoming audio in Hz
+            output_rate: Sample rate of the produced audio in Hz
+            quality: Filter half-length in zero crossings (higher is sharper)
+        """
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+
+        g = math.gcd(input_rate, output_rate)
+        self.up = output_rate // g
+        self.down = input_rate // g
+        self.passthrough = self.up == self.down
+
+        if self.passthrough:
+            self.taps = 1
+            self._shift = 0
+            self.reset()
+            return
+
+        factor = max(self.up, self.down)
+        num_taps = 2 * quality * factor + 1
+        h = signal.firwin(num_taps, 1.0 / factor, window=("kaiser", 8.0)) * self.up
+
+        # Polyphase bank: phase p uses taps h[p], h[p + up], h[p + 2*up], ...
+        self.taps = -(-num_taps // self.up)
+        padded = np.zeros(self.taps * self.up, dtype=np.float32)
+        padded[:num_taps] = h
+        self._bank = padded.reshape(self.taps, self.up).T.copy()
+        self._tap_offsets = np.arange(self.taps)
+        self._shift = (num_taps - 1) // 2
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all history, e.g. at the start of a new recording."""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._in_count = 0
+        self._out_count = 0
+        self._real_in_count = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample a block of mono audio.
+
+        Args:
+            block: 1-D float32 samples at input_rate
+
+        Returns:
+            1-D float32 samples at output_rate (may be empty)
+        """
+        self._real_in_count += len(block)
+        return self._process(block)
+
+    def flush(self) -> np.ndarray:
+        """Emit the samples still held back by the filter delay."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+
+        expected = (self._real_in_count * self.up) // self.down
+        tail = np.zeros(self._shift // self.up + 2, dtype=np.float32)
+        out = self._process(tail)
+        return out[:max(expected - (self._out_count - len(out)), 0)]
+
+    def _process(self, block: np.ndarray) -> np.ndarray:
+        """Run the filter bank over history + block."""
+        block = np.asarray(block, dtype=np.float32)
+        if self.passthrough:
+            self._out_count += len(block)
+            return block
+
+        buf = np.concatenate((self._history, block))
+        buf_start = self._in_count - (self.taps - 1)
+        self._in_count += len(block)
+
+        # Last output whose newest input sample has arrived
+        last_in = self._in_count - 1
+        n_end = (last_in * self.up + self.up - 1 - self._shift) // self.down + 1
+
+        if self.taps > 1:
+            self._history = buf[-(self.taps - 1):]
+
+        if n_end <= self._out_count:
+            return np.zeros(0, dtype=np.float32)
+
+        n = np.arange(self._out_count, n_end, dtype=np.int64)
+        m = n * self.down + self._shift
+        newest = m // self.up - buf_start
+        phase = m % self.up
+
+        frames = buf[newest[:, None] - self._tap_offsets[None, :]]
+        out = np.einsum("nt,nt->n", self._bank[phase], frames).astype(np.float32)
+
+        self._out_count = n_end
+        return out
+
+
+class CaptureConverter:
+    """
+    Converts native device blocks to the 16 kHz mono stream Whisper needs.
+
+    Downmixes each (frames, channels) block as it arrives, then resamples
+    it with a StreamingResampler.
+    """
+
+    def __init__(self, input_rate: int, channels: int, output_rate: int = 16000):
+        """
+        Initialize the converter.
+
+        Args:
+            input_rate: Native device sample rate in Hz
+            channels: Native device channel count
+            output_rate: Target sample rate in Hz
+        """
+        self.channels = channels
+        self.resampler = StreamingResampler(input_rate, output_rate)
+
+    def reset(self) -> None:
+        """Reset resampler state for a new recording."""
+        self.resampler.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Downmix and resample one capture block.
+
+        Args:
+            block: (frames, channels) or (frames,) float32 samples
+
+        Returns:
+            Mono float32 samples at the output rate
+        """
+        if block.ndim > 1 and block.shape[1] > 1:
+            mono = block.mean(axis=1, dtype=np.float32)
+        elif self.resampler.passthrough:
+            # Passthrough would hand back the caller's buffer, which PortAudio reuses
+            mono = block.reshape(-1).copy()
+        else:
+            mono = block.reshape(-1)
+
+        return self.resampler.process(mono)
+
+    def flush(self) -> np.ndarray:
+        """Emit samples held back by the resampler."""
+        return self.resampler.flush()
@@ -0,0 +1,302 @@
+"""Retention and tiering of stored recordings."""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from .file_manager import _soundfile, stored_audio_path
+from .config import Config
+from .session_manager import SessionManager
+
+
+# Typical size of compressed speech relative to 16-bit WAV, for dry-run estimates
+_COMPRESSION_RATIO = {"flac": 0.6, "gzip": 0.9}
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Rules for ageing out recordings. Transcripts and metadata are always kept.
+
+    Attributes:
+        compress_after_days: Compress WAV audio older than this
+        delete_audio_after_days: Delete audio older than this
+        max_total_mb: Delete the oldest audio until recordings fit this size
+        codec: Compression codec, "flac" (needs soundfile) or "gzip"
+    """
+
+    compress_after_days: Optional[float] = None
+    delete_audio_after_days: Optional[float] = None
+    max_total_mb: Optional[float] = None
+    codec: str = "flac"
+
+    @classmethod
+    def from_config(cls, config: Config) -> "RetentionPolicy":
+        """Policy from the retention settings of the configuration."""
+        return cls(
+            compress_after_days=config.retention_compress_days,
+            delete_audio_after_days=config.retention_delete_days,
+            max_total_mb=config.retention_max_mb,
+            codec=config.audio_codec
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any rule is set."""
+        return any(value is not None for value in (
+            self.compress_after_days, self.delete_audio_after_days, self.max_total_mb
+        ))
+
+
+@dataclass
+class RetentionAction:
+    """One planned change to a session's audio."""
+
+    session_id: str
+    action: str  # "compress" or "delete_audio"
+    reason: str
+    bytes_before: int
+    bytes_after: int
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of a retention pass."""
+
+    dry_run: bool
+    actions: List[RetentionAction] = field(default_factory=list)
+    failed: int = 0
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return sum(a.bytes_before - a.bytes_after for a in self.actions)
+
+    def summary(self) -> str:
+        """One-line description of the pass."""
+        compressed = sum(1 for a in self.actions if a.action == "compress")
+        deleted = sum(1 for a in self.actions if a.action == "delete_audio")
+        verb = "would reclaim" if self.dry_run else "reclaimed"
+        line = (f"🗄️  Retention: {compressed} compressed, {deleted} audio deleted, "
+                f"{verb} {self.bytes_reclaimed / (1024 * 1024):.1f} MB")
+        if self.failed:
+            line += f" ({self.failed} failed)"
+        return line
+
+
+class RetentionEngine:
+    """
+    Applies a RetentionPolicy using only the session index.
+
+    Planning reads index records (no directory walks or file stats), and
+    each pass handles at most ``batch_size`` sessions, so a background
+    pass never holds up recording for long. Audio is compressed before it
+    is deleted, and deletion for the size cap takes the oldest audio first.
+    """
+
+    def __init__(self, session_manager: SessionManager, policy: RetentionPolicy,
+                 batch_size: int = 50):
+        """
+        Initialize the engine.
+
+        Args:
+            session_manager: Session manager owning the index and sidecars
+            policy: Retention rules
+            batch_size: Most sessions changed per pass
+        """
+        self.session_manager = session_manager
+        self.file_manager = session_manager.file_manager
+        self.index = session_manager.index
+        self.policy = policy
+        self.batch_size = batch_size
+
+        if policy.codec not in _COMPRESSION_RATIO:
+            raise ValueError(f"Unknown audio codec '{policy.codec}' (use flac or gzip)")
+        if policy.codec == "flac" and _soundfile() is None:
+            print("⚠️  'soundfile' is not installed - compressing audio with gzip instead of FLAC")
+            self.policy.codec = "gzip"
+
+        # Sessions whose action failed are skipped until restart
+        self._failed: Set[str] = set()
+        self._stop_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def plan(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[RetentionAction]:
+        """
+        Work out which sessions to change, oldest first.
+
+        Args:
+            now: Reference time for ages (default: now)
+            limit: Most actions to return (default: batch_size)
+
+        Returns:
+            Planned actions
+        """
+        policy = self.policy
+        now = now or datetime.now()
+        limit = self.batch_size if limit is None else limit
+
+        delete_before = _cutoff_id(now, policy.delete_audio_after_days)
+        compress_before = _cutoff_id(now, policy.compress_after_days)
+
+        records = self.index.records()
+        total = sum(r["bytes"] for r in records)
+        max_bytes = int(policy.max_total_mb * 1024 * 1024) if policy.max_total_mb is not None else None
+
+        actions: List[RetentionAction] = []
+        for record in records:
+            if len(actions) >= limit:
+                break
+            state = record["audio_state"]
+            if state == "deleted" or record["id"] in self._failed:
+                continue
+
+            session_id = record["id"]
+            size = record["audio_bytes"]
+
+            if delete_before and session_id < delete_before:
+                reason = f"older than {policy.delete_audio_after_days:g} days"
+            elif max_bytes is not None and total > max_bytes:
+                reason = f"total size over {policy.max_total_mb:g} MB"
+            elif compress_before and session_id < compress_before and state == "wav":
+                after = int(size * _COMPRESSION_RATIO[policy.codec])
+                actions.append(RetentionAction(
+                    session_id, "compress",
+                    f"older than {policy.compress_after_days:g} days", size, after
+                ))
+                total -= size - after
+                continue
+            elif not compress_before or session_id >= compress_before:
+                # Records are chronological and the size cap is met:
+                # nothing from here on is due
+                break
+            else:
+                continue
+
+            actions.append(RetentionAction(session_id, "delete_audio", reason, size, 0))
+            total -= size
+
+        return actions
+
+    def run(self, dry_run: bool = False, now: Optional[datetime] = None,
+            limit: Optional[int] = None) -> RetentionReport:
+        """
+        Run one retention pass.
+
+        Args:
+            dry_run: Only report what would change
+            now: Reference time for ages (default: now)
+            limit: Most sessions to change (default: batch_size)
+
+        Returns:
+            Report of the actions taken or planned
+        """
+        report = RetentionReport(dry_run=dry_run)
+        for action in self.plan(now, limit):
+            if dry_run or self._apply(action):
+                report.actions.append(action)
+            else:
+                self._failed.add(action.session_id)
+                report.failed += 1
+        return report
+
+    def run_all(self, dry_run: bool = False) -> RetentionReport:
+        """Run passes until nothing is left to do (or, for a dry run, plan everything)."""
+        if dry_run:
+            return self.run(dry_run=True, limit=len(self.index))
+
+        report = RetentionReport(dry_run=False)
+        while True:
+            batch = self.run()
+            report.actions.extend(batch.actions)
+            report.failed += batch.failed
+            if not batch.actions:
+                # Sweep blobs orphaned by anything set_audio_state missed
+                self.file_manager.blobs.collect()
+                return report
+
+    def _apply(self, action: RetentionAction) -> bool:
+        """Carry out one action and record it in the sidecar and index."""
+        record = self.index.get(action.session_id)
+        if record is None:
+            return False
+        audio_path = self.index.audio_path(record)
+
+        if action.action == "compress":
+            compressed = self.file_manager.compress_audio(audio_path, self.policy.codec)
+            if compressed is None:
+                return False
+            if not self.session_manager.set_audio_state(audio_path, self.policy.codec):
+                return False
+            action.bytes_after = self.index.get(action.session_id)["audio_bytes"]
+            return True
+
+        try:
+            os.remove(stored_audio_path(audio_path, record["audio_state"]))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"❌ Error deleting audio: {e}")
+            return False
+        # Embeddings can be recomputed only from audio, so they go too
+        try:
+            os.remove(audio_path.with_suffix(".embeddings.npz"))
+        except OSError:
+            pass
+        return self.session_manager.set_audio_state(audio_path, "deleted")
+
+    def start(self, interval: float = 3600.0) -> None:
+        """
+        Run passes in a background thread.
+
+        Args:
+            interval: Seconds between passes once there is nothing left to do
+        """
+        if self._thread is not None or not self.policy.enabled:
+            return
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run_background, args=(self._stop_event, interval),
+            name="retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after its current action."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run_background(self, stop_event: threading.Event, interval: float) -> None:
+        """Background loop: small batches back to back, then sleep."""
+        while not stop_event.is_set():
+            try:
+                report = self.run(limit=1)
+            except Exception as e:
+                print(f"❌ Retention error: {e}")
+                report = None
+
+            if not report or not report.actions:
+                stop_event.wait(interval)
+
+    def get_info(self) -> Dict[str, Any]:
+        """Policy and pending work."""
+        pending = self.plan(limit=len(self.index))
+        return {
+            "compress_after_days": self.policy.compress_after_days,
+            "delete_audio_after_days": self.policy.delete_audio_after_days,
+            "max_total_mb": self.policy.max_total_mb,
+            "codec": self.policy.codec,
+            "pending_actions": len(pending),
+        }
+
+
+def _cutoff_id(now: datetime, days: Optional[float]) -> Optional[str]:
+    """Session id (YYYYMMDD_HHMMSS) of the age cutoff, or None if the rule is off."""
+    if days is None:
+        return None
+    return (now - timedelta(days=days)).strftime("%Y%m%d_%H%M%S")
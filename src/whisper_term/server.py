@@ -0,0 +1,452 @@
+"""Local OpenAI-compatible transcription server (asyncio, standard library only)."""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.parser import BytesParser
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import whisper
+from whisper.tokenizer import LANGUAGES, TO_LANGUAGE_CODE
+
+from .batching import MicroBatcher
+from .config import Config
+from .file_manager import FileManager, load_audio_file
+from .metrics import QUEUE_DEPTH, REGISTRY, start_exporter
+from .session_manager import SessionManager
+from .transcription_engine import TranscriptionEngine
+
+
+RESPONSE_FORMATS = ["json", "text", "verbose_json"]
+
+
+class RequestError(Exception):
+    """A request the server rejects, with its HTTP status."""
+
+    def __init__(self, status: int, message: str, error_type: str = "invalid_request_error"):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """
+    Parse a multipart/form-data body.
+
+    Returns:
+        (filename, content) per field name; filename is None for plain fields
+    """
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    if not message.is_multipart():
+        raise RequestError(400, "Expected a multipart/form-data body")
+
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def decode_upload(filename: Optional[str], content: bytes) -> np.ndarray:
+    """Decode an uploaded audio file to 16 kHz mono float32."""
+    suffix = "".join(Path(filename or "upload.wav").suffixes[-2:]) or ".wav"
+    fd, tmp_name = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        return load_audio_file(Path(tmp_name))
+    finally:
+        os.remove(tmp_name)
+
+
+def language_code(language: str) -> str:
+    """
+    Normalize a language given as a code or name ("EN", "english") to
+    whisper's code ("en"); "auto" and unknown values are returned lower-cased.
+    """
+    language = language.strip().lower()
+    if language in LANGUAGES:
+        return language
+    return TO_LANGUAGE_CODE.get(language, language)
+
+
+class EnginePool:
+    """
+    Engines shared by all requests, each with its own micro-batcher.
+
+    Requests go to the engine with the fewest requests in flight. Plain
+    clips up to 30 seconds are micro-batched; longer audio, per-request
+    decoder options and streaming use the engine directly.
+    """
+
+    def __init__(self, config: Config, size: int = 1):
+        """
+        Create the engines (models load in warm_up or on first use).
+
+        Args:
+            config: Effective settings
+            size: Number of engines (each holds its own model copy)
+        """
+        # Engines are shared by all clients, so no session language is pinned
+        self.engines = [TranscriptionEngine.from_config(config, language_pinning=False)
+                        for _ in range(max(size, 1))]
+        self.batchers = [MicroBatcher(engine, max_batch_size=config.batch_size,
+                                      beam_size=config.beam_size)
+                         for engine in self.engines]
+        self._in_flight = [0] * len(self.engines)
+        self._lock = threading.Lock()
+        QUEUE_DEPTH.set_function(lambda: sum(self._in_flight), queue="engines")
+
+    @property
+    def model_name(self) -> str:
+        return self.engines[0].model_name
+
+    def warm_up(self) -> None:
+        """Load every engine's model before the first request."""
+        for engine in self.engines:
+            with engine._lock:
+                engine._load_model()
+
+    def _acquire(self) -> int:
+        with self._lock:
+            index = min(range(len(self.engines)), key=self._in_flight.__getitem__)
+            self._in_flight[index] += 1
+            return index
+
+    def _release(self, index: int) -> None:
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def transcribe(self, audio_data: np.ndarray, language: Optional[str] = None,
+                   prompt: Optional[str] = None, temperature: float = 0.0,
+                   on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Transcribe one request's audio (blocking; run in a worker thread).
+
+        Returns:
+            Result dictionary as returned by TranscriptionEngine
+        """
+        index = self._acquire()
+        engine = self.engines[index]
+        try:
+            if on_segment or prompt or temperature or (
+                    language and language_code(language) != language_code(engine.language)):
+                return engine.transcribe_windows(audio_data, language=language,
+                                                 initial_prompt=prompt, temperature=temperature,
+                                                 on_segment=on_segment)
+            if len(audio_data) <= whisper.audio.N_SAMPLES:
+                return self.batchers[index].submit(audio_data).result()
+            return engine.transcribe(audio_data)
+        finally:
+            self._release(index)
+
+    def close(self) -> None:
+        for batcher in self.batchers:
+            batcher.close()
+
+
+class TranscriptionServer:
+    """
+    HTTP server for ``POST /v1/audio/transcriptions``.
+
+    Accepts the OpenAI request format (multipart ``file`` plus optional
+    ``language``, ``prompt``, ``temperature``, ``response_format`` and
+    ``stream``). With ``stream=true`` the response is a chunked
+    server-sent event stream with one ``transcript.text.delta`` event per
+    decoded 30-second window and a final ``transcript.text.done``.
+
+    At most ``max_queue`` requests are accepted at a time (queued plus
+    running); further requests get 429 with Retry-After. Transcriptions
+    are stored as sessions like recordings made in the app.
+    """
+
+    def __init__(self, config: Config, pool: EnginePool,
+                 session_manager: Optional[SessionManager] = None):
+        """
+        Initialize the server.
+
+        Args:
+            config: Effective settings (server_* fields)
+            pool: Engines that run the transcriptions
+            session_manager: Stores each transcription as a session, if given
+        """
+        self.config = config
+        self.pool = pool
+        self.session_manager = session_manager
+        self.max_upload = int(config.server_max_upload_mb * 1024 * 1024)
+        self.pending = 0
+        QUEUE_DEPTH.set_function(lambda: self.pending, queue="server")
+        # Enough workers for every accepted request, so batchers see them all at once
+        self._executor = ThreadPoolExecutor(max_workers=config.server_queue,
+                                            thread_name_prefix="transcribe")
+
+    async def serve(self) -> None:
+        """Accept connections until cancelled."""
+        server = await asyncio.start_server(self._handle, self.config.server_host,
+                                            self.config.server_port)
+        print(f"🌐 Serving on http://{self.config.server_host}:{self.config.server_port}"
+              f"/v1/audio/transcriptions ({len(self.pool.engines)} engine(s), "
+              f"queue {self.config.server_queue})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+
+    # HTTP plumbing
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: Any,
+                       headers: Optional[Dict[str, str]] = None) -> None:
+        if isinstance(body, str):
+            payload, content_type = body.encode("utf-8"), "text/plain; charset=utf-8"
+        else:
+            payload, content_type = json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json"
+        all_headers = {"Content-Type": content_type, "Content-Length": str(len(payload)),
+                       "Connection": "close"}
+        all_headers.update(headers or {})
+        writer.write(self._head(status, all_headers) + payload)
+        await writer.drain()
+
+    async def _respond_error(self, writer: asyncio.StreamWriter, error: RequestError) -> None:
+        headers = {"Retry-After": "1"} if error.status == 429 else None
+        await self._respond(writer, error.status,
+                            {"error": {"message": str(error), "type": error.error_type}}, headers)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise RequestError(431, "Request headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise RequestError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        return method, target.split("?", 1)[0], headers
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, headers = await self._read_request(reader)
+            if path == "/health" and method == "GET":
+                await self._respond(writer, 200, {"status": "ok", "pending": self.pending,
+                                                  "max_queue": self.config.server_queue})
+            elif path == "/metrics" and method == "GET":
+                await self._respond(writer, 200, REGISTRY.render(), {
+                    "Content-Type": "text/plain; version=0.0.4; charset=utf-8"
+                })
+            elif path == "/v1/models" and method == "GET":
+                await self._respond(writer, 200, {"object": "list", "data": [
+                    {"id": self.pool.model_name, "object": "model", "owned_by": "whisper-term"}
+                ]})
+            elif path == "/v1/audio/transcriptions":
+                if method != "POST":
+                    raise RequestError(405, "Use POST")
+                await self._transcription(reader, writer, headers)
+            else:
+                raise RequestError(404, f"No route for {method} {path}")
+        except RequestError as e:
+            await self._respond_error(writer, e)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away
+        except Exception as e:
+            print(f"❌ Server error: {e}")
+            try:
+                await self._respond_error(writer, RequestError(500, str(e), "server_error"))
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    # Transcription endpoint
+
+    async def _transcription(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                             headers: Dict[str, str]) -> None:
+        if "content-length" not in headers:
+            raise RequestError(411, "Content-Length required")
+        length = int(headers["content-length"])
+        if length > self.max_upload:
+            raise RequestError(413, f"Upload exceeds {self.config.server_max_upload_mb:g} MB")
+        # Reject before the client sends the body
+        if self.pending >= self.config.server_queue:
+            raise RequestError(429, "Server busy, retry shortly", "rate_limit_exceeded")
+
+        self.pending += 1
+        try:
+            if headers.get("expect", "").lower() == "100-continue":
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await writer.drain()
+            body = await reader.readexactly(length)
+
+            fields = parse_multipart(headers.get("content-type", ""), body)
+            del body
+            if "file" not in fields:
+                raise RequestError(400, "Missing 'file' field")
+
+            def field(name: str, default: Optional[str] = None) -> Optional[str]:
+                value = fields.get(name, (None, None))[1]
+                return value.decode("utf-8").strip() if value else default
+
+            response_format = field("response_format", "json")
+            if response_format not in RESPONSE_FORMATS:
+                raise RequestError(400, f"Unsupported response_format '{response_format}' "
+                                        f"(available: {', '.join(RESPONSE_FORMATS)})")
+            try:
+                temperature = float(field("temperature", "0"))
+            except ValueError:
+                raise RequestError(400, "temperature must be a number")
+            options = {"language": field("language"), "prompt": field("prompt"),
+                       "temperature": temperature}
+
+            loop = asyncio.get_running_loop()
+            filename, content = fields.pop("file")
+            try:
+                audio_data = await loop.run_in_executor(self._executor, decode_upload, filename, content)
+            except Exception as e:
+                raise RequestError(400, f"Could not decode audio: {e}")
+
+            if field("stream", "false").lower() == "true":
+                await self._stream(writer, audio_data, options)
+            else:
+                result = await loop.run_in_executor(
+                    self._executor, lambda: self._run(audio_data, options)
+                )
+                await self._respond(writer, 200, self._format(result, audio_data, response_format),
+                                    self._session_header(result))
+        finally:
+            self.pending -= 1
+
+    def _run(self, audio_data: np.ndarray, options: Dict[str, Any],
+             on_segment: Optional[Callable] = None) -> Dict[str, Any]:
+        """Transcribe and persist one request (worker thread)."""
+        result = self.pool.transcribe(audio_data, on_segment=on_segment, **options)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+        if self.session_manager is not None:
+            session = self.session_manager.create_session(
+                audio_data=audio_data,
+                transcription=result["text"],
+                sample_rate=16000,
+                model_name=self.pool.model_name,
+                language=result.get("language"),
+                decode_time=result.get("decode_time"),
+                segments=result.get("segments"),
+                guard_hits=result.get("guard_hits")
+            )
+            if session:
+                result["session_id"] = session.audio_path.stem
+        return result
+
+    @staticmethod
+    def _session_header(result: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        return {"X-Session-Id": result["session_id"]} if result.get("session_id") else None
+
+    @staticmethod
+    def _format(result: Dict[str, Any], audio_data: np.ndarray, response_format: str) -> Any:
+        if response_format == "text":
+            return result["text"] + "\n"
+        if response_format == "verbose_json":
+            return {
+                "task": "transcribe",
+                "language": result.get("language"),
+                "duration": len(audio_data) / 16000,
+                "text": result["text"],
+                "segments": [
+                    {key: segment.get(key) for key in
+                     ("id", "start", "end", "text", "avg_logprob", "no_speech_prob")}
+                    for segment in result.get("segments", [])
+                ],
+            }
+        return {"text": result["text"]}
+
+    async def _stream(self, writer: asyncio.StreamWriter, audio_data: np.ndarray,
+                      options: Dict[str, Any]) -> None:
+        """Send per-window deltas as server-sent events over a chunked response."""
+        loop = asyncio.get_running_loop()
+        segments: asyncio.Queue = asyncio.Queue()
+
+        def on_segment(segment: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(segments.put_nowait, segment)
+
+        writer.write(self._head(200, {"Content-Type": "text/event-stream",
+                                      "Cache-Control": "no-cache",
+                                      "Transfer-Encoding": "chunked",
+                                      "Connection": "close"}))
+
+        async def send(event: Dict[str, Any]) -> None:
+            data = f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            await writer.drain()
+
+        def work() -> Dict[str, Any]:
+            try:
+                return self._run(audio_data, options, on_segment)
+            finally:
+                # Queued after the last segment: end of the delta stream
+                loop.call_soon_threadsafe(segments.put_nowait, None)
+
+        job = loop.run_in_executor(self._executor, work)
+        first = True
+        while True:
+            segment = await segments.get()
+            if segment is None:
+                break
+            if segment["text"]:
+                delta = segment["text"] if first else " " + segment["text"]
+                await send({"type": "transcript.text.delta", "delta": delta})
+                first = False
+
+        try:
+            result = await job
+            event = {"type": "transcript.text.done", "text": result["text"]}
+            if result.get("session_id"):
+                event["session_id"] = result["session_id"]
+        except Exception as e:
+            event = {"type": "error", "error": {"message": str(e), "type": "server_error"}}
+        await send(event)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def run_server(config: Config) -> None:
+    """Start engines, then serve until interrupted."""
+    pool = EnginePool(config, config.server_engines)
+    print(f"🔄 Loading {len(pool.engines)} engine(s) with model '{pool.model_name}'...")
+    pool.warm_up()
+
+    session_manager = None
+    if config.server_save_sessions:
+        session_manager = SessionManager(FileManager(config.data_dir))
+
+    server = TranscriptionServer(config, pool, session_manager)
+    # Metrics are always at /metrics; this adds a separate port or file dump
+    exporter = start_exporter(config)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    finally:
+        pool.close()
+        if exporter:
+            exporter.stop()
@@ -0,0 +1,343 @@
+"""Append-only index of recording sessions."""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .file_manager import AUDIO_SUFFIXES
+from .locking import file_lock
+from .storage_stats import StorageStats
+
+
+# Files belonging to a session, by suffix after the session id
+SESSION_SUFFIXES = list(AUDIO_SUFFIXES.values()) + [
+    ".txt", ".json", ".speakers.json", ".embeddings.npz"
+]
+
+
+def _index_id(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """Identity of one version of the index file."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class SessionIndex:
+    """
+    One record per session in ``<data_dir>/index.jsonl``.
+
+    Listings, retention and storage accounting read the index instead of
+    walking the recordings tree. Each line is either a full record that
+    supersedes earlier lines with the same id, or a removal marker
+    (``{"id": ..., "removed": true}``). The file is compacted once
+    superseded lines outnumber live records, and rebuilt from the
+    metadata sidecars if it is missing.
+
+    Several processes may share one index. Writers hold an advisory lock
+    on ``index.lock``, catch up on lines other processes appended, then
+    append their own; compaction replaces the file atomically. Readers
+    take no file lock: they read complete lines appended since their last
+    look and reload when the file was replaced.
+
+    Record fields: ``id`` (the session timestamp, YYYYMMDD_HHMMSS with an
+    optional _N suffix, which sorts chronologically), ``path`` (canonical
+    .wav path relative to the recordings directory), ``duration``,
+    ``audio_state``, ``audio_bytes``, ``text_bytes``, ``files`` and
+    ``bytes`` (all of the session's files), ``checksum`` and ``blob``
+    (the audio's blob while it is a WAV). Storage totals in ``stats``
+    follow every change and are persisted with the identity of the index
+    file, so get_stats can answer without reading the index.
+    """
+
+    def __init__(self, path: Path, recordings_dir: Path):
+        """
+        Initialize the index; the file is read on first use.
+
+        Args:
+            path: Index file
+            recordings_dir: Root of the recordings tree
+        """
+        self.path = Path(path)
+        self.recordings_dir = Path(recordings_dir)
+        self.stats = StorageStats(self.path.with_name("stats.json"))
+        self._lock_path = self.path.with_name("index.lock")
+        self._records: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lines = 0
+        # Identity of the file read so far and the offset read up to
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._lock = threading.RLock()
+
+    def _apply_line(self, line: bytes) -> None:
+        """Apply one index line to the in-memory records and totals."""
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return  # Torn line left by a crash
+        self._lines += 1
+        old = self._records.get(entry["id"])
+        if entry.get("removed"):
+            self._records.pop(entry["id"], None)
+            if old is not None:
+                self.stats.apply(old, None, save=False)
+        else:
+            self._records[entry["id"]] = entry
+            self.stats.apply(old, entry, save=False)
+
+    def _read_new_lines(self, f) -> None:
+        """Apply complete lines from the current offset (an unfinished last line waits)."""
+        f.seek(self._offset)
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply_line(line)
+        self._offset += end
+
+    def _refresh(self, locked: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring the in-memory records up to date with the file (call with
+        self._lock held; the file lock is only needed to rebuild).
+
+        Args:
+            locked: The caller already holds the file lock
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if locked:
+                self._rebuild_locked()
+                return self._records
+            with file_lock(self._lock_path):
+                return self._refresh(locked=True)
+
+        with f:
+            st = os.fstat(f.fileno())
+            file_id = (st.st_dev, st.st_ino)
+            if self._records is None or file_id != self._file_id or st.st_size < self._offset:
+                # First read, or another process compacted or rebuilt the file
+                self._records = {}
+                self._lines = 0
+                self._offset = 0
+                self._file_id = file_id
+                self.stats.reset([], save=False)
+            if st.st_size > self._offset:
+                self._read_new_lines(f)
+        return self._records
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Append one line (file lock held, records current) and compact if due."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        self._file_id = (st.st_dev, st.st_ino)
+        self._offset = st.st_size
+        self._lines += 1
+        self.stats.index_id = _index_id(st)
+
+        if self._lines > 2 * len(self._records) + 100:
+            self._write_all()
+
+    def audio_path(self, record: Dict[str, Any]) -> Path:
+        """Canonical .wav path of a record."""
+        return self.recordings_dir / record["path"]
+
+    def make_record(self, audio_path: Path, metadata: Optional[Dict[str, Any]],
+                    sizes: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Build a record from a session's files.
+
+        Args:
+            audio_path: The session's canonical .wav path
+            metadata: The session's metadata sidecar as a dictionary, if any
+            sizes: File sizes by suffix if already known (stat'ed otherwise)
+
+        Returns:
+            Index record
+        """
+        audio_path = Path(audio_path)
+        metadata = metadata or {}
+        audio_state = metadata.get("audio_state") or "wav"
+
+        if sizes is None:
+            sizes = {}
+            for suffix in SESSION_SUFFIXES:
+                try:
+                    sizes[suffix] = (audio_path.parent / (audio_path.stem + suffix)).stat().st_size
+                except OSError:
+                    pass
+
+        return {
+            "id": audio_path.stem,
+            "path": audio_path.relative_to(self.recordings_dir).as_posix(),
+            "duration": metadata.get("duration") or 0.0,
+            "audio_state": audio_state,
+            "audio_bytes": sizes.get(AUDIO_SUFFIXES.get(audio_state), 0),
+            "text_bytes": sizes.get(".txt", 0),
+            "files": len(sizes),
+            "bytes": sum(sizes.values()),
+            "checksum": metadata.get("checksum"),
+            "blob": metadata.get("audio_blob") if audio_state == "wav" else None,
+        }
+
+    def _scan_day(self, day_dir: str) -> List[Dict[str, Any]]:
+        """Records for one day directory, from a single scandir pass."""
+        groups: Dict[str, Dict[str, int]] = {}
+        with os.scandir(day_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".tmp") or not entry.is_file():
+                    continue
+                session_id, _, suffix = entry.name.partition(".")
+                groups.setdefault(session_id, {})["." + suffix] = entry.stat().st_size
+
+        records = []
+        for session_id, sizes in groups.items():
+            if ".txt" not in sizes:
+                continue  # Sessions are keyed by their transcript, which is never aged out
+            if len(sizes) == 1 and sizes[".txt"] == 0:
+                continue  # An id reserved by a process that died before saving
+            audio_path = Path(day_dir) / f"{session_id}.wav"
+            metadata = None
+            if ".json" in sizes:
+                try:
+                    with open(audio_path.with_suffix(".json"), "r", encoding="utf-8") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+            records.append(self.make_record(audio_path, metadata, sizes))
+        return records
+
+    def _day_dirs(self) -> List[str]:
+        """Day directories of the recordings tree (YYYY-MM/YYYY-MM-DD)."""
+        day_dirs = []
+        try:
+            with os.scandir(self.recordings_dir) as months:
+                for month in months:
+                    if month.is_dir():
+                        with os.scandir(month.path) as days:
+                            day_dirs.extend(day.path for day in days if day.is_dir())
+        except FileNotFoundError:
+            pass
+        return day_dirs
+
+    def rebuild(self, workers: Optional[int] = None) -> int:
+        """
+        Recreate the index and storage totals from the recordings tree.
+
+        Day directories are scanned in parallel, one scandir pass each;
+        every session file is stat'ed once for its size and each sidecar
+        is read.
+
+        Args:
+            workers: Scanner threads (default: scales with CPU count)
+
+        Returns:
+            Number of sessions indexed
+        """
+        with self._lock, file_lock(self._lock_path):
+            return self._rebuild_locked(workers)
+
+    def _rebuild_locked(self, workers: Optional[int] = None) -> int:
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        records: Dict[str, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for day_records in pool.map(self._scan_day, self._day_dirs()):
+                for record in day_records:
+                    records[record["id"]] = record
+
+        self._records = records
+        self._write_all()
+        self.stats.reset(records.values())
+        return len(records)
+
+    def compact(self) -> None:
+        """Rewrite the index with one line per live record."""
+        with self._lock, file_lock(self._lock_path):
+            self._refresh(locked=True)
+            self._write_all()
+            self.stats.save()
+
+    def _write_all(self) -> None:
+        """Atomically replace the index file with the live records (file lock held)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for session_id in sorted(self._records):
+                f.write(json.dumps(self._records[session_id], ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        st = self.path.stat()
+        self._file_id = (st.st_dev, st.st_ino)
+        self._offset = st.st_size
+        self._lines = len(self._records)
+        self.stats.index_id = _index_id(st)
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Add or replace a session record."""
+        with self._lock, file_lock(self._lock_path):
+            records = self._refresh(locked=True)
+            old = records.get(record["id"])
+            records[record["id"]] = record
+            self._append(record)
+            self.stats.apply(old, record)
+
+    def update(self, session_id: str, **changes: Any) -> Optional[Dict[str, Any]]:
+        """
+        Change fields of a session record.
+
+        Returns:
+            The updated record, or None if the session is not indexed
+        """
+        with self._lock, file_lock(self._lock_path):
+            record = self._refresh(locked=True).get(session_id)
+            if record is None:
+                return None
+            old, record = record, dict(record, **changes)
+            self._records[session_id] = record
+            self._append(record)
+            self.stats.apply(old, record)
+            return record
+
+    def remove(self, session_id: str) -> None:
+        """Drop a session from the index."""
+        with self._lock, file_lock(self._lock_path):
+            old = self._refresh(locked=True).pop(session_id, None)
+            if old is not None:
+                self._append({"id": session_id, "removed": True})
+                self.stats.apply(old, None)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Record of one session, or None."""
+        with self._lock:
+            return self._refresh().get(session_id)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All records, oldest first."""
+        with self._lock:
+            records = self._refresh()
+            return [records[session_id] for session_id in sorted(records)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Current storage totals (see StorageStats.snapshot). Until the
+        records are needed, served from stats.json while it matches the
+        index file, without reading the index.
+        """
+        with self._lock:
+            if self._records is None:
+                try:
+                    if self.stats.load(_index_id(os.stat(self.path))):
+                        return self.stats.snapshot()
+                except FileNotFoundError:
+                    pass
+            self._refresh()
+            return self.stats.snapshot()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._refresh())
@@ -1,29 +1,43 @@
 """Session management for recording sessions."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict, Any
 import numpy as np
 
-from .models import RecordingSession
-from .file_manager import FileManager
+from .models import RecordingSession, SessionMetadata, make_preview
+from .file_manager import AUDIO_SUFFIXES, FileManager, compute_checksum, stored_audio_path
+from .session_index import SessionIndex
 
 
 class SessionManager:
     """Manages recording sessions and their metadata."""
     
-    def __init__(self, file_manager: FileManager):
+    def __init__(self, file_manager: FileManager, index: Optional[SessionIndex] = None):
         """
         Initialize the session manager.
         
         Args:
             file_manager: FileManager instance for file operations
+            index: Session index (default: index.jsonl in the data directory)
         """
         self.file_manager = file_manager
+        self.index = index or SessionIndex(
+            file_manager.base_data_dir / "index.jsonl", file_manager.recordings_dir
+        )
         self.current_session: Optional[RecordingSession] = None
     
     def create_session(self, audio_data: np.ndarray, transcription: str, 
-                      sample_rate: int = 16000) -> Optional[RecordingSession]:
+                      sample_rate: int = 16000, model_name: Optional[str] = None,
+                      language: Optional[str] = None, decode_time: Optional[float] = None,
+                      segments: Optional[List[Dict[str, Any]]] = None,
+                      speaker_count: Optional[int] = None,
+                      guard_hits: Optional[int] = None,
+                      parts: Optional[List[Dict[str, Any]]] = None,
+                      audio_path: Optional[Path] = None,
+                      audio_blob: Optional[str] = None) -> Optional[RecordingSession]:
         """
         Create a new recording session.
         
@@ -31,45 +45,297 @@ class SessionManager:
             audio_data: Recorded audio data
             transcription: Transcribed text
             sample_rate: Audio sample rate
+            model_name: Whisper model used for transcription
+            language: Transcription language
+            decode_time: Time spent transcribing, in seconds
+            segments: Whisper segments from the transcription result
+            speaker_count: Number of speakers, if the recording was diarized
+            guard_hits: Decodes cut short by the decode guard
+            parts: Parts of a paused-and-resumed recording (see join_parts)
+            audio_path: Session path claimed earlier with reserve_session_paths
+                (default: claim a new one)
+            audio_blob: Set when the audio was already saved to audio_path
+                (the id FileManager.save_audio returned); it is not written again
             
         Returns:
             RecordingSession object or None if failed
         """
+        reserved = None
         try:
-            # Generate timestamp
-            timestamp = datetime.now()
-            
-            # Get file paths
-            audio_path, text_path = self.file_manager.get_session_paths(timestamp)
+            if audio_path is not None:
+                audio_path = Path(audio_path)
+                text_path = audio_path.with_suffix(".txt")
+                timestamp = datetime.strptime(audio_path.stem[:15], "%Y%m%d_%H%M%S")
+            else:
+                # Claim a unique session id, even against other processes
+                timestamp = datetime.now()
+                audio_path, text_path = self.file_manager.reserve_session_paths(timestamp)
+                reserved = audio_path
             
             # Calculate duration
             duration = len(audio_data) / sample_rate if audio_data is not None else 0.0
             
+            metadata = SessionMetadata(
+                model=model_name,
+                language=language,
+                duration=duration,
+                decode_time=decode_time,
+                rtf=decode_time / duration if decode_time is not None and duration > 0 else None,
+                sample_rate=sample_rate,
+                checksum=compute_checksum(audio_data),
+                transcript_length=len(transcription),
+                preview=make_preview(transcription),
+                segment_count=len(segments) if segments else 0,
+                speaker_count=speaker_count,
+                guard_hits=guard_hits or 0,
+                parts=parts
+            )
+            
             # Create session object
             session = RecordingSession(
                 timestamp=timestamp,
                 audio_path=audio_path,
                 text_path=text_path,
                 transcription=transcription,
-                duration=duration
+                duration=duration,
+                metadata=metadata
             )
             
-            # Save audio and text files
-            audio_saved = self.file_manager.save_audio(audio_data, audio_path, sample_rate)
+            # Save audio, text and metadata files
+            if audio_blob is None:
+                audio_blob = self.file_manager.save_audio(audio_data, audio_path, sample_rate)
+            metadata.audio_blob = audio_blob
             text_saved = self.file_manager.save_text(transcription, text_path)
             
-            if audio_saved and text_saved:
+            if audio_blob and text_saved:
+                self.file_manager.save_metadata(metadata, session.metadata_path)
+                self._reindex(audio_path, metadata)
                 self.current_session = session
                 print(f"📁 Session created: {session.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
                 return session
             else:
                 print("❌ Failed to save session files")
-                return None
                 
         except Exception as e:
             print(f"❌ Error creating session: {e}")
+        
+        if reserved is not None:
+            self.file_manager.release_session_paths(reserved)
+        return None
+    
+    def save_diarization(self, session: RecordingSession, diarizer,
+                         labelled: List[Dict[str, Any]]) -> bool:
+        """
+        Save a session's speaker labels and cache its embeddings.
+        
+        Args:
+            session: Session the diarization belongs to
+            diarizer: IncrementalDiarizer holding the segment embeddings
+            labelled: Speaker-labelled transcription segments
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        from .diarization import save_embeddings
+        
+        try:
+            saved = self.file_manager.save_speakers(
+                labelled, session.audio_path.with_suffix(".speakers.json")
+            )
+            if session.metadata and session.metadata.checksum:
+                save_embeddings(
+                    session.audio_path.with_suffix(".embeddings.npz"),
+                    session.metadata.checksum,
+                    diarizer
+                )
+            self._reindex(session.audio_path, session.metadata)
+            return saved
+        except Exception as e:
+            print(f"❌ Error saving diarization: {e}")
+            return False
+    
+    def rediarize(self, audio_path, num_speakers: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Relabel a diarized session for a fixed number of speakers.
+        
+        Uses the cached embeddings when they match the audio checksum, so
+        only the clustering is repeated.
+        
+        Args:
+            audio_path: Path to the session's audio file
+            num_speakers: Desired speaker count
+            
+        Returns:
+            Relabelled segments, or None if failed
+        """
+        from .diarization import (
+            diarize, recluster, label_segments, load_embeddings, save_embeddings
+        )
+        
+        try:
+            session = self.load_session(audio_path, load_text=False)
+            if session is None:
+                return None
+            
+            speakers_path = session.audio_path.with_suffix(".speakers.json")
+            labelled = self.file_manager.load_speakers(speakers_path)
+            if labelled is None:
+                print(f"❌ Session was not diarized: {session.audio_path}")
+                return None
+            
+            checksum = session.metadata.checksum if session.metadata else None
+            embeddings_path = session.audio_path.with_suffix(".embeddings.npz")
+            cached = load_embeddings(embeddings_path, checksum) if checksum else None
+            
+            if cached is None:
+                print("🔄 Embedding cache missing or stale - recomputing...")
+                audio_data = self.file_manager.load_audio(session.audio_path)
+                if audio_data is None:
+                    return None
+                diarizer = diarize(audio_data)
+                if checksum:
+                    save_embeddings(embeddings_path, checksum, diarizer)
+                times, embeddings = diarizer.times, np.array(diarizer.embeddings)
+            else:
+                times, embeddings = cached
+            
+            turns = recluster(times, embeddings, num_speakers)
+            relabelled = label_segments(labelled, turns)
+            self.file_manager.save_speakers(relabelled, speakers_path)
+            
+            if session.metadata:
+                session.metadata.speaker_count = len({t["speaker"] for t in turns})
+                self.file_manager.save_metadata(session.metadata, session.metadata_path)
+            self._reindex(session.audio_path, session.metadata)
+            
+            return relabelled
+            
+        except Exception as e:
+            print(f"❌ Error re-diarizing session: {e}")
             return None
     
+    def set_audio_state(self, audio_path, audio_state: str) -> bool:
+        """
+        Record that a session's audio was compressed or deleted.
+        
+        Updates the metadata sidecar first, then the index, so a rebuilt
+        index agrees with the sidecars. The WAV's blob is removed if this
+        session was its last link.
+        
+        Args:
+            audio_path: The session's canonical .wav path
+            audio_state: New SessionMetadata.audio_state
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        audio_path = Path(audio_path)
+        metadata_path = self.file_manager.get_metadata_path(audio_path)
+        metadata = self.file_manager.load_metadata(metadata_path) or SessionMetadata()
+        metadata.audio_state = audio_state
+        # The session no longer links to the WAV's blob
+        blob, metadata.audio_blob = metadata.audio_blob, None
+        if not self.file_manager.save_metadata(metadata, metadata_path):
+            return False
+        
+        self._reindex(audio_path, metadata)
+        if blob:
+            self.file_manager.blobs.release(blob)
+        return True
+    
+    def reindex_session(self, audio_path) -> None:
+        """
+        Index a session whose files were written outside this manager (e.g. an import).
+        
+        Args:
+            audio_path: The session's canonical .wav path
+        """
+        audio_path = Path(audio_path)
+        metadata = self.file_manager.load_metadata(self.file_manager.get_metadata_path(audio_path))
+        self._reindex(audio_path, metadata)
+    
+    def _reindex(self, audio_path: Path, metadata: Optional[SessionMetadata]) -> None:
+        """Refresh a session's index record (and storage totals) from its files."""
+        self.index.put(self.index.make_record(
+            audio_path, metadata.to_dict() if metadata else None
+        ))
+    
+    def get_storage_info(self) -> dict:
+        """
+        Storage usage from the cached totals, without touching the tree.
+        
+        Returns:
+            Dictionary with the FileManager.get_storage_info keys plus
+            session count, stored audio seconds and a per-month breakdown
+        """
+        totals = self.index.get_stats()
+        return {
+            "total_size_bytes": totals["bytes"],
+            "total_size_mb": totals["bytes"] / (1024 * 1024),
+            "total_files": totals["files"],
+            "total_sessions": totals["sessions"],
+            "audio_seconds": totals["audio_seconds"],
+            "months": totals["months"],
+            "recordings_dir": str(self.file_manager.recordings_dir),
+            "models_dir": str(self.file_manager.models_dir)
+        }
+    
+    def reconcile_storage(self) -> Dict[str, Any]:
+        """
+        Recompute the index and storage totals from disk.
+        
+        Returns:
+            Dictionary with the storage info before and after
+        """
+        before = self.get_storage_info()
+        self.index.rebuild()
+        return {"before": before, "after": self.get_storage_info()}
+    
+    def deduplicate_audio(self, workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Move the audio of every indexed session into the blob store, so
+        identical recordings (retries, re-imports) share one file.
+        
+        Files are hashed in parallel. Needed once for sessions saved before
+        the blob store existed; files already linked to their blob are
+        skipped without hashing, so running it again is cheap.
+        
+        Args:
+            workers: Hashing threads (default: scales with CPU count)
+            
+        Returns:
+            Counts of audio files, duplicates among them and bytes reclaimed
+        """
+        def adopt(record: Dict[str, Any]) -> int:
+            audio_state = record.get("audio_state") or "wav"
+            if audio_state not in AUDIO_SUFFIXES:
+                return -1
+            audio_path = self.index.audio_path(record)
+            stored_path = stored_audio_path(audio_path, audio_state)
+            if not stored_path.exists():
+                return -1
+            metadata_path = self.file_manager.get_metadata_path(audio_path)
+            metadata = self.file_manager.load_metadata(metadata_path)
+            digest, reclaimed = self.file_manager.blobs.adopt(
+                stored_path, AUDIO_SUFFIXES[audio_state], metadata.audio_blob if metadata else None
+            )
+            if metadata and metadata.audio_blob != digest:
+                metadata.audio_blob = digest
+                self.file_manager.save_metadata(metadata, metadata_path)
+                self._reindex(audio_path, metadata)
+            return reclaimed
+        
+        report = {"files": 0, "duplicates": 0, "bytes_reclaimed": 0}
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for reclaimed in pool.map(adopt, self.index.records()):
+                if reclaimed < 0:
+                    continue
+                report["files"] += 1
+                report["duplicates"] += 1 if reclaimed else 0
+                report["bytes_reclaimed"] += reclaimed
+        return report
+    
     def get_current_session(self) -> Optional[RecordingSession]:
         """Get the current recording session."""
         return self.current_session
@@ -89,8 +355,8 @@ class SessionManager:
             "duration": f"{session.duration:.2f}s",
             "audio_file": session.audio_path.name,
             "text_file": session.text_path.name,
-            "transcription_length": len(session.transcription),
-            "transcription_preview": session.transcription[:100] + "..." if len(session.transcription) > 100 else session.transcription,
+            "transcription_length": session.transcript_length,
+            "transcription_preview": session.preview,
             "audio_exists": session.audio_path.exists(),
             "text_exists": session.text_path.exists(),
         }
@@ -114,7 +380,7 @@ class SessionManager:
         print(f"📝 Text file: {info['text_file']}")
         print(f"📊 Transcription: {info['transcription_length']} characters")
         
-        if session.transcription:
+        if session.transcript_length:
             print(f"\n💬 Transcription:")
             print(f"   {info['transcription_preview']}")
         else:
@@ -123,12 +389,14 @@ class SessionManager:
         print(f"\n📂 Files saved in: {session.audio_path.parent}")
         print("="*50)
     
-    def load_session(self, audio_path) -> Optional[RecordingSession]:
+    def load_session(self, audio_path, load_text: bool = True) -> Optional[RecordingSession]:
         """
         Load a session from existing files.
         
         Args:
             audio_path: Path to the audio file
+            load_text: Whether to read the full transcription. When False and
+                a metadata sidecar exists, the text file is not opened.
             
         Returns:
             RecordingSession object or None if failed
@@ -137,31 +405,38 @@ class SessionManager:
             audio_path = Path(audio_path)
             text_path = audio_path.with_suffix('.txt')
             
-            if not audio_path.exists():
+            metadata = self.file_manager.load_metadata(
+                self.file_manager.get_metadata_path(audio_path)
+            )
+            
+            if metadata is None and not audio_path.exists():
                 print(f"❌ Audio file not found: {audio_path}")
                 return None
             
-            # Load transcription
-            transcription = self.file_manager.load_text(text_path) or ""
+            # Load transcription (legacy sessions without a sidecar always need it)
+            if load_text or metadata is None:
+                transcription = self.file_manager.load_text(text_path) or ""
+            else:
+                transcription = None
             
             # Get timestamp from filename
-            timestamp_str = audio_path.stem  # YYYYMMDD_HHMMSS
+            timestamp_str = audio_path.stem[:15]  # YYYYMMDD_HHMMSS[_N]
             try:
                 timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
             except ValueError:
                 # Fallback to file modification time
                 timestamp = datetime.fromtimestamp(audio_path.stat().st_mtime)
             
-            # Calculate duration (would need to load audio file for accurate duration)
-            # For now, use a placeholder
-            duration = 0.0
+            # Duration comes from the sidecar; legacy sessions have none recorded
+            duration = metadata.duration if metadata else 0.0
             
             session = RecordingSession(
                 timestamp=timestamp,
                 audio_path=audio_path,
                 text_path=text_path,
                 transcription=transcription,
-                duration=duration
+                duration=duration,
+                metadata=metadata
             )
             
             return session
@@ -180,13 +455,11 @@ class SessionManager:
         Returns:
             List of session information dictionaries
         """
-        sessions_data = self.file_manager.get_recent_sessions(limit)
         sessions = []
         
-        for session_data in sessions_data:
-            if session_data["exists"]:
-                session = self.load_session(session_data["audio_path"])
-                if session:
-                    sessions.append(self.get_session_info(session))
+        for record in reversed(self.index.records()[-limit:] if limit > 0 else []):
+            session = self.load_session(self.index.audio_path(record), load_text=False)
+            if session:
+                sessions.append(self.get_session_info(session))
         
         return sessions
\ No newline at end of file
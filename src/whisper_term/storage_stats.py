@@ -0,0 +1,146 @@
+"""Running storage totals for the recordings tree."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def _empty() -> Dict[str, Any]:
+    return {"sessions": 0, "files": 0, "bytes": 0, "audio_seconds": 0.0}
+
+
+class StorageStats:
+    """
+    Totals of sessions, files, bytes and stored audio seconds, overall and
+    per month, persisted as ``stats.json`` next to the session index.
+
+    The index calls ``apply`` with the old and new record on every change,
+    so the totals stay current without walking the tree. Each save records
+    the identity of the index file the totals match (device, inode, size,
+    mtime); a process that only needs the totals loads them with ``load``
+    instead of reading the index, and falls back to reading it when the
+    index has changed since.
+
+    Sessions whose audio shares a blob (see blob_store) count the audio
+    bytes once in the overall totals. The per-month buckets count every
+    session's files in full.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize empty totals.
+
+        Args:
+            path: File the totals are persisted to
+        """
+        self.path = Path(path)
+        self._totals = _empty()
+        self._months: Dict[str, Dict[str, Any]] = {}
+        self._blobs: Dict[str, int] = {}  # Sessions linking to each blob
+        # Identity of the index file the totals match, set by the index
+        self.index_id: Optional[Tuple[int, int, int, int]] = None
+        self._lock = threading.Lock()
+    
+    def load(self, index_id: Tuple[int, int, int, int]) -> bool:
+        """
+        Load the persisted totals if they match the index file.
+        
+        Args:
+            index_id: (st_dev, st_ino, st_size, st_mtime_ns) of the index now
+            
+        Returns:
+            True if the totals were loaded
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("index") != list(index_id):
+            return False
+        with self._lock:
+            self._totals = {key: data[key] for key in _empty()}
+            self._months = data.get("months", {})
+            self._blobs = {}
+        return True
+
+    def save(self) -> None:
+        """Persist the totals atomically."""
+        with self._lock:
+            data = dict(self._totals, months=self._months,
+                        index=list(self.index_id) if self.index_id else None)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Failed to save storage stats: {e}")
+
+    def _add(self, record: Dict[str, Any], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) one session record (lock held)."""
+        month = record["path"].split("/", 1)[0]
+        bucket = self._months.setdefault(month, _empty())
+        audio_seconds = record["duration"] if record["audio_state"] != "deleted" else 0.0
+
+        for totals in (self._totals, bucket):
+            totals["sessions"] += sign
+            totals["files"] += sign * record.get("files", 0)
+            totals["bytes"] += sign * record.get("bytes", 0)
+            totals["audio_seconds"] += sign * audio_seconds
+        
+        # Audio shared with another session is on disk once
+        blob = record.get("blob")
+        if blob:
+            links = self._blobs.get(blob, 0)
+            if sign > 0:
+                self._blobs[blob] = links + 1
+                shared = links > 0
+            else:
+                shared = links > 1
+                if links > 1:
+                    self._blobs[blob] = links - 1
+                else:
+                    self._blobs.pop(blob, None)
+            if shared:
+                self._totals["bytes"] -= sign * record.get("audio_bytes", 0)
+
+        if bucket["sessions"] <= 0:
+            del self._months[month]
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+              save: bool = True) -> None:
+        """
+        Account for one index change and persist.
+
+        Args:
+            old: Previous record of the session, or None if it is new
+            new: Current record, or None if the session was removed
+            save: Persist the totals (off while replaying other processes' changes)
+        """
+        with self._lock:
+            if old is not None:
+                self._add(old, -1)
+            if new is not None:
+                self._add(new, 1)
+        if save:
+            self.save()
+
+    def reset(self, records: Iterable[Dict[str, Any]], save: bool = True) -> None:
+        """Recompute the totals from a full set of records and persist."""
+        with self._lock:
+            self._totals = _empty()
+            self._months = {}
+            self._blobs = {}
+            for record in records:
+                self._add(record, 1)
+        if save:
+            self.save()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals, with a per-month breakdown under ``months``."""
+        with self._lock:
+            return dict(self._totals, months={m: dict(v) for m, v in sorted(self._months.items())})
@@ -1,29 +1,152 @@
 """Transcription engine using OpenAI Whisper."""
 
+import dataclasses
+import time
+import threading
+import torch
 import whisper
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
+
+from .calibration import AutoModelSelector
+from .encoder_cache import EncoderCache
+from .file_manager import compute_checksum, load_audio_file
+from .compute import use_threads, set_interop_threads
+from .decoding_guard import GuardedDecoder, install_guard
+from .language_detection import LanguagePin, LanguagePriors, current_user, low_confidence
+from .prompting import build_prompt, encode_prompt, parse_vocabulary, rolling_prompt, rolling_text
+from . import metrics, model_store
+from .config import Config
 
 
 class TranscriptionEngine:
     """Handles speech-to-text transcription using OpenAI Whisper."""
     
-    def __init__(self, model_name: str = "base", language: str = "english"):
+    def __init__(self, model_name: str = "base", language: str = "english",
+                 target_latency: float = 2.0, expected_duration: float = 8.0,
+                 encoder_cache_mb: int = 0, beam_size: Optional[int] = None,
+                 num_threads: Optional[int] = None,
+                 interop_threads: Optional[int] = None, data_dir: str = "data",
+                 decode_guard: bool = True, model_variant: Optional[str] = None,
+                 offline: bool = False, vocabulary: Optional[str] = None,
+                 initial_prompt: Optional[str] = None, rolling_prompt: bool = True,
+                 language_pinning: bool = True, user: Optional[str] = None):
         """
         Initialize the transcription engine.
         
         Args:
-            model_name: Whisper model to use (tiny, base, small, medium, large, turbo)
+            model_name: Whisper model to use (tiny, base, small, medium, large, turbo),
+                or "auto" to pick one from the host calibration profile
             language: Language for transcription (english, auto, etc.)
+            target_latency: Acceptable transcription time for "auto", in seconds
+            expected_duration: Expected recording length for "auto", in seconds
+            encoder_cache_mb: Size limit of the on-disk encoder output cache
+                used by transcribe_windows (0 disables the cache)
+            beam_size: Beam width for final transcriptions, or None for
+                greedy decoding (live partial passes always decode greedily)
+            num_threads: Torch intra-op threads (process-wide: the first
+                engine that sets them wins), or None to keep torch's default
+            interop_threads: Torch inter-op threads (process-wide, only
+                effective before the first inference)
+            data_dir: Base data directory holding models, caches and the host profile
+            decode_guard: End looping or silent decodes early (see decoding_guard)
+            model_variant: Load this precomputed variant ("int8", "mmap") when
+                it has been converted (see model_store)
+            offline: Fail instead of downloading a model that is not cached
+            vocabulary: Comma-separated domain terms to bias recognition towards
+            initial_prompt: Text to condition every transcription on
+            rolling_prompt: In windowed and live decoding, also condition each
+                window on the text committed before it
+            language_pinning: With language "auto", detect the language once
+                and pin it for the rest of the session (see language_detection)
+            user: Whose language priors to use (defaults to the login name)
         """
-        self.model_name = model_name
         self.language = language
+        self.beam_size = beam_size
+        self.num_threads = num_threads
+        self.interop_threads = interop_threads
+        set_interop_threads(interop_threads)
         self.model = None
-        self.model_cache_dir = Path("data/models")
+        self.decode_guard = decode_guard
+        self.guard: Optional[GuardedDecoder] = None
+        self.model_variant = model_variant
+        self.offline = offline
+        self.vocabulary = parse_vocabulary(vocabulary)
+        self.prompt = build_prompt(vocabulary, initial_prompt)
+        self.rolling_prompt = rolling_prompt
+        self.model_cache_dir = Path(data_dir) / "models"
+        
+        self.language_pin: Optional[LanguagePin] = None
+        if language == "auto" and language_pinning:
+            self.language_pin = LanguagePin(LanguagePriors(
+                Path(data_dir) / "language_priors.json", user or current_user()
+            ))
+        
+        self.auto_selector: Optional[AutoModelSelector] = None
+        if model_name == "auto":
+            self.auto_selector = AutoModelSelector(
+                self.model_cache_dir.parent / "host_profile.json",
+                expected_duration=expected_duration,
+                target_latency=target_latency
+            )
+            model_name = self.auto_selector.select()
+        self.model_name = model_name
+        self._encoder_key = model_name  # Set from the loaded weights in _load_model
+        
+        self.encoder_cache: Optional[EncoderCache] = None
+        if encoder_cache_mb > 0:
+            self.encoder_cache = EncoderCache(
+                self.model_cache_dir.parent / "cache" / "encoder",
+                max_bytes=encoder_cache_mb * 1024 * 1024
+            )
         
+        # Serializes model use between the pipeline and live partial decoding
+        self._lock = threading.Lock()
+        
+    @classmethod
+    def from_config(cls, config: Config, **overrides) -> "TranscriptionEngine":
+        """
+        Create an engine from the resolved configuration.
+        
+        Args:
+            config: Effective settings
+            **overrides: Constructor arguments that take precedence over config
+        """
+        kwargs = dict(
+            model_name=config.model,
+            language=config.language,
+            target_latency=config.target_latency,
+            expected_duration=config.expected_duration,
+            encoder_cache_mb=config.encoder_cache_mb,
+            beam_size=config.beam_size,
+            num_threads=config.threads,
+            interop_threads=config.interop_threads,
+            data_dir=config.data_dir,
+            decode_guard=config.decode_guard,
+            model_variant=config.model_variant,
+            offline=config.offline,
+            vocabulary=config.vocabulary,
+            initial_prompt=config.initial_prompt,
+            rolling_prompt=config.rolling_prompt,
+            language_pinning=config.language_pinning,
+            user=config.user
+        )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+    
     def _load_model(self) -> None:
-        """Load the Whisper model if not already loaded."""
+        """Load the Whisper model if not already loaded and apply thread settings."""
+        # Torch thread counts are process-wide; the first engine's setting sticks
+        use_threads(self.num_threads)
+        
+        if self.auto_selector is not None:
+            # Follow recalibrations of the host profile
+            selected = self.auto_selector.select()
+            if selected != self.model_name:
+                self.model_name = selected
+                self.model = None
+        
         if self.model is None:
             print(f"Loading Whisper model '{self.model_name}'...")
             
@@ -31,16 +154,82 @@ class TranscriptionEngine:
             self.model_cache_dir.mkdir(parents=True, exist_ok=True)
             
             try:
-                # Load model with custom cache directory
-                self.model = whisper.load_model(
-                    name=self.model_name,
-                    download_root=str(self.model_cache_dir)
+                # Verified checkpoints load without re-hashing; missing ones
+                # download unless offline
+                start_time = time.perf_counter()
+                self.model = model_store.load_model(
+                    self.model_name, self.model_cache_dir,
+                    variant=self.model_variant, offline=self.offline
                 )
+                metrics.MODEL_LOAD_SECONDS.observe(time.perf_counter() - start_time,
+                                                   model=self.model_name)
+                if self.decode_guard:
+                    self.guard = install_guard(self.model)
+                self._encoder_key = self._weights_key()
                 print(f"✅ Model '{self.model_name}' loaded successfully")
             except Exception as e:
                 print(f"❌ Error loading model: {e}")
                 raise
     
+    def _prompt_tokens(self, text: Optional[str]) -> List[int]:
+        """Token ids of a prompt for the loaded model (cached across calls)."""
+        if not text:
+            return []
+        return list(encode_prompt(text, self.model.is_multilingual,
+                                  getattr(self.model, "num_languages", 99)))
+    
+    def _weights_key(self) -> str:
+        """
+        Name of the loaded weights for the encoder cache: the model plus the
+        variant actually loaded and a non-fp32 dtype, so outputs of
+        different weights are never mixed.
+        """
+        key = self.model_name
+        if self.model_variant and model_store.variant_path(
+                self.model_name, self.model_cache_dir, self.model_variant).exists():
+            key += f".{self.model_variant}"
+        dtype = next(self.model.parameters()).dtype
+        if dtype != torch.float32:
+            key += f".{str(dtype).replace('torch.', '')}"
+        return key
+    
+    def _pinning(self) -> bool:
+        """Whether the language is detected and pinned per session (lock held)."""
+        return self.language_pin is not None and self.model.is_multilingual
+    
+    def _window_mel(self, audio_data: np.ndarray) -> torch.Tensor:
+        """Log-mel spectrogram of the first 30-second window, for language detection."""
+        return whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio_data[:whisper.audio.N_SAMPLES]), n_mels=self.model.dims.n_mels
+        ).to(self.model.device)
+    
+    def _language_option(self, audio_data: Optional[np.ndarray] = None) -> Optional[str]:
+        """
+        Language to pass to Whisper (lock held): the configured one, else
+        the pinned one, else the one detected from audio_data's first window
+        (None lets Whisper detect it itself).
+        """
+        if self.language != "auto":
+            return self.language
+        if not self._pinning():
+            return None
+        if audio_data is None:
+            return self.language_pin.language
+        return self.language_pin.resolve(self.model, self._window_mel(audio_data))
+    
+    def _redetect(self, audio_data: np.ndarray, segments: List[Dict[str, Any]]) -> Optional[str]:
+        """New pinned language if a pinned decode came out low-confidence (lock held)."""
+        if self.language != "auto" or not self._pinning() or not low_confidence(segments):
+            return None
+        return self.language_pin.recheck(self.model, self._window_mel(audio_data))
+    
+    def _record(self, mode: str, result: Dict[str, Any],
+                audio_data: Optional[np.ndarray]) -> Dict[str, Any]:
+        """Count a finished transcription in the metrics and return its result."""
+        audio_seconds = len(audio_data) / whisper.audio.SAMPLE_RATE if audio_data is not None else 0.0
+        metrics.observe_transcription(self.model_name, mode, result, audio_seconds)
+        return result
+    
     def transcribe(self, audio_data: np.ndarray) -> Dict[str, Any]:
         """
         Transcribe audio data to text.
@@ -54,20 +243,35 @@ class TranscriptionEngine:
         if audio_data is None or len(audio_data) == 0:
             return {"text": "", "language": self.language}
         
-        # Load model if not already loaded
-        self._load_model()
-        
         print("🔄 Processing transcription...")
         
         try:
-            # Transcribe with specified language
             options = {
-                "language": self.language if self.language != "auto" else None,
                 "task": "transcribe",
                 "fp16": False,  # Use fp32 for better compatibility
+                "beam_size": self.beam_size,  # Dropped by whisper on temperature fallback
+                # Tokenized once per call; later windows condition on the
+                # previous text as usual (condition_on_previous_text)
+                "initial_prompt": self.prompt,
             }
             
-            result = self.model.transcribe(audio_data, **options)
+            with self._lock:
+                # Load model if not already loaded
+                self._load_model()
+                
+                if self.guard:
+                    self.guard.reset()
+                start_time = time.perf_counter()
+                options["language"] = self._language_option(audio_data)
+                result = self.model.transcribe(audio_data, **options)
+                redetected = self._redetect(audio_data, result.get("segments", []))
+                if redetected:
+                    options["language"] = redetected
+                    result = self.model.transcribe(audio_data, **options)
+                decode_time = time.perf_counter() - start_time
+                guard_hits = sum(self.guard.reset().values()) if self.guard else 0
+                if self.language_pin:
+                    self.language_pin.record()
             
             # Extract text and clean it up
             text = result["text"].strip()
@@ -76,20 +280,24 @@ class TranscriptionEngine:
                 print(f"✅ Transcription completed: {len(text)} characters")
             else:
                 print("⚠️  No speech detected in audio")
+            if guard_hits:
+                print(f"🛡️  Decode guard cut {guard_hits} looping or silent window(s) short")
             
-            return {
+            return self._record("full", {
                 "text": text,
                 "language": result.get("language", self.language),
                 "segments": result.get("segments", []),
-            }
+                "decode_time": decode_time,
+                "guard_hits": guard_hits,
+            }, audio_data)
             
         except Exception as e:
             print(f"❌ Transcription error: {e}")
-            return {
+            return self._record("full", {
                 "text": "",
                 "language": self.language,
                 "error": str(e)
-            }
+            }, audio_data)
     
     def transcribe_from_file(self, audio_file: Path) -> Dict[str, Any]:
         """
@@ -104,19 +312,37 @@ class TranscriptionEngine:
         if not audio_file.exists():
             return {"text": "", "language": self.language, "error": "File not found"}
         
-        # Load model if not already loaded
-        self._load_model()
-        
         print(f"🔄 Transcribing file: {audio_file.name}")
         
+        audio_data = None
         try:
             options = {
-                "language": self.language if self.language != "auto" else None,
                 "task": "transcribe",
                 "fp16": False,
+                "beam_size": self.beam_size,
+                "initial_prompt": self.prompt,
             }
             
-            result = self.model.transcribe(str(audio_file), **options)
+            # Decode outside the lock; WAV/FLAC need no ffmpeg subprocess
+            audio_data = load_audio_file(audio_file)
+            
+            with self._lock:
+                # Load model if not already loaded
+                self._load_model()
+                
+                if self.guard:
+                    self.guard.reset()
+                start_time = time.perf_counter()
+                options["language"] = self._language_option(audio_data)
+                result = self.model.transcribe(audio_data, **options)
+                redetected = self._redetect(audio_data, result.get("segments", []))
+                if redetected:
+                    options["language"] = redetected
+                    result = self.model.transcribe(audio_data, **options)
+                decode_time = time.perf_counter() - start_time
+                guard_hits = sum(self.guard.reset().values()) if self.guard else 0
+                if self.language_pin:
+                    self.language_pin.record()
             
             text = result["text"].strip()
             
@@ -124,29 +350,304 @@ class TranscriptionEngine:
                 print(f"✅ File transcription completed: {len(text)} characters")
             else:
                 print("⚠️  No speech detected in file")
+            if guard_hits:
+                print(f"🛡️  Decode guard cut {guard_hits} looping or silent window(s) short")
             
-            return {
+            return self._record("file", {
                 "text": text,
                 "language": result.get("language", self.language),
                 "segments": result.get("segments", []),
-            }
+                "decode_time": decode_time,
+                "guard_hits": guard_hits,
+            }, audio_data)
             
         except Exception as e:
             print(f"❌ File transcription error: {e}")
-            return {
+            return self._record("file", {
                 "text": "",
                 "language": self.language,
                 "error": str(e)
+            }, audio_data)
+    
+    def _encode_window(self, audio_window: np.ndarray, audio_hash: Optional[str],
+                       window: int) -> torch.Tensor:
+        """Encoder output for one 30-second window, from the cache when possible."""
+        if self.encoder_cache is not None and audio_hash is not None:
+            cached = self.encoder_cache.get(audio_hash, self._encoder_key, window)
+            if cached is not None:
+                return torch.from_numpy(cached).to(self.model.device)
+        
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio_window), n_mels=self.model.dims.n_mels
+        ).to(self.model.device)
+        with torch.no_grad():
+            features = self.model.encoder(mel[None])
+        
+        if self.encoder_cache is not None and audio_hash is not None:
+            self.encoder_cache.put(audio_hash, self._encoder_key, window, features.cpu().numpy())
+        return features
+    
+    def transcribe_windows(self, audio_data: np.ndarray, language: Optional[str] = None,
+                           initial_prompt: Optional[str] = None,
+                           temperature: float = 0.0,
+                           on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+                           ) -> Dict[str, Any]:
+        """
+        Transcribe audio window by window, reusing cached encoder outputs.
+        
+        Intended for re-decoding a recording with different decoder settings
+        (language, prompt, temperature): only the decoder runs when the
+        encoder output for a window is already cached. Windows are fixed
+        30-second blocks, so results can differ slightly from transcribe(),
+        which seeks by segment timestamps.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            language: Language override (defaults to the engine's language;
+                with "auto" the session's language pin is used and updated)
+            initial_prompt: Text to condition the decoder on (defaults to the
+                engine's vocabulary and prompt); with rolling_prompt each
+                window also sees the previous window's text
+            temperature: Sampling temperature
+            on_segment: Called with each window's segment as soon as it is
+                decoded (from the calling thread, with the model lock held)
+            
+        Returns:
+            Dictionary containing transcription results
+        """
+        if audio_data is None or len(audio_data) == 0:
+            return {"text": "", "language": self.language}
+        
+        pin = language is None and self.language == "auto"
+        language = language or self.language
+        n_samples = whisper.audio.N_SAMPLES
+        
+        try:
+            with self._lock:
+                self._load_model()
+                
+                start_time = time.perf_counter()
+                audio_hash = compute_checksum(audio_data) if self.encoder_cache else None
+                
+                if self.guard:
+                    self.guard.reset()
+                base_prompt = self._prompt_tokens(
+                    initial_prompt if initial_prompt is not None else self.prompt
+                )
+                previous: List[int] = []
+                texts = []
+                segments = []
+                detected = None
+                pin = pin and self._pinning()
+                for window, offset in enumerate(range(0, len(audio_data), n_samples)):
+                    chunk = audio_data[offset:offset + n_samples]
+                    features = self._encode_window(chunk, audio_hash, window)
+                    
+                    prompt = rolling_prompt(base_prompt, previous) if self.rolling_prompt else base_prompt
+                    options = whisper.DecodingOptions(
+                        task="transcribe",
+                        # Detection from encoder output costs one decoder step
+                        language=(self.language_pin.resolve(self.model, features) if pin
+                                  else language if language != "auto" else None),
+                        temperature=temperature,
+                        beam_size=self.beam_size,
+                        prompt=prompt or None,
+                        without_timestamps=True,
+                        fp16=False,
+                    )
+                    result = self.model.decode(features, options)[0]
+                    if pin and low_confidence([{"avg_logprob": result.avg_logprob,
+                                                "no_speech_prob": result.no_speech_prob}]):
+                        redetected = self.language_pin.recheck(self.model, features)
+                        if redetected:
+                            options = dataclasses.replace(options, language=redetected)
+                            result = self.model.decode(features, options)[0]
+                    previous = result.tokens
+                    
+                    detected = detected or result.language
+                    text = result.text.strip()
+                    texts.append(text)
+                    segments.append({
+                        "id": window,
+                        "start": offset / whisper.audio.SAMPLE_RATE,
+                        "end": (offset + len(chunk)) / whisper.audio.SAMPLE_RATE,
+                        "text": text,
+                        "avg_logprob": result.avg_logprob,
+                        "no_speech_prob": result.no_speech_prob,
+                    })
+                    if on_segment:
+                        on_segment(segments[-1])
+                
+                decode_time = time.perf_counter() - start_time
+                guard_hits = sum(self.guard.reset().values()) if self.guard else 0
+                if pin:
+                    self.language_pin.record()
+            
+            return self._record("windows", {
+                "text": " ".join(t for t in texts if t),
+                "language": detected or language,
+                "segments": segments,
+                "decode_time": decode_time,
+                "guard_hits": guard_hits,
+            }, audio_data)
+            
+        except Exception as e:
+            print(f"❌ Transcription error: {e}")
+            return self._record("windows", {
+                "text": "",
+                "language": self.language,
+                "error": str(e)
+            }, audio_data)
+    
+    def transcribe_batch(self, clips: List[np.ndarray],
+                         beam_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe many short clips in one encoder and decoder pass.
+        
+        Clips up to 30 seconds are padded to one mel window each, stacked,
+        encoded together and decoded with a batched greedy (or beam search)
+        decoder. Longer clips fall back to transcribe().
+        
+        Args:
+            clips: Audio clips as numpy arrays
+            beam_size: Beam width (default: the engine's beam_size)
+            
+        Returns:
+            One result dictionary per clip, in the same format as transcribe()
+        """
+        n_samples = whisper.audio.N_SAMPLES
+        results: List[Optional[Dict[str, Any]]] = [None] * len(clips)
+        
+        batch = []
+        for i, clip in enumerate(clips):
+            if clip is None or len(clip) == 0:
+                results[i] = {"text": "", "language": self.language}
+            elif len(clip) > n_samples:
+                results[i] = self.transcribe(clip)
+            else:
+                batch.append(i)
+        
+        if not batch:
+            return results
+        
+        try:
+            with self._lock:
+                self._load_model()
+                
+                start_time = time.perf_counter()
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(clips[i]), n_mels=self.model.dims.n_mels
+                    )
+                    for i in batch
+                ]).to(self.model.device)
+                
+                with torch.no_grad():
+                    features = self.model.encoder(mels)
+                
+                options = whisper.DecodingOptions(
+                    task="transcribe",
+                    language=self._language_option(),
+                    beam_size=beam_size if beam_size is not None else self.beam_size,
+                    prompt=self._prompt_tokens(self.prompt) or None,
+                    without_timestamps=True,
+                    fp16=False,
+                )
+                decoded = self.model.decode(features, options)
+                decode_time = time.perf_counter() - start_time
+                clip_hits = self.guard.last_hits if self.guard else [[] for _ in batch]
+                if self.guard:
+                    self.guard.reset()
+            
+            for i, result, hits in zip(batch, decoded, clip_hits):
+                text = result.text.strip()
+                duration = len(clips[i]) / whisper.audio.SAMPLE_RATE
+                results[i] = self._record("batch", {
+                    "text": text,
+                    "language": result.language,
+                    "segments": [{
+                        "id": 0,
+                        "start": 0.0,
+                        "end": duration,
+                        "text": text,
+                        "avg_logprob": result.avg_logprob,
+                        "no_speech_prob": result.no_speech_prob,
+                    }] if text else [],
+                    # Each clip's share of the batch's wall-clock time
+                    "decode_time": decode_time / len(batch),
+                    "batch_size": len(batch),
+                    "guard_hits": len(hits),
+                }, clips[i])
+            
+        except Exception as e:
+            print(f"❌ Batch transcription error: {e}")
+            for i in batch:
+                results[i] = self._record("batch", {"text": "", "language": self.language,
+                                                    "error": str(e)}, clips[i])
+        
+        return results
+    
+    def transcribe_partial(self, audio_data: np.ndarray,
+                           context: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Quietly transcribe an in-progress recording for live display.
+        
+        Never waits for the model: if a full transcription is running, the
+        partial pass is skipped so it cannot delay committed results.
+        
+        Args:
+            audio_data: Audio recorded so far (at most one 30-second window)
+            context: Text already committed for this recording, carried into
+                the prompt after the vocabulary when rolling_prompt is on
+            
+        Returns:
+            Dictionary with "text", "segments" and "guard_hits", or None
+            if skipped
+        """
+        if audio_data is None or len(audio_data) == 0:
+            return None
+        
+        if not self._lock.acquire(blocking=False):
+            return None
+        
+        try:
+            self._load_model()
+            if self.guard:
+                self.guard.reset()
+            result = self.model.transcribe(
+                audio_data,
+                language=self._language_option(),
+                task="transcribe",
+                fp16=False,
+                condition_on_previous_text=False,
+                temperature=0.0,  # No fallbacks for tentative text
+                initial_prompt=rolling_text(self.prompt, context if self.rolling_prompt else None),
+            )
+            return {
+                "text": result["text"].strip(),
+                "segments": result.get("segments", []),
+                "guard_hits": sum(self.guard.reset().values()) if self.guard else 0,
             }
+        except Exception:
+            return None
+        finally:
+            self._lock.release()
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model."""
         if self.model is None:
-            return {"model_name": self.model_name, "loaded": False}
+            return {"model_name": self.model_name, "auto": self.auto_selector is not None,
+                    "loaded": False}
         
         return {
             "model_name": self.model_name,
+            "auto": self.auto_selector is not None,
             "language": self.language,
+            "language_pin": ({"language": self.language_pin.language, "source": self.language_pin.source}
+                             if self.language_pin else None),
             "loaded": True,
-            "cache_dir": str(self.model_cache_dir)
+            "variant": self.model_variant,
+            "cache_dir": str(self.model_cache_dir),
+            "threads": torch.get_num_threads(),
+            "encoder_cache": self.encoder_cache.get_info() if self.encoder_cache else None
         }
\ No newline at end of file
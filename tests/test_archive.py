@@ -0,0 +1,57 @@
+"""Export and import round trips."""
+
+import numpy as np
+import pytest
+
+from whisper_term.archive import SessionArchiver
+from whisper_term.file_manager import FileManager
+from whisper_term.session_manager import SessionManager
+
+
+@pytest.mark.parametrize("fmt", ["tar.zst", "jsonl"])
+def test_round_trip_with_duplicate_audio(tmp_path, fmt):
+    if fmt == "tar.zst":
+        pytest.importorskip("zstandard")
+    source = SessionManager(FileManager(str(tmp_path / "source")))
+    audio = np.random.default_rng(2).uniform(-1, 1, 16000).astype(np.float32)
+    sessions = [source.create_session(audio, f"take {i}") for i in range(2)]
+    assert sessions[0].metadata.audio_blob == sessions[1].metadata.audio_blob
+
+    bundle = tmp_path / f"bundle.{fmt}"
+    assert SessionArchiver(source).export("all", bundle)["sessions"] == 2
+
+    target = SessionManager(FileManager(str(tmp_path / "target")))
+    counts = SessionArchiver(target).import_bundle(bundle)
+    assert counts == {"sessions": 2, "skipped": 0, "files": 6}
+
+    wav = sessions[0].audio_path.read_bytes()
+    for session in sessions:
+        record = target.index.get(session.audio_path.stem)
+        imported = target.index.audio_path(record)
+        assert record["audio_bytes"] == len(wav)
+        assert imported.read_bytes() == wav
+    assert target.get_storage_info()["total_sessions"] == 2
+
+
+def test_import_respects_claimed_session_ids(tmp_path):
+    source = SessionManager(FileManager(str(tmp_path / "source")))
+    session = source.create_session(np.zeros(1600, dtype=np.float32), "from bundle")
+    bundle = tmp_path / "bundle.jsonl"
+    SessionArchiver(source).export("all", bundle)
+
+    # The id is taken on disk but not (yet) in the index, as when another
+    # process has just reserved it
+    target = SessionManager(FileManager(str(tmp_path / "target")))
+    assert len(target.index) == 0
+    text_path = target.file_manager.recordings_dir / session.text_path.relative_to(
+        source.file_manager.recordings_dir)
+    text_path.parent.mkdir(parents=True)
+    text_path.write_text("local")
+
+    counts = SessionArchiver(target).import_bundle(bundle)
+    assert counts == {"sessions": 0, "skipped": 1, "files": 0}
+    assert text_path.read_text() == "local"
+
+    counts = SessionArchiver(target).import_bundle(bundle, overwrite=True)
+    assert counts["sessions"] == 1
+    assert text_path.read_text() == "from bundle"
@@ -0,0 +1,71 @@
+"""Content-addressed audio storage."""
+
+import os
+
+import numpy as np
+from scipy.io import wavfile
+
+from whisper_term.blob_store import hash_file
+from whisper_term.file_manager import FileManager, write_wav
+from whisper_term.session_manager import SessionManager
+
+
+def test_write_wav_matches_scipy(tmp_path):
+    audio = np.sin(np.linspace(0, 100, 16000)).astype(np.float32)
+    digest = write_wav(audio, tmp_path / "ours.wav", 16000)
+    wavfile.write(str(tmp_path / "scipy.wav"), 16000, (audio * 32767).astype(np.int16))
+    assert (tmp_path / "ours.wav").read_bytes() == (tmp_path / "scipy.wav").read_bytes()
+    assert digest == hash_file(tmp_path / "scipy.wav")
+
+
+def test_identical_audio_stored_once(tmp_path):
+    manager = SessionManager(FileManager(str(tmp_path)))
+    audio = np.random.default_rng(0).uniform(-1, 1, 16000).astype(np.float32)
+    first = manager.create_session(audio, "one")
+    second = manager.create_session(audio, "two")
+    other = manager.create_session(audio[::-1].copy(), "three")
+
+    assert os.path.samefile(first.audio_path, second.audio_path)
+    assert not os.path.samefile(first.audio_path, other.audio_path)
+    assert first.metadata.audio_blob == second.metadata.audio_blob
+    blob = manager.file_manager.blobs.path(first.metadata.audio_blob)
+    assert os.stat(blob).st_nlink == 3
+    assert not list(first.audio_path.parent.glob("*.tmp")) + list(first.audio_path.parent.glob("*.link"))
+
+
+def test_dedup_migration_and_collect(tmp_path):
+    file_manager = FileManager(str(tmp_path))
+    manager = SessionManager(file_manager)
+    audio = np.random.default_rng(1).uniform(-1, 1, 16000).astype(np.float32)
+    sessions = [manager.create_session(audio, "same") for _ in range(3)]
+
+    # Sessions saved before the blob store: independent copies
+    for session in sessions:
+        data = session.audio_path.read_bytes()
+        session.audio_path.unlink()
+        session.audio_path.write_bytes(data)
+    assert file_manager.blobs.collect()["blobs"] == 1
+
+    report = manager.deduplicate_audio(workers=2)
+    assert report == {"files": 3, "duplicates": 2, "bytes_reclaimed": 2 * len(data)}
+    assert manager.deduplicate_audio(workers=2)["bytes_reclaimed"] == 0
+    assert all(os.path.samefile(sessions[0].audio_path, s.audio_path) for s in sessions)
+
+    # Retention removing the audio orphans the blob
+    for session in sessions:
+        session.audio_path.unlink()
+    assert file_manager.blobs.collect() == {"blobs": 1, "bytes": len(data)}
+
+
+def test_set_audio_state_releases_last_link(tmp_path):
+    manager = SessionManager(FileManager(str(tmp_path)))
+    audio = np.random.default_rng(3).uniform(-1, 1, 16000).astype(np.float32)
+    first, second = (manager.create_session(audio, "same") for _ in range(2))
+    blob = manager.file_manager.blobs.path(first.metadata.audio_blob)
+
+    first.audio_path.unlink()
+    manager.set_audio_state(first.audio_path, "deleted")
+    assert blob.exists()
+    second.audio_path.unlink()
+    manager.set_audio_state(second.audio_path, "deleted")
+    assert not blob.exists()
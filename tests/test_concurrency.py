@@ -0,0 +1,75 @@
+"""Several processes ingesting into one data dir."""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from whisper_term.file_manager import FileManager
+from whisper_term.session_index import SessionIndex
+from whisper_term.session_manager import SessionManager
+
+WRITERS = 4
+SESSIONS = 25
+
+
+def _writer(data_dir: str, sessions: int) -> list:
+    manager = SessionManager(FileManager(data_dir))
+    audio = np.zeros(1600, dtype=np.float32)
+    ids = []
+    for i in range(sessions):
+        session = manager.create_session(audio, f"note {i}", model_name="test")
+        assert session is not None
+        # Rewrite the record too, so writers also compact the shared index
+        manager.reindex_session(session.audio_path)
+        ids.append(session.audio_path.stem)
+    return ids
+
+
+def _totals(snapshot: dict) -> dict:
+    return {key: value for key, value in snapshot.items() if key not in ("months", "index")}
+
+
+def test_parallel_writers(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=WRITERS, mp_context=ctx) as pool:
+        futures = [pool.submit(_writer, str(tmp_path), SESSIONS) for _ in range(WRITERS)]
+        ids = [session_id for future in futures for session_id in future.result(timeout=120)]
+
+    # Every session got its own id, even when started in the same second
+    assert len(ids) == len(set(ids)) == WRITERS * SESSIONS
+    file_manager = FileManager(tmp_path)
+    transcripts = sorted(path.stem for path in file_manager.recordings_dir.rglob("*.txt"))
+    assert transcripts == sorted(ids)
+
+    index = SessionIndex(tmp_path / "index.jsonl", file_manager.recordings_dir)
+    indexed = index.records()
+    stats = index.get_stats()
+    assert [record["id"] for record in indexed] == sorted(ids)
+
+    # The incrementally maintained index and totals agree with a full rescan
+    index.rebuild()
+    assert index.records() == indexed
+    rebuilt = index.get_stats()
+    assert _totals(stats) == pytest.approx(_totals(rebuilt))
+    assert stats["sessions"] == WRITERS * SESSIONS
+
+    # The totals persisted by the last writer match as well
+    with open(tmp_path / "stats.json", "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert _totals(saved) == pytest.approx(_totals(rebuilt))
+
+
+def test_rebuild_skips_abandoned_reservation(tmp_path):
+    file_manager = FileManager(tmp_path)
+    audio_path, text_path = file_manager.reserve_session_paths(datetime.now())
+    assert text_path.exists()
+
+    index = SessionIndex(tmp_path / "index.jsonl", file_manager.recordings_dir)
+    assert index.rebuild() == 0
+
+    file_manager.release_session_paths(audio_path)
+    assert not text_path.exists()
@@ -0,0 +1,59 @@
+"""Per-session language pinning and per-user priors."""
+
+from whisper_term.language_detection import LanguagePin, LanguagePriors, low_confidence
+
+
+class FakeModel:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def detect_language(self, features):
+        self.calls += 1
+        return None, self.answers.pop(0)
+
+
+def test_pin_after_confident_detection():
+    model = FakeModel({"en": 0.5, "de": 0.4}, {"de": 0.95, "en": 0.05})
+    pin = LanguagePin()
+    assert pin.resolve(model, None) == "en"
+    assert pin.language is None
+    assert pin.resolve(model, None) == "de"
+    assert (pin.language, pin.source) == ("de", "detected")
+    assert pin.resolve(model, None) == "de"
+    assert model.calls == 2
+
+
+def test_recheck_repins_on_confident_change():
+    pin = LanguagePin()
+    pin.resolve(FakeModel({"en": 0.9}), None)
+    assert pin.recheck(FakeModel({"en": 0.9}), None) is None
+    assert pin.recheck(FakeModel({"fr": 0.6, "en": 0.4}), None) is None
+    assert pin.recheck(FakeModel({"fr": 0.9}), None) == "fr"
+    assert (pin.language, pin.source) == ("fr", "redetected")
+
+
+def test_low_confidence_ignores_silence():
+    assert low_confidence([{"avg_logprob": -1.5, "no_speech_prob": 0.1}])
+    assert not low_confidence([{"avg_logprob": -1.5, "no_speech_prob": 0.9}])
+    assert not low_confidence([{"avg_logprob": -0.3, "no_speech_prob": 0.1}])
+    assert not low_confidence([])
+
+
+def test_prior_pins_new_sessions(tmp_path):
+    path = tmp_path / "language_priors.json"
+    priors = LanguagePriors(path, "alice")
+    for language in ("de", "de", "de"):
+        assert priors.prior() is None
+        priors.record(language)
+    assert priors.prior() == "de"
+    assert LanguagePriors(path, "bob").prior() is None
+
+    pin = LanguagePin(LanguagePriors(path, "alice"))
+    assert (pin.language, pin.source) == ("de", "prior")
+    model = FakeModel()
+    assert pin.resolve(model, None) == "de"
+    assert model.calls == 0
+
+    priors.record("en")
+    assert priors.prior() is None  # 3 of 4 sessions is no longer a clear majority
@@ -0,0 +1,33 @@
+"""Metrics registry and text exposition."""
+
+from whisper_term.metrics import Registry
+
+
+def test_render_text_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    depth = registry.gauge("depth", "Queue depth")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    requests.inc(route="/a")
+    requests.inc(2, route='/"b"')
+    depth.set_function(lambda: 3)
+    for value in (0.05, 0.1, 0.5, 7):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 1' in lines
+    assert 'requests_total{route="/\\"b\\""} 2' in lines
+    assert "depth 3" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 7.65" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_unlabelled_counter_starts_at_zero():
+    registry = Registry()
+    registry.counter("events_total", "Events")
+    assert "events_total 0" in registry.render().splitlines()
@@ -0,0 +1,75 @@
+"""Pausing a recording into parts and joining their transcriptions."""
+
+import numpy as np
+
+from whisper_term.audio_recorder import AudioRecorder
+from whisper_term.input_sources import InputSource
+from whisper_term.models import join_parts
+
+
+class FakeStream:
+    def __init__(self):
+        self.opened = 1
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        self.opened -= 1
+
+
+class FakeSource(InputSource):
+    def __init__(self):
+        super().__init__()
+        self.streams = []
+
+    def native_format(self):
+        return 16000, 1
+
+    def open_stream(self, callback):
+        self.callback = callback
+        self.streams.append(FakeStream())
+        return self.streams[-1]
+
+    def feed(self, seconds):
+        self.callback(np.ones((int(seconds * 16000), 1), dtype=np.float32), 0, None, None)
+
+
+def test_pause_keeps_stream_and_splits_parts():
+    source = FakeSource()
+    recorder = AudioRecorder(source=source)
+    recorder.start_recording()
+    source.feed(1.0)
+    first = recorder.pause_recording()
+    assert len(first) == 16000
+
+    source.feed(5.0)  # Dropped while paused
+    assert recorder.pause_recording() is None
+    recorder.resume_recording()
+    source.feed(0.5)
+    audio = recorder.stop_recording()
+
+    assert len(source.streams) == 1 and source.streams[0].opened == 0
+    assert len(audio) == 24000
+    assert len(audio[recorder.segment_start:]) == 8000
+
+
+def test_join_parts():
+    joined = join_parts([
+        {"text": "Hello there.", "language": "en", "decode_time": 0.5,
+         "segments": [{"id": 0, "start": 0.0, "end": 2.0, "text": "Hello there."}]},
+        {"text": "", "language": "en", "segments": []},
+        {"text": "Second part.", "language": "en", "decode_time": 0.25, "guard_hits": 1,
+         "segments": [{"id": 0, "start": 0.5, "end": 1.5, "text": "Second part."}]},
+    ], [3.0, 1.0, 2.0])
+
+    assert joined["text"] == "Hello there. Second part."
+    assert joined["decode_time"] == 0.75 and joined["guard_hits"] == 1
+    assert [(s["id"], s["start"], s["end"]) for s in joined["segments"]] == [(0, 0.0, 2.0), (1, 4.5, 5.5)]
+    for part in joined["parts"]:
+        assert joined["text"][part["text_start"]:part["text_end"]] in ("Hello there.", "", "Second part.")
+    assert [(p["start"], p["end"]) for p in joined["parts"]] == [(0.0, 3.0), (3.0, 4.0), (4.0, 6.0)]
+    assert joined["text"][joined["parts"][2]["text_start"]:] == "Second part."
@@ -0,0 +1,27 @@
+"""Vocabulary prompts and rolling context."""
+
+from whisper_term.prompting import (
+    MAX_PROMPT_TOKENS, build_prompt, parse_vocabulary, rolling_prompt, rolling_text
+)
+
+
+def test_build_prompt():
+    assert parse_vocabulary(" Kubernetes, gRPC,, Kubernetes ") == ["Kubernetes", "gRPC"]
+    assert build_prompt("Kubernetes, gRPC", "Standup notes.") == "Kubernetes, gRPC. Standup notes."
+    assert build_prompt(None, " ") is None
+
+
+def test_rolling_prompt_keeps_vocabulary():
+    base = [1, 2, 3]
+    prompt = rolling_prompt(base, list(range(100, 1000)))
+    assert len(prompt) == MAX_PROMPT_TOKENS
+    assert prompt[:3] == base
+    assert prompt[-1] == 999
+    assert rolling_prompt(base, []) == base
+
+
+def test_rolling_text_trims_context_at_word_boundary():
+    text = rolling_text("gRPC.", "alpha " * 200)
+    assert text.startswith("gRPC. alpha")
+    assert len(text) <= len("gRPC. ") + 400
+    assert rolling_text(None, None) is None
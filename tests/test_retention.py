@@ -0,0 +1,97 @@
+"""Retention planning and passes over a real data directory."""
+
+import gzip
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from whisper_term.file_manager import FileManager, stored_audio_path
+from whisper_term.retention import RetentionEngine, RetentionPolicy
+from whisper_term.session_manager import SessionManager
+
+
+def _sessions(data_dir, count=3):
+    manager = SessionManager(FileManager(str(data_dir)))
+    rng = np.random.default_rng(7)
+    sessions = [manager.create_session(rng.uniform(-1, 1, 16000).astype(np.float32), f"text {i}")
+                for i in range(count)]
+    return manager, sessions
+
+
+def _later(days):
+    return datetime.now() + timedelta(days=days)
+
+
+def test_plan_by_age(tmp_path):
+    manager, sessions = _sessions(tmp_path)
+    engine = RetentionEngine(manager, RetentionPolicy(
+        compress_after_days=1, delete_audio_after_days=5, codec="gzip"
+    ))
+
+    assert engine.plan() == []
+    actions = engine.plan(now=_later(2))
+    assert [a.action for a in actions] == ["compress"] * 3
+    assert [a.session_id for a in actions] == [s.audio_path.stem for s in sessions]
+    assert [a.action for a in engine.plan(now=_later(6))] == ["delete_audio"] * 3
+    assert len(engine.plan(now=_later(2), limit=2)) == 2
+
+
+def test_plan_size_cap_takes_oldest(tmp_path):
+    manager, sessions = _sessions(tmp_path)
+    total = sum(r["bytes"] for r in manager.index.records())
+    one = manager.index.get(sessions[0].audio_path.stem)["audio_bytes"]
+    engine = RetentionEngine(manager, RetentionPolicy(
+        max_total_mb=(total - one / 2) / (1024 * 1024), codec="gzip"
+    ))
+
+    actions = engine.plan()
+    assert [(a.session_id, a.action) for a in actions] == [(sessions[0].audio_path.stem, "delete_audio")]
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    manager, sessions = _sessions(tmp_path)
+    engine = RetentionEngine(manager, RetentionPolicy(compress_after_days=1, codec="gzip"))
+
+    report = engine.run(dry_run=True, now=_later(2))
+    assert report.dry_run and len(report.actions) == 3
+    assert report.bytes_reclaimed > 0
+    for session in sessions:
+        assert session.audio_path.exists()
+        assert manager.index.get(session.audio_path.stem)["audio_state"] == "wav"
+
+
+def test_run_compresses_audio(tmp_path):
+    manager, sessions = _sessions(tmp_path)
+    originals = [s.audio_path.read_bytes() for s in sessions]
+    engine = RetentionEngine(manager, RetentionPolicy(compress_after_days=1, codec="gzip"))
+
+    report = engine.run(now=_later(2))
+    assert len(report.actions) == 3 and report.failed == 0
+    for session, original in zip(sessions, originals):
+        record = manager.index.get(session.audio_path.stem)
+        stored = stored_audio_path(session.audio_path, "gzip")
+        assert record["audio_state"] == "gzip"
+        assert record["audio_bytes"] == stored.stat().st_size
+        assert not session.audio_path.exists()
+        assert gzip.decompress(stored.read_bytes()) == original
+    # Compressed audio is not compressed again
+    assert engine.plan(now=_later(2)) == []
+
+
+def test_run_deletes_audio(tmp_path):
+    manager, sessions = _sessions(tmp_path)
+    engine = RetentionEngine(manager, RetentionPolicy(
+        compress_after_days=1, delete_audio_after_days=5, codec="gzip"
+    ))
+    engine.run(now=_later(2))
+
+    report = engine.run(now=_later(6))
+    assert [a.action for a in report.actions] == ["delete_audio"] * 3
+    for session in sessions:
+        record = manager.index.get(session.audio_path.stem)
+        assert record["audio_state"] == "deleted"
+        assert record["audio_bytes"] == 0
+        assert not stored_audio_path(session.audio_path, "gzip").exists()
+        assert session.text_path.exists()
+    assert not any(p.is_file() for p in manager.file_manager.blobs.root.rglob("*"))
+    assert engine.plan(now=_later(6)) == []
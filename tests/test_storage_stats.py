@@ -0,0 +1,44 @@
+"""Persisted storage totals."""
+
+import numpy as np
+
+from whisper_term.file_manager import FileManager
+from whisper_term.session_index import SessionIndex
+from whisper_term.session_manager import SessionManager
+
+
+def _manager(data_dir):
+    return SessionManager(FileManager(str(data_dir)))
+
+
+def test_totals_load_without_reading_index(tmp_path, monkeypatch):
+    manager = _manager(tmp_path)
+    for i in range(3):
+        manager.create_session(np.zeros(1600 * (i + 1), dtype=np.float32), f"text {i}")
+    expected = manager.get_storage_info()
+
+    fresh = _manager(tmp_path)
+    monkeypatch.setattr(SessionIndex, "_refresh", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+    assert fresh.get_storage_info() == expected
+    monkeypatch.undo()
+
+    # Another writer changes the index: the stale totals are not used
+    other = _manager(tmp_path)
+    other.create_session(np.zeros(1600, dtype=np.float32), "more")
+    assert fresh.get_storage_info()["total_sessions"] == 4
+
+
+def test_shared_audio_counted_once(tmp_path):
+    manager = _manager(tmp_path)
+    audio = np.random.default_rng(4).uniform(-1, 1, 16000).astype(np.float32)
+    first = manager.create_session(audio, "a")
+    one = manager.get_storage_info()["total_size_bytes"]
+    second = manager.create_session(audio, "a")
+    wav = first.audio_path.stat().st_size
+    sidecars = second.metadata_path.stat().st_size + second.text_path.stat().st_size
+    assert manager.get_storage_info()["total_size_bytes"] == one + sidecars
+
+    manager.reconcile_storage()
+    assert manager.get_storage_info()["total_size_bytes"] == one + sidecars
+    manager.index.remove(first.audio_path.stem)
+    assert manager.get_storage_info()["total_size_bytes"] == wav + sidecars